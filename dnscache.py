@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# Part of the Siphon - Web Data Extraction Tool
+"""
+Shared, TTL-bounded DNS cache under socket.getaddrinfo (siphon --dns-cache,
+proxy_get.py --dns-cache).
+
+Kept in its own module so callers can use it without importing siphon
+(which installs signal handlers on import). Nothing is patched until
+install_dns_cache() is called, and uninstall_dns_cache() restores the
+system resolver.
+"""
+import ipaddress
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional DNS client: lets the DNS cache honour record TTLs
+try:
+    import dns.resolver
+    import dns.exception
+    DNSPYTHON_AVAILABLE = True
+except ImportError:
+    DNSPYTHON_AVAILABLE = False
+
+
+class DNSCache:
+    """
+    In-process cache under socket.getaddrinfo, so requests/urllib3 (and
+    aiohttp's threaded resolver) resolve each host once per TTL.
+
+    Addresses are cached per host and expanded per call with a numeric
+    getaddrinfo, so any port/socktype reuses the entry. With dnspython
+    installed, dotted names are resolved through it and cached for the
+    record's TTL (clamped to [min_ttl, max_ttl]); otherwise, and for names
+    it cannot answer (hosts-file entries, single labels), the system
+    resolver is used and entries live for `ttl`. Failures are cached for
+    negative_ttl. Concurrent misses for one host share a single lookup, and
+    prefetch() resolves hosts in the background before anyone asks.
+    """
+
+    def __init__(self, ttl=300, min_ttl=30, max_ttl=3600, negative_ttl=30,
+                 max_entries=100000, prefetch_workers=8):
+        self.ttl = ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.prefetch_workers = max(1, int(prefetch_workers))
+        self.lock = threading.Lock()
+        self._entries = OrderedDict()   # host -> (expires, [(family, address)] or gaierror)
+        self._inflight = {}             # host -> Event set when its lookup finishes
+        self._system_getaddrinfo = socket.getaddrinfo
+        self._pool = None
+        self._resolver = dns.resolver.Resolver() if DNSPYTHON_AVAILABLE else None
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+
+    def install(self):
+        socket.getaddrinfo = self.getaddrinfo
+
+    def uninstall(self):
+        if socket.getaddrinfo == self.getaddrinfo:
+            socket.getaddrinfo = self._system_getaddrinfo
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    @staticmethod
+    def _cacheable(host):
+        if not host or not isinstance(host, str):
+            return False
+        try:
+            ipaddress.ip_address(host.split('%', 1)[0])
+            return False   # already numeric
+        except ValueError:
+            return True
+
+    def _lookup(self, host):
+        """Resolve host; returns ([(family, address)], ttl) or raises socket.gaierror."""
+        if self._resolver is not None and '.' in host.rstrip('.'):
+            addresses, ttl = [], None
+            for rdtype, family in (('A', socket.AF_INET), ('AAAA', socket.AF_INET6)):
+                try:
+                    answer = self._resolver.resolve(host, rdtype, lifetime=5)
+                except dns.exception.DNSException:
+                    continue
+                addresses.extend((family, record.address) for record in answer)
+                record_ttl = max(0, answer.expiration - time.time())
+                ttl = record_ttl if ttl is None else min(ttl, record_ttl)
+            if addresses:
+                return addresses, min(self.max_ttl, max(self.min_ttl, ttl))
+        infos = self._system_getaddrinfo(host, None, 0, socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys((info[0], info[4][0]) for info in infos))
+        return addresses, self.ttl
+
+    def resolve(self, host):
+        """Cached [(family, address)] for host; raises socket.gaierror on failure."""
+        host = host.lower()
+        while True:
+            with self.lock:
+                entry = self._entries.get(host)
+                if entry is not None and entry[0] > time.time():
+                    self._entries.move_to_end(host)
+                    self.hits += 1
+                    result = entry[1]
+                    break
+                waiter = self._inflight.get(host)
+                if waiter is None:
+                    waiter = self._inflight[host] = threading.Event()
+                    self.misses += 1
+                    owner = True
+                else:
+                    owner = False
+            if not owner:
+                waiter.wait(10)
+                continue
+            try:
+                addresses, ttl = self._lookup(host)
+                result, expires = addresses, time.time() + ttl
+            except socket.gaierror as e:
+                result, expires = e, time.time() + self.negative_ttl
+            with self.lock:
+                self._entries[host] = (expires, result)
+                self._entries.move_to_end(host)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                del self._inflight[host]
+            waiter.set()
+            break
+        if isinstance(result, socket.gaierror):
+            raise result
+        return result
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        if isinstance(host, bytes):
+            host = host.decode('idna')
+        if not self._cacheable(host):
+            return self._system_getaddrinfo(host, port, family, type, proto, flags)
+        results = []
+        for addr_family, address in self.resolve(host):
+            if family and family != addr_family:
+                continue
+            results.extend(self._system_getaddrinfo(address, port, addr_family, type, proto,
+                                                    flags | socket.AI_NUMERICHOST))
+        if not results:
+            return self._system_getaddrinfo(host, port, family, type, proto, flags)
+        return results
+
+    def prefetch(self, hosts):
+        """Resolve hosts not yet cached on background threads."""
+        now = time.time()
+        with self.lock:
+            pending = [h.lower() for h in dict.fromkeys(hosts)
+                       if self._cacheable(h) and h.lower() not in self._inflight
+                       and (self._entries.get(h.lower()) or (0,))[0] <= now]
+            if not pending:
+                return 0
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.prefetch_workers,
+                                                thread_name_prefix='dns-prefetch')
+            self.prefetched += len(pending)
+        for host in pending:
+            self._pool.submit(self._prefetch_one, host)
+        return len(pending)
+
+    def _prefetch_one(self, host):
+        try:
+            self.resolve(host)
+        except (socket.gaierror, OSError):
+            pass
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self._entries), 'hits': self.hits,
+                    'misses': self.misses, 'prefetched': self.prefetched}
+
+
+_DNS_CACHE = None
+_install_lock = threading.Lock()
+
+
+def install_dns_cache(**kwargs):
+    """Install the process-wide DNSCache (once) and return it."""
+    global _DNS_CACHE
+    with _install_lock:
+        if _DNS_CACHE is None:
+            _DNS_CACHE = DNSCache(**kwargs)
+            _DNS_CACHE.install()
+        return _DNS_CACHE
+
+
+def uninstall_dns_cache():
+    """Restore the system getaddrinfo and drop the process-wide DNSCache."""
+    global _DNS_CACHE
+    with _install_lock:
+        if _DNS_CACHE is not None:
+            _DNS_CACHE.uninstall()
+            _DNS_CACHE = None
+
+
+def get_dns_cache():
+    """The installed DNSCache, or None."""
+    return _DNS_CACHE
@@ -153,7 +153,13 @@ def test_proxy(proxy, timeout=3):
 def main():
     parser = argparse.ArgumentParser(description="Proxy checker with threading and timeout options.")
     parser.add_argument('--threads', type=int, default=5, help='Number of threads for proxy testing (default: 5)')
+    parser.add_argument('--dns-cache', action='store_true', help='Cache DNS lookups and pre-resolve proxy hostnames before testing')
     args = parser.parse_args()
+    dns_cache = None
+    if args.dns_cache:
+        # dnscache has no import-time side effects (unlike siphon, which installs signal handlers)
+        from dnscache import install_dns_cache
+        dns_cache = install_dns_cache(prefetch_workers=max(8, args.threads))
     all_proxies = []
     with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
         download_futures = [executor.submit(download_proxy_list, url) for url in PROXY_URLS]
@@ -162,6 +168,10 @@ def main():
             all_proxies.extend(proxies)
     unique_proxies = list(set(all_proxies))
     print(f"Total unique proxies to test: {len(unique_proxies)}")
+    if dns_cache:
+        # Hostname proxies resolve in the background while the first tests run
+        hosts = {clean.split(':')[0] for clean, _ in map(clean_proxy, unique_proxies) if clean}
+        print(f"Pre-resolving {dns_cache.prefetch(hosts)} proxy hostnames")
     working_proxies = []
     working_lock = threading.Lock()
     def test_and_collect(proxy):
@@ -213,6 +223,11 @@ def main():
     
     print(f"Found {len(working_proxies)} working proxies, saved top {len(top_n)} to proxies.txt")
     print(f"Detailed info saved to proxies_detailed.txt")
+    if dns_cache:
+        stats = dns_cache.stats()
+        print(f"DNS cache: {stats['hits']} hits, {stats['misses']} lookups")
+        from dnscache import uninstall_dns_cache
+        uninstall_dns_cache()
 
 if __name__ == "__main__":
     main()
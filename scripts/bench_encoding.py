@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Part of the Siphon - Web Data Extraction Tool
+"""
+Benchmark RobustResponse charset detection + decoding on a mixed-charset corpus.
+
+Each page is wrapped in a RobustResponse and its .text is read, once with
+full-body validation of every candidate charset and no host cache (the old
+behaviour) and once with the sampled detector and per-host charset cache.
+Each run reports how many pages decoded to something other than the
+generated source text (undeclared single-byte pages are ambiguous, so the
+host cache can legitimately do better than full validation here).
+
+Pages are generated in several charsets, with and without a declared
+charset, spread over a few hosts:
+
+    python scripts/bench_encoding.py --pages 200 --size-kb 1024
+"""
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import siphon  # noqa: E402
+
+SAMPLES = {
+    'utf-8': 'Grüße, 世界, привет, καλημέρα. ',
+    'windows-1251': 'Съешь же ещё этих мягких французских булок. ',
+    'shift_jis': 'いろはにほへと ちりぬるを わかよたれそ. ',
+    'gbk': '天地玄黄 宇宙洪荒 日月盈昃 辰宿列张. ',
+    'iso-8859-1': 'Voix ambiguë d\'un cœur qui au zéphyr préfère les jattes. '.replace('œ', 'oe'),
+}
+
+
+def make_corpus(pages, size):
+    corpus = []
+    charsets = list(SAMPLES)
+    for i in range(pages):
+        charset = charsets[i % len(charsets)]
+        declared = i % 3 == 0
+        text = SAMPLES[charset] * (size // len(SAMPLES[charset].encode(charset)) + 1)
+        html = f"<html><head><title>{i}</title></head><body><p>{text}</p></body></html>"
+        content_type = f"text/html; charset={charset}" if declared else "text/html"
+        host = f"{charset}-{i % 4}.example"
+        corpus.append((f"http://{host}/page{i}.html", content_type, html.encode(charset), html))
+    return corpus
+
+
+def run(corpus, rounds, sample):
+    """Return (pages/sec, pages decoded incorrectly)."""
+    siphon.RobustResponse.ENCODING_SAMPLE = sample
+    siphon._HOST_CHARSETS.clear()
+    wrong = set()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for url, content_type, body, html in corpus:
+            if sample is None:
+                siphon._HOST_CHARSETS.clear()
+            shim = SimpleNamespace(status_code=200, headers={'content-type': content_type})
+            if siphon.RobustResponse(body, shim, url).text != html:
+                wrong.add(url)
+    return len(corpus) * rounds / (time.perf_counter() - start), len(wrong)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sampled charset detection.")
+    parser.add_argument('--pages', type=int, default=100, help='Pages in the generated corpus (default: 100)')
+    parser.add_argument('--size-kb', type=int, default=512, help='Approximate page size in KB (default: 512)')
+    parser.add_argument('--rounds', type=int, default=3, help='Passes over the corpus (default: 3)')
+    parser.add_argument('--sample-kb', type=int, default=64, help='Validation sample in KB (default: 64)')
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.pages, args.size_kb * 1024)
+    print(f"Corpus: {len(corpus)} pages, {sum(len(page[2]) for page in corpus) / 1e6:.1f} MB, "
+          f"charsets: {', '.join(SAMPLES)}")
+
+    full_rate, full_wrong = run(corpus, args.rounds, None)
+    sampled_rate, sampled_wrong = run(corpus, args.rounds, args.sample_kb * 1024)
+
+    print(f"{'detector':>10s} {'pages/s':>9s} {'speedup':>8s}  misdecoded")
+    print(f"{'full':>10s} {full_rate:9.1f} {1.0:7.2f}x  {full_wrong}")
+    print(f"{'sampled':>10s} {sampled_rate:9.1f} {sampled_rate / full_rate:7.2f}x  {sampled_wrong}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Part of the Siphon - Web Data Extraction Tool
+"""
+Measure how link extraction scales with --parse-workers.
+
+A fixed number of "fetch" threads call Siphon.extract_links_from_html on a
+corpus of saved pages, first parsing on the threads themselves (the GIL-bound
+baseline) and then through a parse worker pool of each requested size. Link
+sets are checked against the in-thread result.
+
+    python scripts/bench_parse_pool.py saved_pages/ --threads 32 --workers 1,2,4,8,16,32
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import siphon  # noqa: E402
+from bench_parsers import load_corpus  # noqa: E402
+
+
+def run(scraper, pages, base_url, rounds, threads):
+    """Return (pages/sec, links by page)."""
+    work = [page for _ in range(rounds) for page in pages]
+    links = {}
+
+    def extract(page):
+        name, html = page
+        links[name] = scraper.extract_links_from_html(html, base_url)
+
+    # Warm the pool so process start-up is not timed
+    extract(pages[0])
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(extract, work))
+    return len(work) / (time.perf_counter() - start), links
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the process-pool parse stage.")
+    parser.add_argument('corpus', help='Directory of saved .html/.htm pages (searched recursively)')
+    parser.add_argument('--base-url', default='https://example.com/', help='Base URL used to resolve relative links')
+    parser.add_argument('--rounds', type=int, default=3, help='Passes over the corpus per configuration (default: 3)')
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 4, help='Fetch threads feeding the parser (default: CPU count)')
+    parser.add_argument('--workers', default=None, help='Comma-separated pool sizes to try (default: powers of two up to CPU count)')
+    parser.add_argument('--parser', choices=siphon.HTML_PARSERS, default='auto', help='HTML parser backend')
+    parser.add_argument('--link-extractor', choices=['tree', 'stream'], default='tree', help='Link extraction mode')
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"No .html/.htm files found under {args.corpus}")
+        return 1
+    if args.workers:
+        sizes = [int(n) for n in args.workers.split(',') if n.strip()]
+    else:
+        cpus = os.cpu_count() or 1
+        sizes = sorted({2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus} | {cpus})
+    print(f"Corpus: {len(pages)} pages, {sum(len(h) for _, h in pages) / 1e6:.1f} MB; "
+          f"{args.threads} fetch threads, {os.cpu_count()} CPUs")
+
+    print(f"{'parse-workers':>13s} {'pages/s':>9s} {'speedup':>8s}  mismatches")
+    baseline_rate = baseline_links = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in [0] + sizes:
+            scraper = siphon.Siphon(base_url=args.base_url, output_dir=tmp, parser=args.parser,
+                                    link_extractor=args.link_extractor, dynamic_mode='never',
+                                    parse_workers=workers)
+            try:
+                rate, links = run(scraper, pages, args.base_url, args.rounds, args.threads)
+            finally:
+                scraper.close()
+            if baseline_rate is None:
+                baseline_rate, baseline_links = rate, links
+            mismatched = sum(1 for name in baseline_links if links[name] != baseline_links[name])
+            label = 'in-thread' if workers == 0 else str(workers)
+            print(f"{label:>13s} {rate:9.1f} {rate / baseline_rate:7.2f}x  {mismatched}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
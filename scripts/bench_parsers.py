@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# Part of the Siphon - Web Data Extraction Tool
+"""
+Benchmark the BeautifulSoup parser backends on a corpus of saved pages.
+
+For each backend this measures parse throughput and parse + Siphon.extract_links
+throughput in pages/sec, and checks that the extracted link sets match
+html.parser. 'lxml-stream' is --link-extractor stream, which never builds a
+tree, so only its combined rate is meaningful.
+
+    python scripts/bench_parsers.py saved_pages/ --base-url https://example.com/
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import siphon  # noqa: E402
+
+
+def load_corpus(path):
+    files = []
+    for pattern in ('**/*.html', '**/*.htm'):
+        files.extend(glob.glob(os.path.join(path, pattern), recursive=True))
+    pages = []
+    for name in sorted(set(files)):
+        with open(name, 'rb') as f:
+            raw = f.read()
+        pages.append((name, raw.decode('utf-8', errors='replace')))
+    return pages
+
+
+def run(scraper, pages, base_url, rounds):
+    """Return (parse pages/sec, parse+extract pages/sec, links by page)."""
+    links = {}
+    parse_s = extract_s = 0.0
+    if scraper.link_extractor == 'stream':
+        # No tree is built: parsing and extraction are one streaming pass
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for name, html in pages:
+                links[name] = scraper.extract_links_from_html(html, base_url)
+        rate = len(pages) * rounds / (time.perf_counter() - start)
+        return rate, rate, links
+    for _ in range(rounds):
+        for name, html in pages:
+            t0 = time.perf_counter()
+            soup = scraper.parse_html(html)
+            t1 = time.perf_counter()
+            links[name] = scraper.extract_links(soup, base_url)
+            parse_s += t1 - t0
+            extract_s += time.perf_counter() - t1
+    n = len(pages) * rounds
+    return n / parse_s, n / (parse_s + extract_s), links
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTML parser backends on saved pages.")
+    parser.add_argument('corpus', help='Directory of saved .html/.htm pages (searched recursively)')
+    parser.add_argument('--base-url', default='https://example.com/', help='Base URL used to resolve relative links')
+    parser.add_argument('--rounds', type=int, default=3, help='Passes over the corpus per backend (default: 3)')
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"No .html/.htm files found under {args.corpus}")
+        return 1
+    print(f"Corpus: {len(pages)} pages, {sum(len(h) for _, h in pages) / 1e6:.1f} MB")
+
+    # label -> (tree builder, link extractor)
+    configs = {'html.parser': ('html.parser', 'tree')}
+    if siphon.LXML_AVAILABLE:
+        configs['lxml'] = ('lxml', 'tree')
+        configs['lxml-stream'] = ('lxml', 'stream')
+    backends = list(configs)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend, (tree_builder, extractor) in configs.items():
+            scraper = siphon.Siphon(base_url=args.base_url, output_dir=tmp, parser=tree_builder,
+                                    link_extractor=extractor, dynamic_mode='never')
+            results[backend] = run(scraper, pages, args.base_url, args.rounds)
+            scraper.close()
+
+    base_parse, base_total, baseline_links = results['html.parser']
+    print(f"{'backend':12s} {'parse p/s':>10s} {'speedup':>8s} {'parse+links p/s':>16s} {'speedup':>8s}  mismatches")
+    for backend in backends:
+        parse_rate, total_rate, links = results[backend]
+        mismatched = [name for name in baseline_links if links[name] != baseline_links[name]]
+        print(f"{backend:12s} {parse_rate:10.1f} {parse_rate / base_parse:7.2f}x "
+              f"{total_rate:16.1f} {total_rate / base_total:7.2f}x  {len(mismatched)}")
+        for name in mismatched[:10]:
+            missing = baseline_links[name] - links[name]
+            extra = links[name] - baseline_links[name]
+            print(f"    {name}: -{len(missing)} +{len(extra)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,17 +18,29 @@ import os
 from collections import deque
 from datetime import datetime
 import hashlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import math
+import heapq
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import warnings
 import threading
 import signal
 import mimetypes
 import tempfile
 import pathlib
+import types
 import base64
 import shutil
 import queue
+import sqlite3
+import zlib
+import codecs
+import mmap
+from email.utils import parsedate_to_datetime
+import atexit
 import threading
+import asyncio
 from datetime import timedelta
 from dataclasses import dataclass
 from enum import Enum
@@ -200,44 +212,267 @@ class BrowserConfig:
 
 # --- Phase 0 helpers: NDJSON events + backoff ---
 class NDJSONEmitter:
-    def __init__(self, sink=None):
+    """
+    NDJSON event sink that keeps formatting and I/O off the crawl threads.
+
+    emit() checks the event's level and sampling rate, stamps the time and
+    appends the raw fields to a deque (append/popleft are atomic, so no lock
+    is taken). A writer thread drains the deque, serialises the events and
+    writes them in large batches to the file or stdout. When max_queue events
+    are already waiting the event is dropped and counted in `dropped`.
+    """
+
+    LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+    # Verbosity of each event type; unknown types are 'info'
+    EVENT_LEVELS = {
+        'fetch_start': 'debug', 'download_start': 'debug', 'proxy_select': 'debug', 'proxy_ok': 'debug',
+        'fetch_ok': 'info', 'download_complete': 'info', 'dynamic_ok': 'info', 'mode_switch': 'info',
+        'circuit_half_open': 'info', 'summary': 'info', 'events_dropped': 'warning',
+        'retry': 'warning', 'proxy_fail': 'warning', 'dynamic_fail': 'warning', 'fetch_fail': 'warning',
+    }
+
+    def __init__(self, sink=None, level='debug', sample=None, max_queue=100000, flush_interval=0.2):
         # sink: path to file, '-' for stdout, or None to disable
         self.sink = sink
-        self.lock = threading.Lock()
+        self.min_level = self.LEVELS[level]
+        # event type -> fraction of events kept, e.g. {'proxy_select': 0.01}
+        self.sample = dict(sample or {})
+        self.max_queue = max(1, int(max_queue))
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.dropped = 0
+        self.dropped_by_event = {}
+        # Only taken on the (rare) drop path
+        self._drop_lock = threading.Lock()
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._closed = False
         self._fh = None
-        if sink and sink not in ('-', ''):
+        self._thread = None
+        if not sink:
+            return
+        if sink in ('-', 'stdout'):
+            self._fh = sys.stdout
+        else:
             # Open append mode, create if missing
             os.makedirs(os.path.dirname(os.path.abspath(sink)), exist_ok=True)
-            self._fh = open(sink, 'a', encoding='utf-8', buffering=1)
+            self._fh = open(sink, 'a', encoding='utf-8', buffering=1 << 16)
+        self._thread = threading.Thread(target=self._run, name='ndjson-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def parse_sample(spec):
+        """
+        Parse 'proxy_select=0.01,fetch_start=0.1' into a rate dict. Raises
+        argparse.ArgumentTypeError on malformed input, so it can serve as an
+        argparse ``type=``.
+        """
+        rates = {}
+        for part in (spec or '').split(','):
+            if not part.strip():
+                continue
+            name, sep, rate = part.partition('=')
+            try:
+                if not sep or not name.strip():
+                    raise ValueError
+                rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+            except ValueError:
+                raise argparse.ArgumentTypeError(
+                    f"invalid sample spec {part.strip()!r}, expected EVENT=RATE (e.g. proxy_select=0.01)")
+        return rates
+
+    def enabled(self, event):
+        """Cheap pre-check so callers can skip building fields for filtered events."""
+        if self._thread is None or self._closed:
+            return False
+        if self.LEVELS[self.EVENT_LEVELS.get(event, 'info')] < self.min_level:
+            return False
+        rate = self.sample.get(event)
+        return rate is None or (rate > 0 and random.random() < rate)
 
     def emit(self, **fields):
-        if not self.sink:
+        if not self.enabled(fields.get('event')):
             return
-        # Ensure timestamp exists and basic hygiene
-        fields.setdefault('ts', datetime.utcnow().isoformat() + 'Z')
-        line = json.dumps(fields, ensure_ascii=False)
-        with self.lock:
-            if self.sink == '-' or self.sink == 'stdout':
-                try:
-                    print(line)
-                except Exception:
-                    pass
-            elif self._fh:
-                self._fh.write(line + "\n")
+        self._push(fields)
+
+    def _push(self, fields):
+        if self._closed:
+            return
+        fields.setdefault('ts', time.time())
+        if len(self._queue) >= self.max_queue:
+            event = fields.get('event')
+            with self._drop_lock:
+                self.dropped += 1
+                self.dropped_by_event[event] = self.dropped_by_event.get(event, 0) + 1
+            return
+        self._queue.append(fields)
+        if len(self._queue) >= 4096:
+            self._wake.set()
+
+    @staticmethod
+    def _format(fields):
+        ts = fields.get('ts')
+        if isinstance(ts, float):
+            fields['ts'] = datetime.utcfromtimestamp(ts).isoformat() + 'Z'
+        return json.dumps(fields, ensure_ascii=False)
+
+    def _drain(self):
+        lines = []
+        queue_ = self._queue
+        while queue_:
+            try:
+                fields = queue_.popleft()
+            except IndexError:
+                break
+            try:
+                lines.append(self._format(fields))
+            except Exception:
+                pass
+        if lines and self._fh:
+            try:
+                self._fh.write("\n".join(lines) + "\n")
+                self._fh.flush()
+            except Exception:
+                pass
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
 
     def close(self):
-        with self.lock:
-            if self._fh:
+        if self._thread is None or self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        with self._drop_lock:
+            dropped, by_event = self.dropped, dict(self.dropped_by_event)
+        if dropped:
+            # Bypasses level/sampling so the loss is always recorded
+            self._queue.append({'event': 'events_dropped', 'ts': time.time(), 'count': dropped,
+                                'by_event': by_event})
+        self._drain()
+        if self._fh is not None and self._fh is not sys.stdout:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+        self._fh = None
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
+class BatchedLineWriter:
+    """
+    Append-only line writer that batches records on a background thread.
+
+    write() only appends to an in-memory buffer; the writer thread flushes
+    the buffer every flush_interval seconds, or as soon as batch_size lines
+    are waiting, with a single write() call. fsync policy: 'none' leaves
+    durability to the OS, 'batch' fsyncs after every flush, 'close' fsyncs
+    once on close(). close() (also run at interpreter exit, e.g. after
+    Ctrl+C) drains everything still buffered.
+    """
+
+    FSYNC_POLICIES = ('none', 'batch', 'close')
+
+    def __init__(self, path, flush_interval=1.0, batch_size=1000, fsync='close', name='line-writer'):
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {self.FSYNC_POLICIES}, got {fsync!r}")
+        self.path = path
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.batch_size = max(1, int(batch_size))
+        self.fsync = fsync
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fh = open(path, 'a', encoding='utf-8')
+        self._buffer = []
+        self._cond = threading.Condition()
+        # Serialises buffer swap + file write so batches land in order
+        self._io_lock = threading.Lock()
+        self._closed = False
+        self.lines_written = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, line):
+        with self._cond:
+            if self._closed:
+                return False
+            self._buffer.append(line)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self):
+        """Write out everything buffered so far (synchronously)."""
+        with self._io_lock:
+            with self._cond:
+                batch, self._buffer = self._buffer, []
+            if not batch or self._fh is None:
+                return
+            try:
+                self._fh.write("\n".join(batch) + "\n")
+                self._fh.flush()
+                if self.fsync == 'batch':
+                    os.fsync(self._fh.fileno())
+                self.lines_written += len(batch)
+            except Exception as e:
+                logging.debug(f"Failed to write {len(batch)} lines to {self.path}: {e}")
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+        with self._io_lock:
+            if self._fh is not None:
                 try:
-                    self._fh.flush()
+                    if self.fsync != 'none':
+                        os.fsync(self._fh.fileno())
                     self._fh.close()
                 except Exception:
                     pass
                 self._fh = None
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
 
 def _retryable_http(status_code):
     return status_code in (408, 425, 429, 500, 502, 503, 504)
 
+def _parse_retry_after(value):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        from email.utils import parsedate_to_datetime
+        when = parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except Exception:
+        return None
+
 def _backoff_with_jitter(attempt, base_ms):
     # attempt: 0-based attempt index
     base = max(1, int(base_ms))
@@ -246,6 +481,98 @@ def _backoff_with_jitter(attempt, base_ms):
     jitter = random.randint(0, max(50, int(0.2 * delay_ms)))
     return (delay_ms + jitter) / 1000.0
 
+# --- Frontier helpers: bounded-memory URL seen-set ---
+class _BloomLayer:
+    __slots__ = ('bits', 'm', 'k', 'capacity', 'count')
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        # Whole hash count first, then the bits that hold (1 - e^(-kn/m))^k to
+        # error_rate at capacity; rounding k from the optimal m overshoots it
+        self.k = max(1, int(math.ceil(-math.log2(error_rate))))
+        self.m = max(8, int(math.ceil(-self.k * capacity / math.log(1 - error_rate ** (1 / self.k)))))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0
+
+    def positions(self, h1, h2):
+        m = self.m
+        return [(h1 + i * h2) % m for i in range(self.k)]
+
+    def contains(self, h1, h2):
+        bits = self.bits
+        for pos in self.positions(h1, h2):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def add(self, h1, h2):
+        bits = self.bits
+        for pos in self.positions(h1, h2):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+
+class URLSeenSet:
+    """
+    Thread-safe scalable Bloom filter used to de-duplicate URLs.
+
+    Unlike the old LRU-evicting OrderedDict it never forgets a URL. Each layer
+    is sized for its capacity at a fraction of ``error_rate``; when a layer
+    fills, a new one twice as large with half the error rate is added. The
+    layers' rates sum to at most half of ``error_rate``, so the measured
+    false-positive rate stays under ``error_rate`` (a ceiling, not a target)
+    as the crawl grows. At the default 0.1% rate this costs roughly 2.2 bytes
+    per URL.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.initial_capacity = max(1000, int(capacity))
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self._layers = []
+        self._count = 0
+        self._add_layer()
+
+    def _add_layer(self):
+        n = len(self._layers)
+        capacity = self.initial_capacity * (2 ** n)
+        # Geometric series: error_rate/4 + error_rate/8 + ... < error_rate/2. The
+        # halved budget keeps the measured rate under error_rate, not just its expectation
+        self._layers.append(_BloomLayer(capacity, self.error_rate * (0.5 ** (n + 2))))
+
+    @staticmethod
+    def _hashes(url):
+        digest = hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def __contains__(self, url):
+        h1, h2 = self._hashes(url)
+        with self.lock:
+            return any(layer.contains(h1, h2) for layer in self._layers)
+
+    def add(self, url):
+        """Add a URL; returns True if it was not seen before."""
+        h1, h2 = self._hashes(url)
+        with self.lock:
+            if any(layer.contains(h1, h2) for layer in self._layers):
+                return False
+            layer = self._layers[-1]
+            if layer.count >= layer.capacity:
+                self._add_layer()
+                layer = self._layers[-1]
+            layer.add(h1, h2)
+            self._count += 1
+            return True
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def memory_bytes(self):
+        return sum(len(layer.bits) for layer in self._layers)
+
 # New imports for dynamic scraping
 try:
     from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
@@ -253,6 +580,581 @@ try:
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
 
+# lxml is much faster than the pure-Python 'html.parser' tree builder
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+HTML_PARSERS = ['html.parser', 'lxml', 'auto']
+
+def _resolve_html_parser(name='html.parser'):
+    """
+    Map a --parser choice to a BeautifulSoup tree builder name. The default
+    stays html.parser (lxml builds slightly different trees from broken
+    markup); 'auto' opts into lxml when it is installed.
+    """
+    if name in (None, ''):
+        return 'html.parser'
+    if name == 'auto':
+        return 'lxml' if LXML_AVAILABLE else 'html.parser'
+    if name == 'lxml' and not LXML_AVAILABLE:
+        logging.warning("lxml not available, falling back to html.parser")
+        return 'html.parser'
+    return name
+
+# Optional async HTTP client for the single-event-loop crawl engine
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Shared DNS cache (--dns-cache); its own module so it imports without side effects
+from dnscache import DNSCache, install_dns_cache, uninstall_dns_cache, get_dns_cache, DNSPYTHON_AVAILABLE  # noqa: F401
+
+# --- Link extraction: single pass over the tree, or streaming without a tree ---
+_ONCLICK_URL_RE = re.compile(r"(?:location\.href|window\.location|document\.location)\s*=\s*['\"]([^'\"]+)['\"]")
+_JS_URL_RE = re.compile(r'["\']https?://[^"\']+["\']')
+_META_REFRESH_URL_RE = re.compile(r'url\s*=\s*[\'"]?([^\'" >]+)', re.I)
+_REFRESH_RE = re.compile(r'refresh', re.I)
+_LINK_DATA_ATTRS = ('data-href', 'data-url', 'data-link', 'data-target', 'data-src')
+_MEDIA_TAGS = ('video', 'audio')
+
+
+class _LinkSink:
+    """
+    Collects absolute http(s) links from one page. Both extractors feed it
+    tag-by-tag, so they share the exact same dispatch rules:
+    <a>/<link> href, onclick location changes, data-* URL attributes,
+    <iframe>/<script> src, <img> src/srcset, <video>/<audio> and nested
+    <source> src, meta refresh, the first <base> href and URLs in inline
+    scripts.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.links = set()
+        self.base_seen = False
+
+    def add(self, url_str):
+        if not url_str or not isinstance(url_str, str):
+            return
+        url_str = url_str.strip()
+        if not url_str or url_str.startswith(('#', 'javascript:', 'mailto:', 'tel:', 'data:')):
+            return
+        try:
+            absolute_url = urllib.parse.urljoin(self.base_url, url_str)
+            absolute_url = urllib.parse.urldefrag(absolute_url)[0]
+            if absolute_url.startswith(('http://', 'https://')):
+                self.links.add(absolute_url)
+        except Exception as e:
+            logging.debug(f"Could not process link '{url_str}': {e}")
+
+    def tag(self, name, attrs, in_media=False):
+        add = self.add
+        get = attrs.get
+        if name == 'a' or name == 'link':
+            add(get('href'))
+        onclick = get('onclick')
+        if onclick is not None:
+            for match in _ONCLICK_URL_RE.findall(onclick):
+                add(match)
+        for attr in _LINK_DATA_ATTRS:
+            value = get(attr)
+            if value is not None:
+                add(value)
+        if name == 'img':
+            srcset = get('srcset')
+            if srcset is not None:
+                # srcset format: "url1 1x, url2 2x" or "url1 100w, url2 200w"
+                for item in srcset.split(','):
+                    parts = item.split()
+                    if parts:
+                        add(parts[0])
+            add(get('src'))
+        elif name in ('iframe', 'script') or name in _MEDIA_TAGS:
+            add(get('src'))
+        elif name == 'source' and in_media:
+            add(get('src'))
+        elif name == 'meta':
+            http_equiv = get('http-equiv')
+            if http_equiv and _REFRESH_RE.search(http_equiv):
+                # Format: "5; url=http://example.com"
+                url_match = _META_REFRESH_URL_RE.search(get('content') or '')
+                if url_match:
+                    add(url_match.group(1))
+        elif name == 'base' and not self.base_seen and get('href') is not None:
+            self.base_seen = True
+            add(get('href'))
+
+    def script_text(self, text):
+        if text:
+            for match in _JS_URL_RE.finditer(text):
+                self.add(match.group(0).strip('"\''))
+
+
+def _extract_links_from_soup(soup, base_url):
+    """Extract links from a parsed BeautifulSoup tree in a single traversal."""
+    sink = _LinkSink(base_url)
+    for tag in soup.find_all(True):
+        name = tag.name
+        in_media = name == 'source' and tag.find_parent(_MEDIA_TAGS) is not None
+        sink.tag(name, tag.attrs, in_media)
+        if name == 'script':
+            sink.script_text(tag.string)
+    return sink.links
+
+
+class _StreamingLinkTarget:
+    """lxml parser target that feeds _LinkSink from SAX-style events."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.media_depth = 0
+        self.script_parts = None
+
+    def start(self, tag, attrib):
+        name = tag.lower() if isinstance(tag, str) else ''
+        self.sink.tag(name, attrib, self.media_depth > 0)
+        if name in _MEDIA_TAGS:
+            self.media_depth += 1
+        elif name == 'script':
+            self.script_parts = []
+
+    def end(self, tag):
+        name = tag.lower() if isinstance(tag, str) else ''
+        if name in _MEDIA_TAGS:
+            self.media_depth = max(0, self.media_depth - 1)
+        elif name == 'script' and self.script_parts is not None:
+            self.sink.script_text(''.join(self.script_parts))
+            self.script_parts = None
+
+    def data(self, data):
+        if self.script_parts is not None:
+            self.script_parts.append(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return self.sink.links
+
+
+def _extract_links_streaming(html_content, base_url):
+    """Extract links with lxml's event parser; no document tree is built."""
+    from lxml import etree
+    target = _StreamingLinkTarget(_LinkSink(base_url))
+    parser = etree.HTMLParser(target=target, recover=True)
+    try:
+        parser.feed(html_content)
+        return parser.close()
+    except etree.LxmlError as e:
+        logging.debug(f"Streaming link extraction stopped early for {base_url}: {e}")
+        return target.sink.links
+
+
+# --- Parse worker processes (--parse-workers) ---
+def _parse_worker_init():
+    """Leave Ctrl+C to the parent; it shuts the pool down on exit."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _parse_links_in_process(html_content, base_url, parser, link_extractor):
+    """
+    Parse one page and extract its links inside a worker process. Only the
+    raw HTML goes in and a compact, sorted link list comes back; the tree
+    never crosses the process boundary.
+    """
+    if link_extractor == 'stream' and LXML_AVAILABLE:
+        return sorted(_extract_links_streaming(html_content, base_url))
+    try:
+        soup = BeautifulSoup(html_content, parser)
+    except Exception as e:
+        logging.error(f"Error parsing HTML: {str(e)}")
+        return []
+    return sorted(_extract_links_from_soup(soup, base_url))
+
+
+def _make_parse_pool(workers):
+    """Process pool for the parse stage; spawned so no crawler threads or locks are forked."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_parse_worker_init)
+
+# --- Resumable downloads: .part file + JSON sidecar, resumed with Range/If-Range ---
+class PartialDownload:
+    """
+    In-progress download of one URL under <downloads>/.partial/.
+
+    Bytes go to <key>.part; <key>.json records the URL, ETag, Last-Modified
+    and bytes so far. A later attempt (retry or next run) sends Range plus
+    If-Range with the stored validator: a 206 appends to the .part file, a
+    200 means the resource changed (or ranges are unsupported) and restarts
+    from zero. The sha256 is updated as bytes arrive, so completing a
+    download never re-reads it; only a partial left by an earlier run is
+    hashed once on resume. finish() renames the .part into place atomically.
+
+    Offsets count bytes as written, i.e. after any Content-Encoding has been
+    decoded, while Range addresses the encoded representation. Download
+    requests therefore ask for Accept-Encoding: identity (IDENTITY_HEADERS),
+    and a response that is content-encoded anyway is never made resumable.
+    """
+
+    IDENTITY_HEADERS = {'Accept-Encoding': 'identity'}
+
+    CHECKPOINT_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, downloads_dir, url):
+        self.url = url
+        self.dir = os.path.join(downloads_dir, '.partial')
+        key = hashlib.sha1(url.encode('utf-8', errors='replace')).hexdigest()
+        self.part_path = os.path.join(self.dir, key + '.part')
+        self.meta_path = os.path.join(self.dir, key + '.json')
+        self.etag = None
+        self.last_modified = None
+        self.offset = 0
+        self.sha = hashlib.sha256()
+        self.resumable = True
+        self._fh = None
+        self._since_checkpoint = 0
+        self._load()
+
+    def _load(self):
+        """Adopt a partial from an earlier run if its sidecar carries a validator."""
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as fh:
+                meta = json.load(fh)
+            size = os.path.getsize(self.part_path)
+        except (OSError, ValueError):
+            self._discard_files()
+            return
+        if meta.get('url') != self.url or not (meta.get('etag') or meta.get('last_modified')) or size <= 0:
+            self._discard_files()
+            return
+        self.etag = meta.get('etag')
+        self.last_modified = meta.get('last_modified')
+        with open(self.part_path, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b''):
+                self.sha.update(chunk)
+        self.offset = size
+        logging.info(f"Resuming {self.url} from byte {size}")
+
+    def _discard_files(self):
+        for path in (self.part_path, self.meta_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def request_headers(self):
+        """Range/If-Range headers for the next attempt ({} when starting fresh)."""
+        validator = self.etag or self.last_modified
+        if self.offset <= 0 or not validator:
+            return {}
+        return dict(self.IDENTITY_HEADERS, **{'Range': f'bytes={self.offset}-', 'If-Range': validator})
+
+    def begin(self, status_code, headers):
+        """Open the .part file for a response: append on a matching 206, else restart."""
+        self.close()
+        resumed = False
+        if status_code == 206 and self.offset > 0:
+            match = re.match(r'\s*bytes\s+(\d+)-', headers.get('Content-Range', '') or '')
+            resumed = bool(match) and int(match.group(1)) == self.offset
+        if not resumed:
+            self.offset = 0
+            self.sha = hashlib.sha256()
+        etag = headers.get('ETag')
+        # Weak ETags are not usable with If-Range
+        self.etag = etag if etag and not etag.startswith('W/') else None
+        self.last_modified = headers.get('Last-Modified')
+        self.resumable = headers.get('Content-Encoding', 'identity').strip().lower() in ('', 'identity')
+        if not self.resumable:
+            # Decoded byte counts can't be turned into a Range: no sidecar, no resume
+            self.etag = self.last_modified = None
+            self._remove_meta()
+        os.makedirs(self.dir, exist_ok=True)
+        self._fh = open(self.part_path, 'ab' if resumed else 'wb')
+        self._save_meta()
+        return resumed
+
+    def write(self, chunk):
+        self._fh.write(chunk)
+        self.sha.update(chunk)
+        self.offset += len(chunk)
+        self._since_checkpoint += len(chunk)
+        if self._since_checkpoint >= self.CHECKPOINT_BYTES:
+            self._fh.flush()
+            self._save_meta()
+
+    def _save_meta(self):
+        self._since_checkpoint = 0
+        if not self.resumable:
+            return
+        tmp = self.meta_path + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as fh:
+                json.dump({'url': self.url, 'etag': self.etag, 'last_modified': self.last_modified,
+                           'bytes': self.offset}, fh)
+            os.replace(tmp, self.meta_path)
+        except OSError as e:
+            logging.debug(f"Failed to write download sidecar for {self.url}: {e}")
+
+    def close(self):
+        """Close the .part file, keeping it (and the sidecar) for a later resume."""
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            finally:
+                self._fh = None
+                self._save_meta()
+
+    def reset(self):
+        """Forget the partial (e.g. after 416 Range Not Satisfiable)."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self._discard_files()
+        self.etag = self.last_modified = None
+        self.offset = 0
+        self.sha = hashlib.sha256()
+
+    def preallocate(self, total):
+        """Create a .part file of `total` bytes for out-of-order (pwrite) writes; returns its fd."""
+        self.reset()
+        os.makedirs(self.dir, exist_ok=True)
+        fd = os.open(self.part_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(fd, 0, total)
+            else:
+                os.ftruncate(fd, total)
+        except OSError:
+            os.ftruncate(fd, total)
+        return fd
+
+    def finish_assembled(self, final_path=None):
+        """Hash a .part assembled by preallocate()+pwrite, then move it into place."""
+        self.sha = hashlib.sha256()
+        self.offset = 0
+        with open(self.part_path, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b''):
+                self.sha.update(chunk)
+                self.offset += len(chunk)
+        if final_path:
+            os.replace(self.part_path, final_path)
+            self._discard_files()
+        else:
+            self._remove_meta()
+        return self.sha.hexdigest(), self.offset
+
+    def finish(self, final_path=None):
+        """
+        Atomically move the completed file into place; returns (sha256 hex, bytes).
+        Without final_path the finished file stays at part_path for the caller to move.
+        """
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+        self._fh = None
+        if final_path:
+            os.replace(self.part_path, final_path)
+        self._remove_meta()
+        return self.sha.hexdigest(), self.offset
+
+    def _remove_meta(self):
+        try:
+            os.remove(self.meta_path)
+        except OSError:
+            pass
+
+# --- MIME probe cache for extensionless links ---
+class MimeProbeCache:
+    """
+    TTL cache of HEAD probe results keyed by URL.
+
+    Each entry keeps the detected content type (None for a failed probe, so
+    failures are not re-probed either), the response headers and the final
+    URL after redirects. With learn_patterns, a (host, path shape) whose
+    first `pattern_min` probes all agreed on a content type answers later
+    URLs of the same shape without a request; path shape replaces digit
+    runs, e.g. /files/123/download -> /files/#/download.
+    """
+
+    _MISS = object()
+
+    def __init__(self, ttl=3600.0, max_entries=100000, learn_patterns=False, pattern_min=3):
+        self.ttl = float(ttl)
+        self.max_entries = max(1, int(max_entries))
+        self.learn_patterns = bool(learn_patterns)
+        self.pattern_min = max(1, int(pattern_min))
+        from collections import OrderedDict
+        self._entries = OrderedDict()   # url -> (expires, content_type, headers, final_url)
+        self._patterns = {}             # (host, shape) -> (content_type, count) or None when mixed
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.pattern_hits = 0
+
+    @staticmethod
+    def _shape(url):
+        parsed = urllib.parse.urlparse(url)
+        query_keys = ','.join(sorted(k for k, _ in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)))
+        return parsed.netloc, re.sub(r'\d+', '#', parsed.path) + '?' + query_keys
+
+    def get(self, url):
+        """Cached content type (possibly None), or MimeProbeCache._MISS."""
+        now = time.time()
+        with self.lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(url)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[url]
+            if self.learn_patterns:
+                learned = self._patterns.get(self._shape(url))
+                if learned and learned[1] >= self.pattern_min:
+                    self.pattern_hits += 1
+                    return learned[0]
+            self.misses += 1
+            return self._MISS
+
+    def headers(self, url):
+        """Headers of a live probe of this URL, if any."""
+        with self.lock:
+            entry = self._entries.get(url)
+            if entry is not None and entry[0] > time.time():
+                return entry[2]
+        return None
+
+    def put(self, url, content_type, headers=None, final_url=None):
+        with self.lock:
+            self._entries[url] = (time.time() + self.ttl, content_type, headers or {}, final_url or url)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.learn_patterns and content_type:
+                key = self._shape(url)
+                if key not in self._patterns:
+                    self._patterns[key] = (content_type, 1)
+                elif self._patterns[key] is not None:
+                    known, count = self._patterns[key]
+                    # A disagreement disables the shape for good
+                    self._patterns[key] = (known, count + 1) if known == content_type else None
+
+
+# --- Download worker pool (--download-threads) ---
+class DownloadPool:
+    """
+    Fixed set of download threads fed by a bounded queue, so crawl workers
+    hand off file transfers and return to the frontier straight away.
+
+    submit() blocks while the queue is full, which throttles page discovery
+    to what the downloaders can absorb. A reporter thread logs crawl and
+    download progress every report_interval seconds while work is pending.
+    """
+
+    def __init__(self, siphon, workers=4, max_queue=1000, report_interval=10.0):
+        self.siphon = siphon
+        self.workers = max(1, int(workers))
+        self.queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self.report_interval = report_interval
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.active = 0
+        # URLs queued or downloading; several pages linking one file queue it once
+        self.in_flight = set()
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(target=self._run, name=f'download-{i + 1}', daemon=True)
+                         for i in range(self.workers)]
+        for t in self._threads:
+            t.start()
+        self._reporter = threading.Thread(target=self._report_loop, name='download-progress', daemon=True)
+        self._reporter.start()
+
+    def submit(self, url):
+        """
+        Queue a download, waiting for room (backpressure). False if shutting
+        down, or if url is already downloaded, queued or being downloaded.
+        """
+        if self.siphon._is_downloaded(url):
+            return False
+        with self.lock:
+            if url in self.in_flight:
+                return False
+            self.in_flight.add(url)
+        if self.siphon.state_store:
+            # Persisted before the page is marked visited, so --resume picks it up
+            self.siphon.state_store.record_download_queued(url)
+        while not (shutdown_flag.is_set() or self._stop.is_set()):
+            try:
+                self.queue.put(url, timeout=0.5)
+            except queue.Full:
+                continue
+            with self.lock:
+                self.submitted += 1
+            return True
+        with self.lock:
+            self.in_flight.discard(url)
+        return False
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                url = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                if shutdown_flag.is_set():
+                    continue
+                with self.lock:
+                    self.active += 1
+                try:
+                    self.siphon.download_file(url)
+                except Exception as e:
+                    logging.error(f"Download worker error for {url}: {e}")
+                finally:
+                    # Completed downloads leave the queue via record_download; an
+                    # interrupted one stays queued for --resume
+                    if self.siphon.state_store and not shutdown_flag.is_set():
+                        self.siphon.state_store.record_download_dequeued(url)
+                    with self.lock:
+                        self.active -= 1
+                        self.completed += 1
+            finally:
+                with self.lock:
+                    self.in_flight.discard(url)
+                self.queue.task_done()
+
+    def progress(self):
+        with self.lock:
+            return {'submitted': self.submitted, 'completed': self.completed,
+                    'active': self.active, 'queued': self.queue.qsize()}
+
+    def _report_loop(self):
+        while not self._stop.wait(self.report_interval):
+            p = self.progress()
+            if p['submitted'] == p['completed']:
+                continue
+            s = self.siphon
+            logging.info(f"Progress: {s.pages_crawled} pages crawled, {s.url_queue.qsize()} in frontier | "
+                         f"downloads {p['completed']}/{p['submitted']} done, {p['active']} active, {p['queued']} waiting")
+
+    def join(self):
+        """Wait until every submitted download has finished (or shutdown is requested)."""
+        while not shutdown_flag.is_set():
+            with self.queue.all_tasks_done:
+                if not self.queue.unfinished_tasks:
+                    return
+                self.queue.all_tasks_done.wait(0.5)
+
+    def close(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=0 if shutdown_flag.is_set() else 5)
+
+
 def print_logo():
     logo = """
      ╔═╗╦╔═╗╦ ╦╔═╗╔╗╔
@@ -519,97 +1421,392 @@ DUMP_ALL_EXTENSIONS = [
     'exe', 'dll', 'so', 'dylib', 'app', 'pkg', 'msi'
 ]
 
+# --- HTTP connection pools: sized adapters, one session per proxy ---
+class SessionPool:
+    """
+    Stand-in for a shared requests.Session that keeps one session per proxy.
+
+    requests keys its connection pools by proxy, but with a single session
+    every rotation lands on a proxy whose keep-alive connections have been
+    dropped from the small default pool. Here each proxy (and direct access)
+    gets its own session whose HTTPAdapter keeps pool_maxsize connections
+    per host for up to pool_connections hosts; the least recently used
+    proxy session is closed beyond max_sessions. get()/head() route on the
+    proxies= argument; headers, cookies and auth set on the pool apply to
+    every session. stats() reports connection reuse from urllib3's
+    per-pool num_connections/num_requests counters.
+    """
+
+    def __init__(self, pool_maxsize=10, pool_connections=10, max_sessions=64):
+        from collections import OrderedDict
+        self.pool_maxsize = max(1, int(pool_maxsize))
+        self.pool_connections = max(1, int(pool_connections))
+        self.max_sessions = max(1, int(max_sessions))
+        self.headers = requests.utils.default_headers()
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self.auth = None
+        self.lock = threading.Lock()
+        self._sessions = OrderedDict()   # proxy URL ('' = direct) -> Session
+        # Counters of pools already gone (evicted sessions)
+        self._retired = {'connections': 0, 'requests': 0}
+
+    @staticmethod
+    def _proxy_key(proxies):
+        if not proxies:
+            return ''
+        return proxies.get('https') or proxies.get('http') or ''
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=self.pool_connections,
+                                                pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        # Share header/cookie state with the pool rather than copying it
+        session.headers = self.headers
+        session.cookies = self.cookies
+        session.auth = self.auth
+        return session
+
+    def session_for(self, proxies=None):
+        key = self._proxy_key(proxies)
+        evicted = None
+        with self.lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self._new_session()
+                if len(self._sessions) > self.max_sessions:
+                    _, evicted = self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(key)
+        if evicted is not None:
+            self._retire(evicted)
+        return session
+
+    def get(self, url, **kwargs):
+        return self.session_for(kwargs.get('proxies')).get(url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.session_for(kwargs.get('proxies')).head(url, **kwargs)
+
+    @staticmethod
+    def _connection_pools(session):
+        adapters = {id(a): a for a in session.adapters.values()}.values()
+        for adapter in adapters:
+            managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+            for manager in managers:
+                if manager is None:
+                    continue
+                for key in list(manager.pools.keys()):
+                    pool = manager.pools.get(key)
+                    if pool is not None:
+                        yield pool
+
+    def _counts(self, session):
+        connections = requests_made = 0
+        for pool in self._connection_pools(session):
+            connections += pool.num_connections
+            requests_made += pool.num_requests
+        return connections, requests_made
+
+    def _retire(self, session):
+        connections, requests_made = self._counts(session)
+        with self.lock:
+            self._retired['connections'] += connections
+            self._retired['requests'] += requests_made
+        session.close()
+
+    def stats(self):
+        """
+        Per-session {'connections', 'requests', 'reuse'} keyed by proxy URL
+        ('direct' for none), plus 'total' including evicted sessions. reuse
+        is the share of requests that did not open a new connection (and so
+        skipped a TCP/TLS handshake).
+        """
+        with self.lock:
+            sessions = list(self._sessions.items())
+            total = dict(self._retired)
+        report = {}
+        for key, session in sessions:
+            connections, requests_made = self._counts(session)
+            total['connections'] += connections
+            total['requests'] += requests_made
+            report[key or 'direct'] = {'connections': connections, 'requests': requests_made,
+                                       'reuse': _reuse_ratio(connections, requests_made)}
+        total['reuse'] = _reuse_ratio(total['connections'], total['requests'])
+        report['total'] = total
+        return report
+
+    def log_stats(self):
+        report = self.stats()
+        total = report.pop('total')
+        if not total['requests']:
+            return
+        logging.info(f"Connection reuse: {total['reuse']:.0%} ({total['connections']} connections "
+                     f"for {total['requests']} requests over {len(report)} session(s))")
+        for key, entry in report.items():
+            logging.debug(f"  {key}: {entry['reuse']:.0%} ({entry['connections']}/{entry['requests']})")
+
+    def preconnect(self, url, proxies=None, verify=True, timeout=5):
+        """
+        Open a keep-alive connection (TCP, TLS or proxy tunnel) to url's
+        origin and park it in the pool the next request will draw from, so
+        that request skips the handshakes. No HTTP request is sent. Returns
+        True if a connection was opened.
+        """
+        session = self.session_for(proxies)
+        try:
+            adapter = session.get_adapter(url)
+            # Same verify/proxy settings a request would get (CA bundle env vars
+            # change the pool key), so the connection lands in the right pool
+            settings = session.merge_environment_settings(url, proxies or {}, False, verify, None)
+            if hasattr(adapter, 'get_connection_with_tls_context'):
+                prepared = requests.Request('GET', url).prepare()
+                pool = adapter.get_connection_with_tls_context(prepared, settings['verify'],
+                                                               proxies=settings['proxies'], cert=settings['cert'])
+            else:
+                pool = adapter.get_connection(url, settings['proxies'])
+            if pool.num_connections:
+                return False   # already warm (or in use)
+            conn = pool._get_conn()
+            try:
+                conn.timeout = timeout
+                conn.connect()
+            except Exception:
+                conn.close()
+                pool._put_conn(conn)
+                raise
+            pool._put_conn(conn)
+            return True
+        except Exception as e:
+            logging.debug(f"Pre-connect to {url} failed: {e}")
+            return False
+
+    def close(self):
+        with self.lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            self._retire(session)
+
+
+def _reuse_ratio(connections, requests_made):
+    return max(0.0, 1.0 - connections / requests_made) if requests_made else 0.0
+
+
+def _pool_maxsize(*concurrent, per_host=0):
+    """
+    Connections to keep per host: enough for every thread that may talk to
+    one host at once (urllib3 otherwise discards the surplus with "Connection
+    pool is full"), capped by per_host when given.
+    """
+    size = max(10, sum(int(n or 0) for n in concurrent))
+    return min(size, int(per_host)) if per_host else size
+
+
+def _url_host(url):
+    try:
+        return urllib.parse.urlsplit(url).hostname
+    except ValueError:
+        return None
+
+
+def _read_body(response, max_bytes):
+    """
+    Read a streamed (stream=True) response body into memory, up to max_bytes.
+
+    Returns (body, truncated). A Content-Length above the cap is rejected
+    before anything is read; otherwise chunks are appended to one bytearray
+    (linear, unlike repeated bytes concatenation) and reading stops as soon
+    as the cap is exceeded. A truncated response is closed and its body is
+    returned empty, so callers never see a partial document.
+    """
+    declared = response.headers.get('Content-Length')
+    if max_bytes and declared and declared.isdigit() and int(declared) > max_bytes:
+        response.close()
+        return b'', True
+    buf = bytearray()
+    for chunk in response.iter_content(chunk_size=65536):
+        buf += chunk
+        if max_bytes and len(buf) > max_bytes:
+            response.close()
+            return b'', True
+    return bytes(buf), False
+
+
+# Content types WebScraper treats as files rather than pages
+_BINARY_CONTENT_TYPES = ('image/', 'application/pdf', 'application/zip',
+                         'video/', 'audio/', 'application/octet-stream')
+
+
+def _is_binary_content_type(content_type):
+    content_type = (content_type or '').lower()
+    return any(t in content_type for t in _BINARY_CONTENT_TYPES)
+
+
+# --- Charset detection ---
+
+# Codecs tried in order when no declared or detected charset validates
+_FALLBACK_ENCODINGS = (
+    'utf-8', 'utf-8-sig',
+    'cp1252', 'windows-1252',
+    'iso-8859-1', 'latin-1',
+    'cp1251', 'windows-1251',
+    'cp1250', 'windows-1250',
+    'iso-8859-2',
+    'iso-8859-15',
+    'gb2312', 'gbk', 'gb18030',
+    'big5', 'cp950',
+    'shift_jis', 'cp932',
+    'euc-jp', 'iso-2022-jp',
+    'euc-kr', 'cp949',
+    'iso-8859-5',
+    'iso-8859-7',
+    'iso-8859-8',
+    'iso-8859-9',
+    'utf-16', 'utf-16le', 'utf-16be',
+    'utf-32', 'utf-32le', 'utf-32be',
+    'ascii',
+)
+
+
+def _decodes_prefix(content, charset, sample_size):
+    """
+    True if the first sample_size bytes of content are valid in charset.
+
+    The sample is fed to an incremental decoder with final=False when the
+    body continues past the cut, so a multibyte sequence split by the cut is
+    held back as pending input instead of being reported as an error.
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(charset)()
+    except (LookupError, TypeError):
+        return False
+    whole = sample_size is None or len(content) <= sample_size
+    try:
+        decoder.decode(content if whole else content[:sample_size], final=whole)
+    except (UnicodeDecodeError, ValueError):
+        return False
+    return True
+
+
+class HostCharsetCache:
+    """
+    Charset most recently chosen for each host, tried before chardet and
+    the fallback list. Bounded LRU; thread-safe.
+    """
+
+    def __init__(self, max_hosts=4096):
+        from collections import OrderedDict
+        self.max_hosts = max_hosts
+        self._charsets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, host):
+        with self._lock:
+            charset = self._charsets.get(host)
+            if charset is not None:
+                self._charsets.move_to_end(host)
+            return charset
+
+    def put(self, host, charset):
+        with self._lock:
+            self._charsets[host] = charset
+            self._charsets.move_to_end(host)
+            while len(self._charsets) > self.max_hosts:
+                self._charsets.popitem(last=False)
+
+    def discard(self, host, charset):
+        """Forget host's charset if it is still the given one."""
+        with self._lock:
+            if self._charsets.get(host) == charset:
+                del self._charsets[host]
+
+    def clear(self):
+        with self._lock:
+            self._charsets.clear()
+
+
+_HOST_CHARSETS = HostCharsetCache()
+
+
 class RobustResponse:
 
-    def __init__(self, raw_content, original_response, url):
+    def __init__(self, raw_content, original_response, url, truncated=False, streamed=None):
         self.raw_content = raw_content
         self.url = url
         self.status_code = original_response.status_code
         self.headers = original_response.headers
+        # True when the body was not read because it exceeded the size cap
+        self.truncated = truncated
+        # Metadata from the binary handler when the body went to disk instead of memory
+        self.streamed = streamed
         self._encoding = None
         self._text = None
         
-    def _detect_encoding(self):
-        
+    # Bytes of the body validated when choosing a charset (None = whole body)
+    ENCODING_SAMPLE = 65536
+    
+    def _detect_encoding(self, full=False):
+        """
+        Pick the body's charset by validating a bounded prefix of it.
+
+        Candidates are tried in order: Content-Type charset, <meta> charset,
+        the charset last chosen for this host, chardet, then a fixed list.
+        Each is checked against the first ENCODING_SAMPLE bytes only, or the
+        whole body when full is set; the text property falls back to a full
+        detection if the sampled choice does not decode the whole body.
+        """
         if self._encoding:
             return self._encoding
+        sample_size = None if full else self.ENCODING_SAMPLE
             
         content = self.raw_content
         content_type = self.headers.get('content-type', '').lower()
+        host = urllib.parse.urlparse(self.url or '').netloc
+        
+        def accept(charset, remember=True):
+            if not _decodes_prefix(content, charset, sample_size):
+                return None
+            self._encoding = charset
+            if remember and host:
+                _HOST_CHARSETS.put(host, charset)
+            return charset
         
         if 'charset=' in content_type:
-            try:
-                charset = content_type.split('charset=')[1].split(';')[0].strip().strip('"\'')
-                content.decode(charset)
-                self._encoding = charset
+            charset = content_type.split('charset=')[1].split(';')[0].strip().strip('"\'')
+            if accept(charset):
                 return charset
-            except:
-                pass
         
         if b'text/html' in content_type.encode() or not content_type:
             meta_charset = re.search(rb'<meta[^>]+charset=["\']?([^"\'>\\s]+)', content[:4096], re.IGNORECASE)
             if meta_charset:
-                try:
-                    charset = meta_charset.group(1).decode('ascii')
-                    content.decode(charset)
-                    self._encoding = charset
+                charset = meta_charset.group(1).decode('ascii', errors='replace')
+                if accept(charset):
                     return charset
-                except:
-                    pass
             
             meta_http = re.search(rb'<meta[^>]+http-equiv=["\']?content-type["\']?[^>]+content=["\']?[^;"\']*charset=([^;"\'\\s]+)', content[:4096], re.IGNORECASE)
             if meta_http:
-                try:
-                    charset = meta_http.group(1).decode('ascii')
-                    content.decode(charset)
-                    self._encoding = charset
+                charset = meta_http.group(1).decode('ascii', errors='replace')
+                if accept(charset):
                     return charset
-                except:
-                    pass
+        
+        cached = _HOST_CHARSETS.get(host) if host else None
+        if cached and accept(cached, remember=False):
+            return cached
         
         try:
             import chardet
-            sample_size = min(len(content), 65536)
-            detected = chardet.detect(content[:sample_size])
-            if detected and detected.get('confidence', 0) > 0.75:
-                try:
-                    content.decode(detected['encoding'])
-                    self._encoding = detected['encoding']
+            detected = chardet.detect(content[:65536])
+            if detected and detected.get('confidence', 0) > 0.75 and detected.get('encoding'):
+                if accept(detected['encoding']):
                     return detected['encoding']
-                except:
-                    pass
         except ImportError:
             pass
         
-        encodings = [
-            'utf-8', 'utf-8-sig',
-            'cp1252', 'windows-1252',
-            'iso-8859-1', 'latin-1',
-            'cp1251', 'windows-1251',
-            'cp1250', 'windows-1250',
-            'iso-8859-2',
-            'iso-8859-15',
-            'gb2312', 'gbk', 'gb18030',
-            'big5', 'cp950',
-            'shift_jis', 'cp932',
-            'euc-jp', 'iso-2022-jp',
-            'euc-kr', 'cp949',
-            'iso-8859-5',
-            'iso-8859-7',
-            'iso-8859-8',
-            'iso-8859-9',
-            'utf-16', 'utf-16le', 'utf-16be',
-            'utf-32', 'utf-32le', 'utf-32be',
-            'ascii',
-        ]
-        
-        for encoding in encodings:
-            try:
-                content.decode(encoding)
-                self._encoding = encoding
+        for encoding in _FALLBACK_ENCODINGS:
+            if accept(encoding):
                 return encoding
-            except:
-                continue
         
         self._encoding = 'utf-8'
         return 'utf-8'
@@ -636,6 +1833,19 @@ class RobustResponse:
         encoding = self.encoding
         content = self.raw_content
         
+        try:
+            self._text = content.decode(encoding)
+            return self._text
+        except:
+            pass
+        
+        # The sampled charset was wrong for the rest of the body: forget it
+        # for this host and redo detection against the whole body
+        host = urllib.parse.urlparse(self.url or '').netloc
+        if host:
+            _HOST_CHARSETS.discard(host, encoding)
+        self._encoding = None
+        encoding = self._detect_encoding(full=True)
         try:
             self._text = content.decode(encoding)
             return self._text
@@ -687,6 +1897,15 @@ class ProxyManager:
         self.breaker_threshold = 10     # consecutive failures before opening
         self.breaker_cooldown = 30.0    # seconds to wait before half-open
         self.half_open_probe_inflight = False
+
+        # Selection index over self.proxies (see _rebuild_index)
+        self._indexed_list = None
+        self._indexed_strategy = None
+        self._proxy_by_key = {}
+        self._ready = []
+        self._ready_seq = {}
+        self._cooling = []
+        self._seq = 0
         
         if proxy_list:
             self.load_proxies(proxy_list)
@@ -715,6 +1934,10 @@ class ProxyManager:
             self.proxies = [self._format_proxy(p) for p in proxy_list]
         
         self.original_proxy_count = len(self.proxies)
+        dns_cache = get_dns_cache()
+        if dns_cache is not None:
+            # Resolve proxy hostnames ahead of the first test or request through them
+            dns_cache.prefetch(filter(None, (_url_host(p['http']) for p in self.proxies)))
     
     def _format_proxy(self, proxy_string):
         
@@ -777,144 +2000,164 @@ class ProxyManager:
                     self.all_failed_warned = True
                 return None
             
-            current_time = time.time()
-            available_proxies = []
-            
-            # Filter out failed proxies and those in cooldown
-            for proxy in self.proxies:
-                proxy_key = self._get_proxy_key(proxy)
-                
-                # Skip if proxy has failed too many times
-                if proxy_key in self.proxy_usage_stats:
-                    failures = self.proxy_usage_stats[proxy_key].get('failures', 0)
-                    if failures >= self.max_failures_per_proxy:
-                        continue
-                
-                # Skip if proxy is in cooldown
-                if proxy_key in self.proxy_last_used:
-                    time_since_use = current_time - self.proxy_last_used[proxy_key]
-                    if time_since_use < self.proxy_cooldown_time:
-                        continue
-                
-                available_proxies.append(proxy)
-            
-            if not available_proxies:
+            if self.proxies is not self._indexed_list or self.rotation_strategy != self._indexed_strategy:
+                self._rebuild_index()
+            self._promote_cooled(now)
+            proxy_key = self._pop_ready()
+            if proxy_key is None:
                 # Reset cooldowns if no proxies available
                 self.proxy_last_used.clear()
-                available_proxies = []
-                for p in self.proxies:
-                    proxy_key = self._get_proxy_key(p)
-                    if proxy_key not in self.failed_proxies:
-                        available_proxies.append(p)
-            
-            if not available_proxies:
+                self._promote_cooled(float('inf'))
+                proxy_key = self._pop_ready()
+            if proxy_key is None:
                 return None
             
-            # Select proxy based on strategy
-            selected_proxy = self._select_proxy_by_strategy(available_proxies)
-            
-            if selected_proxy:
-                proxy_key = self._get_proxy_key(selected_proxy)
-                self.proxy_last_used[proxy_key] = current_time
-                self.thread_assignments[thread_id] = selected_proxy
-                # Half-open mode allows only one probe
-                if self.breaker_state == 'half_open':
-                    if self.half_open_probe_inflight:
-                        return None  # Only one probe at a time
-                    self.half_open_probe_inflight = True
-                if on_event:
-                    try:
-                        on_event(event='proxy_select', proxy_id=proxy_key)
-                    except Exception:
-                        pass
-                return selected_proxy
-            
-            return None
+            selected_proxy = self._proxy_by_key[proxy_key]
+            self.proxy_last_used[proxy_key] = now
+            heapq.heappush(self._cooling, (now + self.proxy_cooldown_time, proxy_key))
+            self.thread_assignments[thread_id] = selected_proxy
+            # Half-open mode allows only one probe
+            if self.breaker_state == 'half_open':
+                if self.half_open_probe_inflight:
+                    return None  # Only one probe at a time
+                self.half_open_probe_inflight = True
+            if on_event:
+                try:
+                    on_event(event='proxy_select', proxy_id=proxy_key)
+                except Exception:
+                    pass
+            return selected_proxy
     
     def _get_proxy_key(self, proxy):
         """Get a unique key for proxy tracking"""
         if isinstance(proxy, dict):
             return proxy.get('http', proxy.get('https', ''))
         return str(proxy)
-    
-    def _select_proxy_by_strategy(self, available_proxies):
-        """Select proxy based on rotation strategy"""
-        if not available_proxies:
-            return None
-            
-        if self.rotation_strategy == 'round_robin':
-            # Simple round robin
-            self.current_proxy_index = (self.current_proxy_index + 1) % len(available_proxies)
-            return available_proxies[self.current_proxy_index]
-            
-        elif self.rotation_strategy == 'performance':
-            # Select based on best performance
-            def get_performance_score(proxy):
-                proxy_key = self._get_proxy_key(proxy)
-                if proxy_key not in self.proxy_response_times:
-                    return 999  # Unknown performance, deprioritize
-                return self.proxy_response_times[proxy_key]
-            
-            return min(available_proxies, key=get_performance_score)
-            
-        else:  # intelligent strategy
-            # Advanced scoring combining multiple factors
-            def get_intelligent_score(proxy):
-                proxy_key = self._get_proxy_key(proxy)
-                score = 0.0
-
-                # Factor 1: Response time (40% weight) - lower is better
-                response_time = self.proxy_response_times.get(proxy_key, 5.0)
-                response_score = min(response_time / 5.0, 2.0)  # Normalize to 0-2 range
-                score += response_score * 0.4
-
-                # Factor 2: Success rate (40% weight) - higher is better
-                if proxy_key in self.proxy_usage_stats:
-                    stats = self.proxy_usage_stats[proxy_key]
-                    total = max(stats.get('total', 1), 1)
-                    successes = stats.get('successes', 0)
-                    failures = stats.get('failures', 0)
-
-                    # Calculate success rate with exponential decay for old failures
-                    # Recent attempts matter more than old ones
-                    recent_window = 10
-                    if total > recent_window:
-                        # Weight recent attempts more heavily
-                        recent_success_rate = (successes - (failures * 0.5)) / total
-                    else:
-                        recent_success_rate = successes / total if total > 0 else 0.5
 
-                    # Convert to penalty (lower success rate = higher penalty)
-                    success_penalty = (1.0 - max(0, min(1, recent_success_rate))) * 2.0
-                    score += success_penalty * 0.4
-                else:
-                    # New proxy - give it moderate score (not best, not worst)
-                    score += 0.5 * 0.4
-
-                # Factor 3: Time since last use (10% weight) - prefer fresher proxies
-                if proxy_key in self.proxy_last_used:
-                    time_since_use = time.time() - self.proxy_last_used[proxy_key]
-                    # Normalize: 0-30s gets penalty, >30s no penalty
-                    freshness_score = max(0, (30 - time_since_use) / 30.0)
-                    score += freshness_score * 0.1
-                else:
-                    # Never used - prefer it slightly
-                    score += 0.0
+    # Selection index (all under proxy_lock). Available proxies sit in the
+    # _ready min-heap keyed by their strategy score; a selected proxy moves
+    # to the _cooling heap until proxy_cooldown_time has passed. Entries are
+    # invalidated lazily: _ready_seq holds each key's live entry, so a
+    # rescore just pushes a new entry, and removed or excluded proxies are
+    # skipped when popped. get_proxy is O(log n) instead of scoring every proxy.
+
+    def _rebuild_index(self):
+        self._indexed_list = self.proxies
+        self._indexed_strategy = self.rotation_strategy
+        self._proxy_by_key = {self._get_proxy_key(p): p for p in self.proxies}
+        self._ready = []
+        self._ready_seq = {}
+        self._cooling = []
+        now = time.time()
+        for key in self._proxy_by_key:
+            last_used = self.proxy_last_used.get(key)
+            if last_used is not None and now - last_used < self.proxy_cooldown_time:
+                self._cooling.append((last_used + self.proxy_cooldown_time, key))
+            else:
+                self._push_ready(key, now)
+        heapq.heapify(self._cooling)
 
-                # Factor 4: Consecutive failures (10% weight) - penalize failure streaks
-                consecutive_failures = 0
-                if proxy_key in self.proxy_usage_stats:
-                    consecutive_failures = self.proxy_usage_stats[proxy_key].get('consecutive_failures', 0)
-                failure_penalty = min(consecutive_failures / 3.0, 1.0)  # Normalize to 0-1
-                score += failure_penalty * 0.1
+    def _excluded(self, key):
+        if key in self.failed_proxies:
+            return True
+        stats = self.proxy_usage_stats.get(key)
+        return bool(stats) and stats.get('failures', 0) >= self.max_failures_per_proxy
+
+    def _push_ready(self, key, now):
+        if key not in self._proxy_by_key or self._excluded(key):
+            return
+        self._seq += 1
+        self._ready_seq[key] = self._seq
+        heapq.heappush(self._ready, (self._strategy_score(key, now), self._seq, key))
+        # Stale entries pile up as proxies are rescored; compact now and then
+        if len(self._ready) > 2 * len(self._ready_seq) + 64:
+            self._ready = [entry for entry in self._ready if self._ready_seq.get(entry[2]) == entry[1]]
+            heapq.heapify(self._ready)
+
+    def _pop_ready(self):
+        while self._ready:
+            _, seq, key = heapq.heappop(self._ready)
+            if self._ready_seq.get(key) != seq:
+                continue
+            del self._ready_seq[key]
+            if key in self._proxy_by_key and not self._excluded(key):
+                return key
+        return None
+
+    def _promote_cooled(self, now):
+        """Move proxies whose cooldown ended by `now` back to the ready heap."""
+        while self._cooling and self._cooling[0][0] <= now:
+            _, key = heapq.heappop(self._cooling)
+            if key not in self._ready_seq:
+                self._push_ready(key, now)
 
-                # Add small randomness to break ties and avoid predictability (±5%)
-                score *= random.uniform(0.95, 1.05)
+    def _rescore(self, key):
+        """Re-rank a ready proxy after its stats changed (cooling ones are scored on promotion)."""
+        if key in self._ready_seq and self.rotation_strategy != 'round_robin':
+            self._push_ready(key, time.time())
 
-                return score
+    def _strategy_score(self, key, now):
+        """Heap key for rotation_strategy; the lowest score is selected first."""
+        if self.rotation_strategy == 'round_robin':
+            # Least recently made available goes first
+            return self._seq
+        if self.rotation_strategy == 'performance':
+            # Unknown performance is deprioritized
+            return self.proxy_response_times.get(key, 999)
+        return self._intelligent_score(key, now)
+
+    def _intelligent_score(self, proxy_key, now):
+        """Advanced scoring combining multiple factors (lower is better)"""
+        score = 0.0
+
+        # Factor 1: Response time (40% weight) - lower is better
+        response_time = self.proxy_response_times.get(proxy_key, 5.0)
+        response_score = min(response_time / 5.0, 2.0)  # Normalize to 0-2 range
+        score += response_score * 0.4
+
+        # Factor 2: Success rate (40% weight) - higher is better
+        if proxy_key in self.proxy_usage_stats:
+            stats = self.proxy_usage_stats[proxy_key]
+            total = max(stats.get('total', 1), 1)
+            successes = stats.get('successes', 0)
+            failures = stats.get('failures', 0)
+
+            # Calculate success rate with exponential decay for old failures
+            # Recent attempts matter more than old ones
+            recent_window = 10
+            if total > recent_window:
+                # Weight recent attempts more heavily
+                recent_success_rate = (successes - (failures * 0.5)) / total
+            else:
+                recent_success_rate = successes / total if total > 0 else 0.5
 
-            # Select proxy with lowest score (best overall)
-            return min(available_proxies, key=get_intelligent_score)
+            # Convert to penalty (lower success rate = higher penalty)
+            success_penalty = (1.0 - max(0, min(1, recent_success_rate))) * 2.0
+            score += success_penalty * 0.4
+        else:
+            # New proxy - give it moderate score (not best, not worst)
+            score += 0.5 * 0.4
+
+        # Factor 3: Time since last use (10% weight) - prefer fresher proxies.
+        # Scored when the proxy becomes available, so with the default 30s
+        # cooldown this is always 0.
+        if proxy_key in self.proxy_last_used:
+            time_since_use = now - self.proxy_last_used[proxy_key]
+            # Normalize: 0-30s gets penalty, >30s no penalty
+            freshness_score = max(0, (30 - time_since_use) / 30.0)
+            score += freshness_score * 0.1
+
+        # Factor 4: Consecutive failures (10% weight) - penalize failure streaks
+        consecutive_failures = 0
+        if proxy_key in self.proxy_usage_stats:
+            consecutive_failures = self.proxy_usage_stats[proxy_key].get('consecutive_failures', 0)
+        failure_penalty = min(consecutive_failures / 3.0, 1.0)  # Normalize to 0-1
+        score += failure_penalty * 0.1
+
+        # Add small randomness to break ties and avoid predictability (±5%)
+        score *= random.uniform(0.95, 1.05)
+
+        return score
     
     def record_proxy_success(self, proxy, response_time=None):
         """Record successful proxy usage"""
@@ -947,6 +2190,8 @@ class ProxyManager:
                     current_avg = self.proxy_response_times[proxy_key]
                     self.proxy_response_times[proxy_key] = (current_avg * 0.7) + (response_time * 0.3)
 
+            self._rescore(proxy_key)
+
             # Circuit breaker: reset on success
             self.global_fail_streak = 0
             if self.breaker_state in ('open', 'half_open'):
@@ -982,6 +2227,7 @@ class ProxyManager:
             if consecutive >= 5 or failures >= self.max_failures_per_proxy:
                 self.failed_proxies.add(proxy_key)
                 logging.warning(f"Proxy {proxy_key} marked as failed (consecutive: {consecutive}, total: {failures})")
+            self._rescore(proxy_key)
 
             # Circuit breaker: track global streak
             self.global_fail_streak += 1
@@ -1001,6 +2247,7 @@ class ProxyManager:
                 self.proxies.remove(proxy)
                 proxy_key = self._get_proxy_key(proxy)
                 self.failed_proxies.add(proxy_key)
+                self._proxy_by_key.pop(proxy_key, None)
                 
                 # Clean up thread assignments using this proxy
                 threads_to_reassign = [tid for tid, p in self.thread_assignments.items() if p == proxy]
@@ -1026,41 +2273,732 @@ class ProxyManager:
                 return self.proxies[self.current_proxy_index % len(self.proxies)]
             return None
 
-class RateLimiter:
-    
-    def __init__(self, initial_delay=1.0):
-        self.delay = initial_delay
-        self.min_delay = 0.1
-        self.max_delay = 10.0
-        self.last_request_time = 0
+class _HostState:
+    __slots__ = ('delay', 'tokens', 'last_refill', 'blocked_until', 'response_times', 'queue', 'scheduled')
+
+    def __init__(self, delay, burst, now):
+        self.delay = delay
+        self.tokens = float(burst)
+        self.last_refill = now
+        self.blocked_until = 0.0
         self.response_times = deque(maxlen=10)
-    
-    def wait(self):
-        
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.delay:
-            time.sleep(self.delay - elapsed)
-        self.last_request_time = time.time()
-    
-    def adjust(self, response_time, status_code):
-        
-        self.response_times.append(response_time)
-        
-        if status_code == 429:
-            self.delay = min(self.delay * 2, self.max_delay)
-        elif status_code >= 500:
-            self.delay = min(self.delay * 1.5, self.max_delay)
-        elif len(self.response_times) == self.response_times.maxlen:
-            avg_response_time = sum(self.response_times) / len(self.response_times)
-            if avg_response_time < 0.5:
-                self.delay = max(self.delay * 0.9, self.min_delay)
-            elif avg_response_time > 2.0:
-                self.delay = min(self.delay * 1.1, self.max_delay)
+        self.queue = deque()
+        self.scheduled = False
+
+
+class HostScheduler:
+    """
+    Per-host politeness scheduler.
+
+    Every host gets its own token bucket (refilled at one token per ``delay``
+    seconds, holding at most ``burst`` tokens), an adaptive delay driven by
+    response times and 429/5xx answers, and a Retry-After block. A slow or
+    throttled host therefore only slows down requests to itself.
+
+    It can be used two ways, both thread-safe:
+      * as a gate: ``wait(url)`` / ``reserve(url)`` before a request and
+        ``adjust(...)`` after it;
+      * as a frontier with the ``queue.Queue`` subset the workers use
+        (``put``/``get``/``task_done``/``empty``); ``get`` returns a URL from
+        whichever host is ready next, so workers stay busy on other hosts.
+    """
+
+    def __init__(self, initial_delay=1.0, min_delay=None, max_delay=10.0, burst=1):
+        self.initial_delay = max(0.0, float(initial_delay))
+        self.min_delay = self.initial_delay if min_delay is None else max(0.0, float(min_delay))
+        self.max_delay = max(float(max_delay), self.initial_delay)
+        self.penalty_floor = 0.25  # first delay applied to a host that was unthrottled
+        self.burst = max(1, int(burst))
+        self.cond = threading.Condition()
+        self.hosts = {}
+        self.ready_heap = []  # (ready_time, seq, host), one entry per host with queued URLs
+        self._seq = 0
+        self._size = 0
+        self._unfinished = 0
+
+    @staticmethod
+    def host_of(url):
+        try:
+            return urllib.parse.urlparse(url).netloc.lower()
+        except Exception:
+            return ''
+
+    def _state(self, host, now):
+        st = self.hosts.get(host)
+        if st is None:
+            st = self.hosts[host] = _HostState(self.initial_delay, self.burst, now)
+        return st
+
+    def _refill(self, st, now):
+        if st.delay <= 0:
+            st.tokens = float(self.burst)
+        else:
+            st.tokens = min(float(self.burst), st.tokens + (now - st.last_refill) / st.delay)
+        st.last_refill = now
+
+    def _ready_time(self, st, now):
+        self._refill(st, now)
+        ready = now if st.tokens >= 1 else now + (1 - st.tokens) * st.delay
+        return max(ready, st.blocked_until)
+
+    def _push(self, host, ready_time):
+        self._seq += 1
+        heapq.heappush(self.ready_heap, (ready_time, self._seq, host))
+
+    # --- gate API ---
+    def reserve(self, url):
+        """Book the next request slot for the URL's host; returns seconds to wait first."""
+        with self.cond:
+            now = time.time()
+            st = self._state(self.host_of(url), now)
+            delay = max(0.0, self._ready_time(st, now) - now)
+            st.tokens -= 1
+            return delay
+
+    def wait(self, url):
+        """Block until the URL's host may be contacted again."""
+        delay = self.reserve(url)
+        if delay > 0:
+            shutdown_flag.wait(delay)
+
+    def adjust(self, url, response_time, status_code, retry_after=None):
+        """Feed a response back into the host's adaptive delay and Retry-After block."""
+        with self.cond:
+            now = time.time()
+            st = self._state(self.host_of(url), now)
+            if response_time is not None:
+                st.response_times.append(response_time)
+            if status_code == 429:
+                st.delay = min(max(st.delay * 2, self.penalty_floor), self.max_delay)
+            elif status_code and status_code >= 500:
+                st.delay = min(max(st.delay * 1.5, self.penalty_floor), self.max_delay)
+            elif len(st.response_times) == st.response_times.maxlen:
+                avg_response_time = sum(st.response_times) / len(st.response_times)
+                if avg_response_time < 0.5:
+                    st.delay = max(st.delay * 0.9, self.min_delay)
+                    if st.delay < 0.01:
+                        st.delay = self.min_delay
+                elif avg_response_time > 2.0:
+                    st.delay = min(st.delay * 1.1, self.max_delay)
+            retry_s = _parse_retry_after(retry_after)
+            if retry_s:
+                st.blocked_until = max(st.blocked_until, now + min(retry_s, 600))
+            self.cond.notify_all()
+
+    def delay_for(self, url):
+        with self.cond:
+            st = self.hosts.get(self.host_of(url))
+            return st.delay if st else self.initial_delay
+
+    # --- frontier API (queue.Queue subset) ---
+    def put(self, item):
+        with self.cond:
+            now = time.time()
+            host = self.host_of(item[0])
+            st = self._state(host, now)
+            st.queue.append(item)
+            self._size += 1
+            self._unfinished += 1
+            if not st.scheduled:
+                st.scheduled = True
+                self._push(host, self._ready_time(st, now))
+            self.cond.notify()
+
+    def get(self, block=True, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        with self.cond:
+            while True:
+                now = time.time()
+                # Refresh the head entry: adjust() may have moved its host's ready time
+                while self.ready_heap:
+                    ready_time, _, host = self.ready_heap[0]
+                    actual = self._ready_time(self.hosts[host], now)
+                    if abs(actual - ready_time) < 1e-6:
+                        break
+                    heapq.heapreplace(self.ready_heap, (actual, self._seq + 1, host))
+                    self._seq += 1
+                if self.ready_heap and self.ready_heap[0][0] <= now:
+                    _, _, host = heapq.heappop(self.ready_heap)
+                    st = self.hosts[host]
+                    st.tokens -= 1
+                    item = st.queue.popleft()
+                    self._size -= 1
+                    if st.queue:
+                        self._push(host, self._ready_time(st, now))
+                    else:
+                        st.scheduled = False
+                    return item
+                if not block:
+                    raise queue.Empty
+                wait_for = self.ready_heap[0][0] - now if self.ready_heap else None
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise queue.Empty
+                    wait_for = remaining if wait_for is None else min(wait_for, remaining)
+                self.cond.wait(wait_for)
+
+    def task_done(self):
+        with self.cond:
+            if self._unfinished <= 0:
+                raise ValueError('task_done() called too many times')
+            self._unfinished -= 1
+            if self._unfinished == 0:
+                self.cond.notify_all()
+
+    def join(self):
+        with self.cond:
+            while self._unfinished:
+                self.cond.wait()
+
+    def empty(self):
+        with self.cond:
+            return self._size == 0
+
+    def qsize(self):
+        with self.cond:
+            return self._size
+
+class CrawlStateStore:
+    """
+    Crash-safe crawl state on disk: frontier, visited pages and downloads.
+
+    Backed by SQLite in WAL mode. Writes are buffered in order and committed
+    in one transaction per batch (every ``batch_size`` records, every
+    ``flush_interval`` seconds from a background thread, and on close), so a
+    crash loses at most the last unflushed batch and never leaves a
+    half-written state behind. A batch that fails to commit stays buffered
+    and is retried with the next one.
+    """
+
+    QUEUED, DONE = 0, 1
+
+    def __init__(self, path, batch_size=500, flush_interval=2.0):
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self._pending = []
+        self._pending_downloads = set()
+        self._last_flush = time.time()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS frontier (url TEXT PRIMARY KEY, depth INTEGER NOT NULL, state INTEGER NOT NULL DEFAULT 0);
+            CREATE INDEX IF NOT EXISTS frontier_state ON frontier (state);
+            CREATE TABLE IF NOT EXISTS downloads (url TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS download_queue (url TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        ''')
+        self.conn.commit()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name='state-flush', daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            with self.lock:
+                if self.conn is not None and time.time() - self._last_flush >= self.flush_interval:
+                    self._flush_locked()
+
+    def reset(self):
+        """Discard all saved state, for a fresh crawl into an existing database."""
+        with self.lock:
+            self._pending = []
+            self._pending_downloads.clear()
+            with self.conn:
+                for table in ('frontier', 'downloads', 'download_queue', 'meta'):
+                    self.conn.execute(f'DELETE FROM {table}')
+
+    _SQL = {
+        'enqueued': 'INSERT OR IGNORE INTO frontier (url, depth, state) VALUES (?, ?, 0)',
+        'visited': 'INSERT INTO frontier (url, depth, state) VALUES (?, ?, 1) ON CONFLICT(url) DO UPDATE SET state = 1',
+        'download': 'INSERT OR IGNORE INTO downloads (url) VALUES (?)',
+        'download_queued': 'INSERT OR IGNORE INTO download_queue (url) VALUES (?)',
+        'download_dequeued': 'DELETE FROM download_queue WHERE url = ?',
+    }
+
+    def _record(self, kind, params):
+        with self.lock:
+            self._record_locked(kind, params)
+
+    def _record_locked(self, kind, params):
+        self._pending.append((kind, params))
+        if len(self._pending) >= self.batch_size or time.time() - self._last_flush >= self.flush_interval:
+            self._flush_locked()
+
+    def record_enqueued(self, url, depth):
+        self._record('enqueued', (url, depth))
+
+    def record_visited(self, url, depth=0):
+        self._record('visited', (url, depth))
+
+    def record_download(self, url):
+        # One critical section, so a flush never sees the URL in only one of the two buffers
+        with self.lock:
+            self._pending_downloads.add(url)
+            self._record_locked('download', (url,))
+            self._record_locked('download_dequeued', (url,))
+
+    def record_download_queued(self, url):
+        """A download handed to the download pool; kept until it completes or is dropped."""
+        self._record('download_queued', (url,))
+
+    def record_download_dequeued(self, url):
+        """The download pool finished with url without completing it (failed or duplicate)."""
+        self._record('download_dequeued', (url,))
+
+    def pending_downloads(self):
+        """Downloads queued by an earlier run that never finished."""
+        with self.lock:
+            self._flush_locked()
+            return [row[0] for row in self.conn.execute('SELECT url FROM download_queue')]
+
+    def is_downloaded(self, url):
+        with self.lock:
+            if url in self._pending_downloads:
+                return True
+            return self.conn.execute('SELECT 1 FROM downloads WHERE url = ?', (url,)).fetchone() is not None
+
+    def _flush_locked(self):
+        self._last_flush = time.time()
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            with self.conn:
+                # Consecutive records of the same kind go through one executemany
+                i = 0
+                while i < len(batch):
+                    kind = batch[i][0]
+                    j = i
+                    while j < len(batch) and batch[j][0] == kind:
+                        j += 1
+                    self.conn.executemany(self._SQL[kind], [params for _, params in batch[i:j]])
+                    i = j
+            self._pending_downloads.clear()
+        except sqlite3.Error as e:
+            # The transaction rolled back; keep the batch, in order, for the next flush
+            self._pending = batch + self._pending
+            logging.error(f"Failed to persist crawl state to {self.path} ({len(batch)} records kept): {e}")
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def set_meta(self, key, value):
+        with self.lock:
+            with self.conn:
+                self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def load(self):
+        """Return ``(queued, seen_urls, visited_count, downloaded_urls)`` for resuming."""
+        with self.lock:
+            self._flush_locked()
+            queued = self.conn.execute('SELECT url, depth FROM frontier WHERE state = 0').fetchall()
+            seen = [row[0] for row in self.conn.execute('SELECT url FROM frontier')]
+            visited_count = self.conn.execute('SELECT COUNT(*) FROM frontier WHERE state = 1').fetchone()[0]
+            downloaded = [row[0] for row in self.conn.execute('SELECT url FROM downloads')]
+        return queued, seen, visited_count, downloaded
+
+    def close(self):
+        self._stop.set()
+        with self.lock:
+            if self.conn is None:
+                return
+            self._flush_locked()
+            try:
+                self.conn.close()
+            except sqlite3.Error:
+                pass
+            self.conn = None
+
+def _http_date(value):
+    """Parse an HTTP date header into a POSIX timestamp (None if missing or invalid)."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class CachedResponse:
+    """A page served from HTTPCache; quacks like the response RobustResponse expects."""
+
+    def __init__(self, url, status_code, headers, body, fresh):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = body
+        self.fresh = fresh
+
+    def validators(self):
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+
+class HTTPCache:
+    """
+    Disk-backed HTTP cache for page fetches (--http-cache DIR).
+
+    Bodies are zlib-compressed files under DIR/<key[:2]>/<key>; a SQLite
+    index holds status, headers, freshness deadline, size and last access.
+    Freshness follows Cache-Control (no-store, no-cache, max-age,
+    s-maxage) and Expires, falling back to 10% of the time since
+    Last-Modified (at most a day). min_ttl extends that for development
+    re-runs, except for no-store/no-cache responses. Stale entries are
+    revalidated with their validators; a 304 refreshes them via
+    revalidated(). Once the compressed total exceeds max_bytes the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024, min_ttl=0):
+        self.directory = directory
+        self.max_bytes = max(1, int(max_bytes))
+        self.min_ttl = max(0.0, float(min_ttl or 0))
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, 'index.db'), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, url TEXT NOT NULL, status INTEGER NOT NULL, headers TEXT NOT NULL,
+                stored_at REAL NOT NULL, expires_at REAL NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS entries_access ON entries (last_access);
+        ''')
+        self.conn.commit()
+        self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        self.hits = self.revalidations = self.misses = 0
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode('utf-8', errors='replace')).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    @staticmethod
+    def _directives(headers):
+        directives = {}
+        for part in (headers.get('Cache-Control') or '').split(','):
+            name, _, value = part.strip().partition('=')
+            if name:
+                directives[name.lower()] = value.strip().strip('"')
+        return directives
+
+    def _expires_at(self, headers, now):
+        """Freshness deadline for a response, or None if it must not be stored."""
+        directives = self._directives(headers)
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives:
+            return now
+        lifetime = None
+        for name in ('s-maxage', 'max-age'):
+            if directives.get(name, '').isdigit():
+                lifetime = int(directives[name])
+                break
+        if lifetime is None and headers.get('Expires') is not None:
+            expires = _http_date(headers.get('Expires'))
+            date = _http_date(headers.get('Date')) or now
+            lifetime = max(0, expires - date) if expires else 0
+        if lifetime is None:
+            last_modified = _http_date(headers.get('Last-Modified'))
+            date = _http_date(headers.get('Date')) or now
+            lifetime = min(86400, max(0, (date - last_modified) * 0.1)) if last_modified else 0
+        return now + max(lifetime, self.min_ttl)
+
+    def lookup(self, url):
+        """CachedResponse for url (fresh or stale), or None."""
+        key = self._key(url)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute('SELECT status, headers, expires_at FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                with open(self._body_path(key), 'rb') as fh:
+                    body = zlib.decompress(fh.read())
+            except (OSError, zlib.error):
+                self._delete_locked(key)
+                self.misses += 1
+                return None
+            self.conn.execute('UPDATE entries SET last_access = ? WHERE key = ?', (now, key))
+            self.conn.commit()
+        fresh = row[2] > now
+        if fresh:
+            self.hits += 1
+        return CachedResponse(url, row[0], json.loads(row[1]), body, fresh)
+
+    def store(self, url, status_code, headers, body):
+        """Cache a 200 response if its headers allow it."""
+        if status_code != 200:
+            return False
+        now = time.time()
+        expires_at = self._expires_at(headers, now)
+        if expires_at is None:
+            return False
+        if expires_at <= now and not (headers.get('ETag') or headers.get('Last-Modified')):
+            return False  # never fresh and cannot be revalidated
+        key = self._key(url)
+        data = zlib.compress(body, 6)
+        path = self._body_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as fh:
+            fh.write(data)
+        with self.lock:
+            os.replace(tmp, path)
+            old = self.conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            stored_headers = {k: v for k, v in headers.items() if k.lower() != 'set-cookie'}
+            self.conn.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                              (key, url, status_code, json.dumps(stored_headers), now, expires_at, len(data), now))
+            self.total_bytes += len(data) - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict_locked()
+            self.conn.commit()
+        return True
+
+    def revalidated(self, url, headers):
+        """A 304 confirmed the cached entry: merge the new headers and extend its freshness."""
+        key = self._key(url)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute('SELECT headers FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return
+            merged = requests.structures.CaseInsensitiveDict(json.loads(row[0]))
+            merged.update(headers)
+            expires_at = self._expires_at(merged, now) or now
+            self.conn.execute('UPDATE entries SET headers = ?, expires_at = ?, last_access = ? WHERE key = ?',
+                              (json.dumps(dict(merged)), expires_at, now, key))
+            self.conn.commit()
+        self.revalidations += 1
+
+    def _delete_locked(self, key):
+        row = self.conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+        self.conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+        if row:
+            self.total_bytes -= row[0]
+        try:
+            os.remove(self._body_path(key))
+        except OSError:
+            pass
+
+    def _evict_locked(self):
+        # Evict down to 90% so eviction is not triggered by every store
+        target = self.max_bytes * 0.9
+        for key, in self.conn.execute('SELECT key FROM entries ORDER BY last_access').fetchall():
+            if self.total_bytes <= target:
+                break
+            self._delete_locked(key)
+
+    def close(self):
+        with self.lock:
+            try:
+                self.conn.commit()
+                self.conn.close()
+            except sqlite3.Error:
+                pass
+
+
+# Content types Siphon.fetch_url decodes and parses as pages ('' = undeclared)
+_PAGE_CONTENT_TYPES = ('', 'text/html', 'application/xhtml+xml')
+
+
+class FetchResult:
+    """
+    What Siphon.fetch_url returns: status, headers, final URL and the body.
+
+    For page content types the body is read once into content and text is
+    decoded from it lazily. Any other content type short-circuits: content
+    stays None and the still-unread streamed response is kept, so a
+    download can take the body from iter_content() instead of fetching the
+    URL again. The caller owns the result and should close() it.
+    """
+
+    def __init__(self, url, status_code, headers, content=None, final_url=None, response=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+        self.final_url = final_url or url
+        self.response = response
+        self._text = None
+
+    @property
+    def content_type(self):
+        return self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+
+    @property
+    def is_html(self):
+        return self.content_type in _PAGE_CONTENT_TYPES
+
+    @property
+    def text(self):
+        """Decoded body (pages only; None when the body was not read)."""
+        if self._text is None and self.content is not None:
+            self._text = RobustResponse(self.content, self, self.final_url).text
+        return self._text
+
+    def iter_content(self, chunk_size=65536):
+        """Body chunks: from memory when read, else straight off the open response."""
+        if self.content is not None:
+            for start in range(0, len(self.content), chunk_size):
+                yield self.content[start:start + chunk_size]
+        elif self.response is not None:
+            for chunk in self.response.iter_content(chunk_size=chunk_size):
+                yield chunk
+
+    def raise_for_status(self):
+        # fetch_url only returns successful fetches
+        pass
+
+    def close(self):
+        if self.response is not None:
+            self.response.close()
+            self.response = None
+
+
+class ResponseCache:
+    """
+    In-memory response cache for WebScraper bounded by stored bytes.
+
+    Only the raw body is kept (never the decoded text); a RobustResponse is
+    rebuilt on each hit. Admission: 200 responses with a textual content
+    type whose body is at most max_object_bytes. Bodies of at least
+    compress_threshold bytes are zlib-compressed, and compressed bodies of
+    at least spill_threshold bytes are moved out of the heap into an
+    mmap'd temp file. Every stored byte, in memory or spilled, counts
+    towards max_bytes; least recently used entries are evicted past it.
+    """
+
+    TEXTUAL_TYPES = ('text/', 'json', 'xml', 'javascript', 'ecmascript')
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_object_bytes=2 * 1024 * 1024,
+                 compress_threshold=16 * 1024, spill_threshold=256 * 1024, spill_dir=None):
+        from collections import OrderedDict
+        self.max_bytes = max(1, int(max_bytes))
+        self.max_object_bytes = max(1, int(max_object_bytes))
+        self.compress_threshold = compress_threshold
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self._entries = OrderedDict()   # key -> (url, status, headers, storage, kind, size)
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.rejected = {}
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _admit(self, response):
+        if response.status_code != 200:
+            return 'status'
+        content_type = (response.headers.get('content-type') or '').lower()
+        if content_type and not any(t in content_type for t in self.TEXTUAL_TYPES):
+            return 'binary'
+        if len(response.raw_content) > self.max_object_bytes:
+            return 'too_large'
+        return None
+
+    def put(self, key, response):
+        """Store a RobustResponse if admitted; returns True when cached."""
+        reason = self._admit(response)
+        if reason:
+            with self.lock:
+                self.rejected[reason] = self.rejected.get(reason, 0) + 1
+            return False
+        body = response.raw_content
+        kind = 'raw'
+        if len(body) >= self.compress_threshold:
+            body, kind = zlib.compress(body, 1), 'zlib'
+        storage = body
+        if kind == 'zlib' and len(body) >= self.spill_threshold:
+            try:
+                with tempfile.TemporaryFile(dir=self.spill_dir) as fh:
+                    fh.write(body)
+                    fh.flush()
+                    storage = mmap.mmap(fh.fileno(), len(body), access=mmap.ACCESS_READ)
+                kind = 'mmap'
+            except (OSError, ValueError) as e:
+                logging.debug(f"Response cache spill failed, keeping {len(body)} bytes in memory: {e}")
+        entry = (response.url, response.status_code, dict(response.headers), storage, kind, len(body))
+        with self.lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._release(old)
+            self._entries[key] = entry
+            self.bytes += entry[5]
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._release(evicted)
+                self.evictions += 1
+        return True
+
+    def _release(self, entry):
+        self.bytes -= entry[5]
+        if entry[4] == 'mmap':
+            entry[3].close()
+
+    def get(self, key):
+        """A fresh RobustResponse for a cached key, or None."""
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            url, status, headers, storage, kind, _ = entry
+            body = storage[:] if kind == 'mmap' else storage
+        if kind != 'raw':
+            body = zlib.decompress(body)
+        shim = types.SimpleNamespace(status_code=status, headers=requests.structures.CaseInsensitiveDict(headers))
+        return RobustResponse(body, shim, url)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries), 'bytes': self.bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                    'evictions': self.evictions, 'rejected': dict(self.rejected),
+                    'spilled': sum(1 for e in self._entries.values() if e[4] == 'mmap')}
+
+    def clear(self):
+        with self.lock:
+            for entry in self._entries.values():
+                self._release(entry)
+            self._entries.clear()
+
 
 class WebScraper:
     def __init__(self, start_url, domain=None, depth=3, proxies=None, filetypes=None, 
                  keywords=None, output_dir='output', clean_data=True, use_selenium=False,
-                 max_threads=3, dump_all=False, find_apis=False, crawl_only=False, test_proxies=False):
+                 max_threads=3, dump_all=False, find_apis=False, crawl_only=False, test_proxies=False,
+                 seen_capacity=1000000, seen_error_rate=0.001, state_db=None, resume=False,
+                 parser='html.parser', http_cache=None, cache_max_bytes=64 * 1024 * 1024, cache_max_object_bytes=2 * 1024 * 1024,
+                 max_body_size=50 * 1024 * 1024):
         self.start_url = start_url
         parsed_start = urllib.parse.urlparse(start_url)
         self.domain = domain or parsed_start.netloc
@@ -1075,6 +3013,7 @@ class WebScraper:
         self.dump_all = dump_all
         self.find_apis = find_apis
         self.crawl_only = crawl_only
+        self.html_parser = _resolve_html_parser(parser)
         
         # Bounded discovered files list
         self.discovered_files = []
@@ -1091,13 +3030,29 @@ class WebScraper:
         # Use bounded collections to prevent memory leaks
         from collections import OrderedDict
 
-        # Bounded visited set using OrderedDict for LRU behavior
-        self.visited = OrderedDict()
-        self.max_visited_size = 100000  # Max URLs to track
+        # Every URL ever enqueued; checked at enqueue time so the queue never holds duplicates
+        self.visited = URLSeenSet(capacity=seen_capacity, error_rate=seen_error_rate)
+        self.visited.add(self.start_url)
+        self.pages_visited = 0
         self.visited_lock = threading.Lock()
 
         self.url_queue = deque([(self.start_url, 0)])
         self.queue_lock = threading.Lock()
+
+        # Optional persistent state; like Siphon, only resume=True picks up an existing database
+        self.state_store = CrawlStateStore(state_db) if state_db else None
+        self.resume = bool(resume)
+        if self.state_store and not self.resume:
+            self.state_store.reset()
+        if self.state_store:
+            queued, seen, visited_count, _ = self.state_store.load()
+            if seen:
+                for seen_url in seen:
+                    self.visited.add(seen_url)
+                self.url_queue = deque(tuple(item) for item in queued)
+                self.pages_visited = visited_count
+            else:
+                self.state_store.record_enqueued(self.start_url, 0)
         self.active_workers = 0
         self.workers_lock = threading.Lock()
         self.all_workers_started = threading.Event()
@@ -1110,12 +3065,16 @@ class WebScraper:
         self.api_lock = threading.Lock()
 
         self.proxy_manager = ProxyManager(proxies or [])
-        self.rate_limiter = RateLimiter()
+        # Per-host politeness (token bucket + adaptive delay + Retry-After)
+        self.scheduler = HostScheduler(initial_delay=1.0, min_delay=0.1)
 
-        # Bounded cache with LRU eviction
-        self.cache = OrderedDict()
-        self.max_cache_size = 10000
-        self.session = requests.Session()
+        # Response cache bounded by bytes (LRU), textual bodies only
+        self.cache = ResponseCache(max_bytes=cache_max_bytes, max_object_bytes=cache_max_object_bytes)
+        # Largest response body make_request will hold in memory (0 = unlimited)
+        self.max_body_size = max_body_size
+        # Optional persistent HTTP cache shared across runs (a directory path or an HTTPCache)
+        self.http_cache = HTTPCache(http_cache) if isinstance(http_cache, str) else http_cache
+        self.session = SessionPool(pool_maxsize=_pool_maxsize(max_threads), pool_connections=max(10, max_threads))
         
         self.thread_counter = 0
         self.thread_ids = {}
@@ -1203,11 +3162,37 @@ class WebScraper:
             self.use_selenium = False
 
     def _add_to_cache(self, key, value):
-        """Add to cache with size limit"""
-        self.cache[key] = value
-        if len(self.cache) > self.max_cache_size:
-            # Remove oldest item
-            self.cache.popitem(last=False)
+        """Add to the byte-bounded response cache (subject to its admission rules)"""
+        if not value.truncated and value.streamed is None:
+            self.cache.put(key, value)
+
+    def _read_response(self, response, url, binary_handler=None):
+        """
+        Shared body reader for make_request: RobustResponse with the body capped at max_body_size.
+
+        When binary_handler is given and the headers announce a binary content
+        type, the still-unread response is passed to it instead and the
+        returned metadata is kept on the RobustResponse; no body is buffered.
+        """
+        if binary_handler and _is_binary_content_type(response.headers.get('Content-Type')):
+            try:
+                streamed = binary_handler(response)
+            finally:
+                response.close()
+            return RobustResponse(b'', response, url, streamed=streamed)
+        raw_content, truncated = _read_body(response, self.max_body_size)
+        if truncated:
+            logging.warning(f"Body of {url} exceeds {self.max_body_size} bytes; not loaded into memory")
+        elif self.http_cache:
+            self.http_cache.store(url, response.status_code, response.headers, raw_content)
+        return RobustResponse(raw_content, response, url, truncated=truncated)
+
+    def _revalidated_response(self, url, response, cached, cache_key):
+        """A 304 for a stale HTTP cache entry: refresh it and serve the cached body."""
+        self.http_cache.revalidated(url, response.headers)
+        robust_response = RobustResponse(cached.content, cached, url)
+        self._add_to_cache(cache_key, robust_response)
+        return robust_response
 
     def get_random_headers(self):
         
@@ -1223,13 +3208,26 @@ class WebScraper:
             'Pragma': 'no-cache'
         }
     
-    def make_request(self, url, retries=3):
+    def make_request(self, url, retries=3, binary_handler=None):
         
         thread_name = threading.current_thread().name
         with self.thread_id_lock:
             thread_id = str(self.thread_ids.get(thread_name, 0))
               
         cache_key = hashlib.md5(url.encode()).hexdigest()
+        cached_response = self.cache.get(cache_key)
+        if cached_response is not None:
+            logging.debug(f"Cache hit for {url}")
+            return cached_response
+
+        cached = self.http_cache.lookup(url) if self.http_cache else None
+        if cached is not None and cached.fresh:
+            logging.debug(f"HTTP cache hit for {url}")
+            robust_response = RobustResponse(cached.content, cached, url)
+            self._add_to_cache(cache_key, robust_response)
+            return robust_response
+        # Stale entry: every path below revalidates it instead of refetching
+        validators = cached.validators() if cached is not None else {}
         
         for attempt in range(retries):
             if shutdown_flag.is_set():
@@ -1240,12 +3238,7 @@ class WebScraper:
             proxy = None
 
             try:
-                cache_key = hashlib.md5(url.encode()).hexdigest()
-                if cache_key in self.cache:
-                    logging.debug(f"Cache hit for {url}")
-                    return self.cache[cache_key]
-
-                self.rate_limiter.wait()
+                self.scheduler.wait(url)
 
                 if self.use_selenium and hasattr(self, 'driver'):
                     return self._selenium_request(url)
@@ -1264,6 +3257,7 @@ class WebScraper:
                             time.sleep(additional_delay)
                 
                 headers = self.get_random_headers()
+                headers.update(validators)
                 
                 start_time = time.time()
                 response = self.session.get(
@@ -1272,32 +3266,40 @@ class WebScraper:
                     proxies=proxy,
                     timeout=(5, 15),
                     verify=False,
-                    allow_redirects=True
+                    allow_redirects=True,
+                    stream=True
                 )
-                response_time = time.time() - start_time
+                try:
+                    response_time = time.time() - start_time
                 
-                if response.status_code == 200:
-                    raw_content = b''
-                    for chunk in response.iter_content(chunk_size=8192):
-                        raw_content += chunk
+                    if response.status_code == 304 and cached is not None:
+                        self.scheduler.adjust(url, response_time, response.status_code)
+                        if proxy:
+                            self.proxy_manager.record_proxy_success(proxy, response_time)
+                        return self._revalidated_response(url, response, cached, cache_key)
+                    elif response.status_code == 200:
+                        robust_response = self._read_response(response, url, binary_handler)
                     
-                    robust_response = RobustResponse(raw_content, response, url)
+                        self.scheduler.adjust(url, response_time, response.status_code)
                     
-                    self.rate_limiter.adjust(response_time, response.status_code)
+                        # Record successful proxy usage
+                        if proxy:
+                            self.proxy_manager.record_proxy_success(proxy, response_time)
                     
-                    # Record successful proxy usage
-                    if proxy:
-                        self.proxy_manager.record_proxy_success(proxy, response_time)
-                    
-                    # Bounded cache - remove oldest if at max size
-                    self._add_to_cache(cache_key, robust_response)
-                    return robust_response
-                else:
-                    logging.warning(f"HTTP {response.status_code} for {url}{proxy_info}")
+                        # Bounded cache - remove oldest if at max size
+                        self._add_to_cache(cache_key, robust_response)
+                        return robust_response
+                    else:
+                        logging.warning(f"HTTP {response.status_code} for {url}{proxy_info}")
+                        self.scheduler.adjust(url, response_time, response.status_code,
+                                              retry_after=response.headers.get('Retry-After'))
                     
-                    # Record proxy failure for non-success status codes
-                    if proxy:
-                        self.proxy_manager.record_proxy_failure(proxy)
+                        # Record proxy failure for non-success status codes
+                        if proxy:
+                            self.proxy_manager.record_proxy_failure(proxy)
+                finally:
+                    # Streamed: the connection only goes back to the pool once closed
+                    response.close()
                     
             except Exception as e:
                 error_msg = str(e)
@@ -1313,9 +3315,11 @@ class WebScraper:
                     self.proxy_manager.record_proxy_failure(proxy)
                     if hasattr(self.proxy_manager, 'mark_proxy_failed'):
                         self.proxy_manager.mark_proxy_failed(proxy)
-                    with self.proxy_manager.proxy_lock:
-                        if thread_id in self.proxy_manager.proxy_counters:
-                            self.proxy_manager.proxy_counters[thread_id]['request_count'] = 0
+                    proxy_counters = getattr(self.proxy_manager, 'proxy_counters', None)
+                    if proxy_counters is not None:
+                        with self.proxy_manager.proxy_lock:
+                            if thread_id in proxy_counters:
+                                proxy_counters[thread_id]['request_count'] = 0
                 else:
                     logging.error(f"Request failed for {url}{proxy_info}: {e}")
                 
@@ -1329,6 +3333,7 @@ class WebScraper:
             logging.info(f"Trying untried proxy {proxy_host} for {url}")
             try:
                 headers = self.get_random_headers()
+                headers.update(validators)
                 start_time = time.time()
                 response = self.session.get(
                     url, 
@@ -1336,22 +3341,26 @@ class WebScraper:
                     proxies=untried_proxy,
                     timeout=(5, 15),
                     verify=False,
-                    allow_redirects=True
+                    allow_redirects=True,
+                    stream=True
                 )
-                response_time = time.time() - start_time
+                try:
+                    response_time = time.time() - start_time
                 
-                if response.status_code == 200:
-                    raw_content = b''
-                    for chunk in response.iter_content(chunk_size=8192):
-                        raw_content += chunk
-                    
-                    robust_response = RobustResponse(raw_content, response, url)
-                    self.rate_limiter.adjust(response_time, response.status_code)
-                    # Bounded cache - remove oldest if at max size
-                    self._add_to_cache(cache_key, robust_response)
-                    return robust_response
-                else:
-                    logging.warning(f"HTTP {response.status_code} for {url} via {proxy_host}")
+                    if response.status_code == 304 and cached is not None:
+                        self.scheduler.adjust(url, response_time, response.status_code)
+                        return self._revalidated_response(url, response, cached, cache_key)
+                    elif response.status_code == 200:
+                        robust_response = self._read_response(response, url, binary_handler)
+                        self.scheduler.adjust(url, response_time, response.status_code)
+                        # Bounded cache - remove oldest if at max size
+                        self._add_to_cache(cache_key, robust_response)
+                        return robust_response
+                    else:
+                        logging.warning(f"HTTP {response.status_code} for {url} via {proxy_host}")
+                finally:
+                    # Streamed: the connection only goes back to the pool once closed
+                    response.close()
                     
             except Exception as e:
                 logging.error(f"Untried proxy {proxy_host} failed for {url}: {e}")
@@ -1361,6 +3370,7 @@ class WebScraper:
             logging.info(f"All {self.proxy_manager.original_proxy_count} proxies have been tried and failed for {url}, using direct connection...")
             try:
                 headers = self.get_random_headers()
+                headers.update(validators)
                 start_time = time.time()
                 response = self.session.get(
                     url, 
@@ -1368,22 +3378,26 @@ class WebScraper:
                     proxies=None,
                     timeout=(5, 15),
                     verify=False,
-                    allow_redirects=True
+                    allow_redirects=True,
+                    stream=True
                 )
-                response_time = time.time() - start_time
+                try:
+                    response_time = time.time() - start_time
                 
-                if response.status_code == 200:
-                    raw_content = b''
-                    for chunk in response.iter_content(chunk_size=8192):
-                        raw_content += chunk
-                    
-                    robust_response = RobustResponse(raw_content, response, url)
-                    self.rate_limiter.adjust(response_time, response.status_code)
-                    # Bounded cache - remove oldest if at max size
-                    self._add_to_cache(cache_key, robust_response)
-                    return robust_response
-                else:
-                    logging.warning(f"Direct connection HTTP {response.status_code} for {url}")
+                    if response.status_code == 304 and cached is not None:
+                        self.scheduler.adjust(url, response_time, response.status_code)
+                        return self._revalidated_response(url, response, cached, cache_key)
+                    elif response.status_code == 200:
+                        robust_response = self._read_response(response, url, binary_handler)
+                        self.scheduler.adjust(url, response_time, response.status_code)
+                        # Bounded cache - remove oldest if at max size
+                        self._add_to_cache(cache_key, robust_response)
+                        return robust_response
+                    else:
+                        logging.warning(f"Direct connection HTTP {response.status_code} for {url}")
+                finally:
+                    # Streamed: the connection only goes back to the pool once closed
+                    response.close()
                     
             except Exception as e:
                 logging.error(f"Direct connection failed for {url}: {e}")
@@ -1406,6 +3420,10 @@ class WebScraper:
                     self.text = content
                     self.url = url
                     self.status_code = 200
+                    self.headers = {'content-type': 'text/html; charset=utf-8'}
+                    # Rendered pages are always loaded whole
+                    self.truncated = False
+                    self.streamed = None
             
             return SeleniumResponse(self.driver.page_source, url)
         except Exception as e:
@@ -1540,7 +3558,7 @@ class WebScraper:
         
         text = re.sub(r'<[^>]+>', ' ', text)
         
-        text = BeautifulSoup(text, 'html.parser').get_text()
+        text = BeautifulSoup(text, self.html_parser).get_text()
         
         text = re.sub(r'\s+', ' ', text)
         
@@ -1720,14 +3738,6 @@ class WebScraper:
         else:
             display_url = url.replace(f'{parsed_start.scheme}://{parsed_start.netloc}', '') or '/'
         
-        response = self.make_request(url)
-        if not response:
-            return None
-        
-        content_type = response.headers.get('content-type', '').lower()
-        is_binary = any(t in content_type for t in ['image/', 'application/pdf', 'application/zip', 
-                                                   'video/', 'audio/', 'application/octet-stream'])
-        
         should_process = False
         if self.dump_all:
             should_process = True
@@ -1735,14 +3745,40 @@ class WebScraper:
             url_lower = url.lower()
             should_process = any(url_lower.endswith(f'.{ft}') for ft in self.filetypes)
         
+        # Binary bodies are detected from the headers and never buffered:
+        # they are streamed to disk (or just measured) by _handle_binary
+        response = self.make_request(
+            url, binary_handler=lambda r: self._handle_binary(url, r, should_process))
+        if not response:
+            return None
+        
+        content_type = response.headers.get('content-type', '').lower()
+        is_binary = response.streamed is not None or _is_binary_content_type(content_type)
+        
+        if response.truncated and not is_binary:
+            logging.warning(f"Skipping {display_url}: page larger than {self.max_body_size} bytes")
+            return None
+
         if is_binary:
+            size = len(response.content)
+            if response.streamed is not None:
+                size = response.streamed['size']
+            elif response.truncated:
+                declared = response.headers.get('Content-Length', '')
+                size = int(declared) if declared.isdigit() else None
             if should_process:
-                if self.crawl_only:
+                if response.streamed is not None and response.streamed.get('path'):
+                    logging.info(f"Downloaded: {display_url}")
+                elif response.streamed is not None and not self.crawl_only:
+                    logging.warning(f"Failed to download {display_url}")
+                elif response.truncated and not self.crawl_only:
+                    logging.warning(f"Not saving {display_url}: larger than {self.max_body_size} bytes")
+                elif self.crawl_only:
                     file_info = {
                         'url': url,
                         'path': urllib.parse.urlparse(url).path,
                         'content_type': content_type,
-                        'size': len(response.content),
+                        'size': size,
                         'timestamp': datetime.now().isoformat()
                     }
                     with self.files_lock:
@@ -1750,22 +3786,25 @@ class WebScraper:
                         # Keep list bounded
                         if len(self.discovered_files) > self.max_discovered_files:
                             self.discovered_files.pop(0)  # Remove oldest
-                    logging.info(f"Found file: {display_url} ({content_type}, {len(response.content)} bytes)")
+                    logging.info(f"Found file: {display_url} ({content_type}, {size} bytes)")
                 else:
                     self._save_file(url, response.content)
                     logging.info(f"Downloaded: {display_url}")
-            return {
+            result = {
                 'url': url,
                 'timestamp': datetime.now().isoformat(),
                 'type': 'binary',
                 'content_type': content_type,
-                'size': len(response.content),
+                'size': size,
                 'links': []
             }
+            if response.streamed is not None and response.streamed.get('sha256'):
+                result['sha256'] = response.streamed['sha256']
+            return result
         
         logging.info(f"Scraping: {display_url}")
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, self.html_parser)
         
         raw_text = response.text if hasattr(response, 'text') else ''
         
@@ -1915,39 +3954,97 @@ class WebScraper:
         except Exception as e:
             logging.error(f"Error saving structured data: {e}")
     
-    def _save_file(self, url, content):
-        
-        try:
-            parsed_url = urllib.parse.urlparse(url)
-            path_parts = parsed_url.path.strip('/').split('/')
+    def _handle_binary(self, url, response, should_process):
+        """
+        Binary handler for make_request. Saves the body by streaming it when
+        should_process (and not crawl_only); otherwise only its size is taken,
+        from Content-Length or by counting chunks. Returns metadata only.
+        """
+        if should_process and not self.crawl_only:
+            return self._stream_file(url, response)
+        declared = response.headers.get('Content-Length', '')
+        if declared.isdigit():
+            return {'size': int(declared)}
+        if not should_process:
+            return {'size': None}
+        size = 0
+        for chunk in response.iter_content(chunk_size=65536):
+            size += len(chunk)
+        return {'size': size}
+
+    def _download_path(self, url):
+        """
+        Reserve a free path under downloads/ mirroring the URL path. The name
+        is claimed by creating an empty file exclusively, so threads mapping
+        to the same name each get their own; the caller fills it in.
+        """
+        parsed_url = urllib.parse.urlparse(url)
+        path_parts = parsed_url.path.strip('/').split('/')
             
-            if len(path_parts) > 1:
-                subdir = os.path.join(self.domain_dir, 'downloads', *path_parts[:-1])
-                os.makedirs(subdir, exist_ok=True)
-                filename = path_parts[-1]
+        if len(path_parts) > 1:
+            subdir = os.path.join(self.domain_dir, 'downloads', *path_parts[:-1])
+            os.makedirs(subdir, exist_ok=True)
+            filename = path_parts[-1]
+        else:
+            subdir = os.path.join(self.domain_dir, 'downloads')
+            filename = path_parts[0] if path_parts else 'index.html'
+        
+        if not filename:
+            filename = 'index.html'
+        
+        if '.' not in filename:
+            content_type = mimetypes.guess_type(url)[0]
+            if content_type:
+                ext = mimetypes.guess_extension(content_type)
+                if ext:
+                    filename += ext
             else:
-                subdir = os.path.join(self.domain_dir, 'downloads')
-                filename = path_parts[0] if path_parts else 'index.html'
-            
-            if not filename:
-                filename = 'index.html'
-            
-            if '.' not in filename:
-                content_type = mimetypes.guess_type(url)[0]
-                if content_type:
-                    ext = mimetypes.guess_extension(content_type)
-                    if ext:
-                        filename += ext
-                else:
-                    filename += '.html'
-            
-            filepath = os.path.join(subdir, filename)
-            
-            base, ext = os.path.splitext(filepath)
-            counter = 1
-            while os.path.exists(filepath):
+                filename += '.html'
+        
+        filepath = os.path.join(subdir, filename)
+        
+        base, ext = os.path.splitext(filepath)
+        counter = 1
+        while True:
+            try:
+                with open(filepath, 'x'):
+                    return filepath
+            except FileExistsError:
                 filepath = f"{base}_{counter}{ext}"
                 counter += 1
+
+    def _stream_file(self, url, response):
+        """Stream a response body to its download path, hashing as it goes."""
+        filepath = tmp_path = None
+        try:
+            filepath = self._download_path(url)
+            fd, tmp_path = tempfile.mkstemp(suffix='.part', dir=os.path.dirname(filepath))
+            sha = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    if shutdown_flag.is_set():
+                        raise IOError("shutdown requested")
+                    f.write(chunk)
+                    sha.update(chunk)
+                    size += len(chunk)
+            # mkstemp files are 0600; take the umask-derived mode of the reserved name
+            shutil.copymode(filepath, tmp_path)
+            os.replace(tmp_path, filepath)
+            logging.info(f"Saved file: {os.path.relpath(filepath, self.domain_dir)}")
+            return {'path': filepath, 'size': size, 'sha256': sha.hexdigest()}
+        except Exception as e:
+            logging.error(f"Failed to save file {url}: {e}")
+            # Drop the temp file and give back the reserved name
+            for path in (tmp_path, filepath):
+                if path and os.path.exists(path):
+                    os.remove(path)
+            return {'path': None, 'size': None}
+
+    def _save_file(self, url, content):
+        
+        try:
+            filepath = self._download_path(url)
             
             with open(filepath, 'wb') as f:
                 f.write(content)
@@ -2036,31 +4133,18 @@ class WebScraper:
                 return self.url_queue.popleft()
             return None
     
-    def add_urls_to_queue(self, urls, current_depth):
-        
-        with self.queue_lock:
-            for url in urls:
-                with self.visited_lock:
-                    if url not in self.visited and current_depth < self.depth:
-                        self.url_queue.append((url, current_depth + 1))
-    
-    def mark_visited(self, url):
-
-        with self.visited_lock:
-            if url in self.visited:
-                # Move to end for LRU
-                self.visited.move_to_end(url)
-                return True
-
-            # Add new URL with size limit
-            self.visited[url] = True
-
-            # Remove oldest if over limit
-            if len(self.visited) > self.max_visited_size:
-                self.visited.popitem(last=False)  # Remove oldest
-
-            return False
-    
+    def add_urls_to_queue(self, urls, current_depth):
+        
+        if current_depth >= self.depth:
+            return
+        with self.queue_lock:
+            for url in urls:
+                # add() is an atomic check-and-insert, so each URL is queued at most once
+                if self.visited.add(url):
+                    self.url_queue.append((url, current_depth + 1))
+                    if self.state_store:
+                        self.state_store.record_enqueued(url, current_depth + 1)
+    
     def worker_thread(self):
         
         scraped_data = []
@@ -2093,13 +4177,12 @@ class WebScraper:
             consecutive_empty = 0
             current_url, current_depth = url_info
             
-            if self.mark_visited(current_url):
-                logging.debug(f"Worker {thread_name}: {current_url} already visited")
-                continue
-            
             if current_depth > self.depth:
                 logging.debug(f"Worker {thread_name}: {current_url} exceeds depth {self.depth}")
                 continue
+
+            with self.visited_lock:
+                self.pages_visited += 1
             
             data = self.scrape_page(current_url)
             if data:
@@ -2109,6 +4192,9 @@ class WebScraper:
                     self.add_urls_to_queue(data['links'], current_depth)
             else:
                 logging.warning(f"Failed to scrape {current_url}")
+
+            if self.state_store and not shutdown_flag.is_set():
+                self.state_store.record_visited(current_url, current_depth)
         
         with self.workers_lock:
             self.active_workers -= 1
@@ -2148,7 +4234,7 @@ class WebScraper:
                     with self.queue_lock:
                         queue_size = len(self.url_queue)
                     with self.visited_lock:
-                        visited_count = len(self.visited)
+                        visited_count = self.pages_visited
                     
                     if visited_count != last_visited_count:
                         proxy_status = ""
@@ -2204,6 +4290,16 @@ class WebScraper:
         
         if self.use_selenium and hasattr(self, 'driver'):
             self.driver.quit()
+
+        if self.state_store:
+            self.state_store.close()
+
+        stats = self.cache.stats()
+        logging.info(f"Response cache: {stats['entries']} entries, {stats['bytes'] / 1e6:.1f}/{stats['max_bytes'] / 1e6:.1f} MB, "
+                     f"hit rate {stats['hit_rate']:.1%} ({stats['hits']} hits, {stats['misses']} misses), "
+                     f"{stats['evictions']} evictions, rejected {stats['rejected']}")
+        self.cache.clear()
+        self.session.log_stats()
         
         return all_data
 
@@ -3032,6 +5128,102 @@ class DynamicScraper:
 
     # ... other DynamicScraper methods like monitor_network can remain ...
 
+# Markup patterns that suggest client-side rendering (see should_use_dynamic_scraping)
+_DYNAMIC_CONTENT_PATTERNS = [re.compile(p, re.IGNORECASE | re.DOTALL) for p in (
+    r'<script[^>]*src=[^>]*>',  # External JS files
+    r'<div[^>]*id=["\'][^"\']*react[^"\']*["\']',  # React root elements
+    r'<div[^>]*data-react',  # React data attributes
+    r'window\.__INITIAL_STATE__',  # Common SPA pattern
+    r'window\.__REDUX_STATE__',  # Redux state
+    r'angular\.module',  # Angular modules
+    r'vue\.createApp',  # Vue 3 apps
+    r'new Vue',  # Vue 2 apps
+    r'\.getElementById.*\.innerHTML\s*=',  # Dynamic content insertion
+    r'fetch\s*\(',  # Modern fetch API usage
+    r'\$\.ajax',  # jQuery AJAX calls
+    r'XMLHttpRequest',  # AJAX requests
+    r'document\.write',  # Dynamic document writing
+    r'setTimeout.*function',  # Delayed content loading
+    r'addEventListener.*load',  # Load event handlers
+    r'onload\s*=',  # Load event handlers
+    r'<noscript>',  # Content that requires JS
+    r'<!--\[if[^>]*IE.*\]>',  # Conditional comments that might hide content
+)]
+
+_UNSET = object()
+
+
+class PageDocument:
+    """
+    A fetched page that is parsed and scanned at most once.
+
+    The parse tree, lowercased text, extracted links, per-link download
+    decisions and dynamic-page classification are computed on first access
+    and cached, so every detection and extraction pass on the page shares
+    them. Treat the tree as read-only.
+    """
+
+    def __init__(self, siphon, url, html):
+        self.siphon = siphon
+        self.url = url
+        self.html = html or ''
+        self._soup = _UNSET
+        self._html_lower = None
+        self._links = None
+        self._download_decisions = {}
+        self._target_files = None
+        self._dynamic_score = None
+        self._needs_dynamic = None
+
+    @property
+    def soup(self):
+        if self._soup is _UNSET:
+            self._soup = self.siphon.parse_html(self.html)
+        return self._soup
+
+    @property
+    def html_lower(self):
+        if self._html_lower is None:
+            self._html_lower = self.html.lower()
+        return self._html_lower
+
+    @property
+    def links(self):
+        if self._links is None:
+            if self._soup is not _UNSET and self._soup is not None:
+                self._links = self.siphon.extract_links(self._soup, self.url)
+            else:
+                self._links = self.siphon.extract_links_from_html(self.html, self.url)
+        return self._links
+
+    def should_download(self, link):
+        """Cached Siphon.should_download_file for links seen on this page."""
+        decision = self._download_decisions.get(link)
+        if decision is None:
+            decision = self._download_decisions[link] = self.siphon.should_download_file(link)
+        return decision
+
+    @property
+    def target_files(self):
+        if self._target_files is None:
+            # Batch the HEAD probes for extensionless links before classifying
+            self.siphon.prefetch_mime_types(self.links)
+            self._target_files = [link for link in self.links if self.should_download(link)]
+        return self._target_files
+
+    @property
+    def dynamic_score(self):
+        """Number of client-side rendering patterns found in the markup."""
+        if self._dynamic_score is None:
+            self._dynamic_score = sum(1 for pattern in _DYNAMIC_CONTENT_PATTERNS if pattern.search(self.html_lower))
+        return self._dynamic_score
+
+    @property
+    def needs_dynamic(self):
+        if self._needs_dynamic is None:
+            self._needs_dynamic = self.siphon.is_dynamic_page_needed(self, self.url)
+        return self._needs_dynamic
+
 class Siphon:
     def __init__(self, base_url=None, output_dir="output", max_depth=1, delay=0, max_urls=None,
                  timeout=10, user_agent=None, verify_ssl=True, headers=None, cookies=None, auth=None,
@@ -3042,7 +5234,18 @@ class Siphon:
                  click_elements=None,
                  # Phase 0 additions
                  events_ndjson=None, manifest_path=None,
-                 retries=3, backoff_base_ms=250, respect_robots=False):
+                 events_level="debug", events_sample=None, events_queue=100000,
+                 manifest_flush_interval=1.0, manifest_batch_size=1000, manifest_fsync="close",
+                 retries=3, backoff_base_ms=250, respect_robots=False,
+                 engine="threads", async_concurrency=500,
+                 seen_capacity=1000000, seen_error_rate=0.001,
+                 state_db=None, resume=False, parser="html.parser", link_extractor="tree",
+                 parse_workers=0, download_segments=1, segment_min_size=16 * 1024 * 1024,
+                 download_threads=0, download_queue_size=1000,
+                 mime_probe_ttl=3600, mime_probe_concurrency=16, mime_probe_patterns=False,
+                 cas=False, incremental_manifest=None,
+                 http_cache=None, http_cache_max_mb=1024, http_cache_min_ttl=0,
+                 pool_per_host=0, proxy_sessions=64, dns_cache=False, dns_ttl=300, preconnect=False):
 
         self.base_url = base_url
         if not base_url:
@@ -3071,25 +5274,87 @@ class Siphon:
         self.include_urls = [pat.strip() for pat in include_urls if pat.strip()] if isinstance(include_urls, list) else ([pat.strip() for pat in include_urls.split(',') if pat.strip()] if include_urls else [])
         
         self.custom_parser = custom_parser
+        self.html_parser = _resolve_html_parser(parser)
+        self.link_extractor = link_extractor
+        # Parse stage: 0 parses on the fetching thread, N > 0 hands pages to N worker processes
+        self.parse_workers = max(0, int(parse_workers or 0))
+        self.parse_pool = None
+        self.parse_pool_lock = threading.Lock()
         self.click_elements = click_elements
         # Phase 0
-        self.events = NDJSONEmitter(events_ndjson) if events_ndjson else None
+        if isinstance(events_sample, str):
+            events_sample = NDJSONEmitter.parse_sample(events_sample)
+        self.events = NDJSONEmitter(events_ndjson, level=events_level, sample=events_sample,
+                                    max_queue=events_queue) if events_ndjson else None
         self.manifest_path = manifest_path
-        self.manifest_lock = threading.Lock()
+        self.manifest = BatchedLineWriter(manifest_path, flush_interval=manifest_flush_interval,
+                                          batch_size=manifest_batch_size, fsync=manifest_fsync,
+                                          name='manifest-writer') if manifest_path else None
         self.retries = max(0, int(retries))
         self.backoff_base_ms = max(1, int(backoff_base_ms))
         self.respect_robots = bool(respect_robots)
+        # Crawl engine: 'threads' (ThreadPoolExecutor workers) or 'async' (single event loop)
+        self.engine = engine
+        self.async_concurrency = max(1, int(async_concurrency))
 
         # Use OrderedDict for bounded collections with LRU eviction
         from collections import OrderedDict
-        self.visited_urls = OrderedDict()
-        self.max_visited_urls = 100000
+        # Seen-set of every URL ever enqueued (scalable Bloom filter, no eviction)
+        self.visited_urls = URLSeenSet(capacity=seen_capacity, error_rate=seen_error_rate)
+        self.pages_crawled = 0
+        # Persistent crawl state (--state-db / --resume)
+        self.state_store = CrawlStateStore(state_db) if state_db else None
+        self.resume = bool(resume)
+        if self.state_store and not self.resume:
+            # --state-db starts a new crawl; only --resume picks up what is in the file
+            self.state_store.reset()
         self.discovered_files = OrderedDict()
         self.max_discovered_files = 10000
         self.downloaded_files = OrderedDict()
         self.max_downloaded_files = 10000
-
-        self.session = requests.Session()
+        # Large files with Accept-Ranges are fetched as this many parallel ranges (1 = off)
+        self.download_segments = max(1, int(download_segments or 1))
+        self.segment_min_size = max(1, int(segment_min_size))
+        # Separate download pool (0 = crawl workers download inline); started by crawl()
+        self.download_threads = max(0, int(download_threads or 0))
+        self.download_queue_size = download_queue_size
+        self.download_pool = None
+        # HEAD probe results for extensionless links, batched per page
+        self.mime_probes = MimeProbeCache(ttl=mime_probe_ttl, learn_patterns=mime_probe_patterns)
+        self.mime_probe_concurrency = max(1, int(mime_probe_concurrency))
+        self.mime_probe_pool = None
+        self.mime_probe_pool_lock = threading.Lock()
+        # Content-addressed store: <output>/objects/ab/cd/<sha256>, shared by all sites in output_dir
+        self.cas_dir = os.path.join(output_dir, 'objects') if cas else None
+        self.cas_lock = threading.Lock()
+        # Disk-backed HTTP cache for page fetches (--http-cache DIR)
+        self.http_cache = HTTPCache(http_cache, max_bytes=int(http_cache_max_mb * 1024 * 1024),
+                                    min_ttl=http_cache_min_ttl) if http_cache else None
+        # --incremental: previous manifest, used for conditional GETs
+        self.previous_artifacts = self._load_manifest_index(incremental_manifest) if incremental_manifest else {}
+        if incremental_manifest:
+            logging.info(f"Incremental mode: {len(self.previous_artifacts)} artifacts from {incremental_manifest}")
+        # Downloads a previous --resume'd run queued but never finished
+        self.resumed_downloads = []
+        # URLs whose .part file a thread is currently writing
+        self.downloads_in_progress = set()
+        self.downloads_in_progress_lock = threading.Lock()
+
+        # Process-wide DNS cache (installed before proxies load so their hosts get prefetched)
+        # Only the instance that patched getaddrinfo undoes it on close()
+        self._owns_dns_cache = bool(dns_cache) and get_dns_cache() is None
+        self.dns_cache = install_dns_cache(ttl=dns_ttl) if dns_cache else None
+        # Hosts already handed to warm_hosts; pre-connects run on warm_pool
+        self.preconnect = preconnect
+        self.warmed_hosts = set()
+        self.warm_lock = threading.Lock()
+        self.warm_pool = None
+
+        # One keep-alive pool per proxy, sized for every thread that can hit a host at once
+        self.session = SessionPool(
+            pool_maxsize=_pool_maxsize(max_threads, self.download_threads * self.download_segments,
+                                       self.mime_probe_concurrency, per_host=pool_per_host),
+            pool_connections=max(10, max_threads), max_sessions=proxy_sessions)
         if self.request_headers:
             self.session.headers.update(self.request_headers)
         if self.request_cookies:
@@ -3120,7 +5385,8 @@ class Siphon:
         else:
             logging.info("No proxies loaded, using direct connection")
 
-        self.rate_limiter = RateLimiter(initial_delay=self.delay if self.delay > 0 else 0.25)
+        # Per-host politeness: --delay is the per-host floor; 429/5xx and Retry-After raise it per host
+        self.scheduler = HostScheduler(initial_delay=self.delay)
         self.cache = {}
 
         # Track last URL for realistic Referer headers
@@ -3129,7 +5395,7 @@ class Siphon:
 
         # Threading attributes
         self.max_threads = max_threads
-        self.url_queue = queue.Queue()
+        self.url_queue = self.scheduler  # frontier hands out URLs from whichever host is ready next
         self.queue_lock = threading.Lock()
         self.visited_lock = threading.Lock()
         self.thread_counter = 0 # For assigning sequential thread IDs
@@ -3207,15 +5473,21 @@ class Siphon:
             self.dynamic_scraper = None
             
     def should_use_dynamic_scraping(self, url, static_links=None, static_content=None):
-        """Determine if dynamic scraping should be used for this URL"""
+        """
+        Determine if dynamic scraping should be used for this URL.
+        static_content may be raw HTML or a PageDocument; with a PageDocument
+        the link classification and pattern scan are shared with other passes.
+        """
         if self.dynamic_mode == "always":
             return True
         elif self.dynamic_mode == "never":
             return False
 
+        page = static_content if isinstance(static_content, PageDocument) else None
+
         # In auto mode, check if static scraping found any target files
         if static_links is not None:
-            target_files = self.filter_target_files(static_links)
+            target_files = self.filter_target_files(static_links, page=page)
             if target_files:
                 return False  # Static scraping found target files
 
@@ -3230,44 +5502,20 @@ class Siphon:
             if indicator in url_lower:
                 return True
 
-        # NEW: Analyze static content for dynamic indicators
+        # Analyze static content for dynamic indicators
         if static_content:
-            content_lower = static_content.lower()
-
-            # Check for common dynamic content patterns
-            dynamic_patterns = [
-                r'<script[^>]*src=[^>]*>',  # External JS files
-                r'<div[^>]*id=["\'][^"\']*react[^"\']*["\']',  # React root elements
-                r'<div[^>]*data-react',  # React data attributes
-                r'window\.__INITIAL_STATE__',  # Common SPA pattern
-                r'window\.__REDUX_STATE__',  # Redux state
-                r'angular\.module',  # Angular modules
-                r'vue\.createApp',  # Vue 3 apps
-                r'new Vue',  # Vue 2 apps
-                r'\.getElementById.*\.innerHTML\s*=',  # Dynamic content insertion
-                r'fetch\s*\(',  # Modern fetch API usage
-                r'\$\.ajax',  # jQuery AJAX calls
-                r'XMLHttpRequest',  # AJAX requests
-                r'document\.write',  # Dynamic document writing
-                r'setTimeout.*function',  # Delayed content loading
-                r'addEventListener.*load',  # Load event handlers
-                r'onload\s*=',  # Load event handlers
-                r'<noscript>',  # Content that requires JS
-                r'<!--\[if[^>]*IE.*\]>',  # Conditional comments that might hide content
-            ]
+            if page is None:
+                page = PageDocument(self, url, static_content)
 
-            # Count dynamic patterns found
-            dynamic_score = 0
-            for pattern in dynamic_patterns:
-                if re.search(pattern, content_lower, re.IGNORECASE | re.DOTALL):
-                    dynamic_score += 1
+            # Count dynamic patterns found (compiled once in _DYNAMIC_CONTENT_PATTERNS)
+            dynamic_score = page.dynamic_score
 
             # If we find multiple dynamic indicators, use dynamic scraping
             if dynamic_score >= 3:
                 return True
 
             # Check for minimal static content (possible lazy loading)
-            if len(static_content.strip()) < 500 and dynamic_score > 0:
+            if len(page.html.strip()) < 500 and dynamic_score > 0:
                 return True
 
         return False  # Default to static scraping
@@ -3351,9 +5599,27 @@ class Siphon:
         """
         if url is None:
             url = self.base_url
+
+        if self.engine == 'async':
+            AsyncCrawlEngine(self, concurrency=self.async_concurrency).run(url)
+            return
             
-        # Initialize the queue with the starting URL
-        self.url_queue.put((url, 0))
+        # Initialize the queue with the starting URL (or the restored frontier)
+        for item in self._initial_frontier(url):
+            self.url_queue.put(tuple(item))
+
+        if self.download_threads and not self.crawl_only and self.download_pool is None:
+            self.download_pool = DownloadPool(self, workers=self.download_threads,
+                                              max_queue=self.download_queue_size)
+        # Downloads an interrupted run had queued but not finished
+        for link in self.resumed_downloads:
+            if shutdown_flag.is_set():
+                break
+            if self.download_pool:
+                self.download_pool.submit(link)
+            else:
+                self.download_file(link)
+        self.resumed_downloads = []
         
         # Start worker threads
         with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
@@ -3378,6 +5644,10 @@ class Siphon:
                 # Cancel all futures
                 for f in futures:
                     f.cancel()
+
+        if self.download_pool:
+            # The frontier is drained; let queued transfers finish
+            self.download_pool.join()
     
     def worker_thread(self):
         """Worker thread that processes URLs from the queue."""
@@ -3410,26 +5680,18 @@ class Siphon:
             
             try:
                 # Check if we should process this URL
+                # URLs are de-duplicated when enqueued, so only the limits need checking here
                 with self.visited_lock:
-                    if url in self.visited_urls:
-                        self.url_queue.task_done()
-                        continue
-                    
-                    if self.max_urls is not None and len(self.visited_urls) >= self.max_urls:
-                        self.url_queue.task_done()
+                    if self.max_urls is not None and self.pages_crawled >= self.max_urls:
                         continue
                         
                     if depth > self.max_depth:
-                        self.url_queue.task_done()
                         continue
                         
-                    if not self.should_crawl_url(url):
-                        self.url_queue.task_done()
+                    if not self._url_in_scope(url):
                         continue
                         
-                    self.visited_urls[url] = True
-                    if len(self.visited_urls) > self.max_visited_urls:
-                        self.visited_urls.popitem(last=False)
+                    self.pages_crawled += 1
                 
                 # Show progress for all URLs when verbose
                 if self.verbose:
@@ -3439,18 +5701,32 @@ class Siphon:
                 
                 # Phase 1: Static scrape attempt (if not in 'always' dynamic mode)
                 html_content = None
+                fetched_file = False
                 if self.dynamic_mode != 'always':
-                    html_content = self.fetch_url(url)
+                    result = self.fetch_url(url)
+                    if result is not None and result.is_html:
+                        html_content = result.text
+                    elif result is not None:
+                        # Not a page: never decoded or parsed. Download it from
+                        # this same response if it is a target, else drop it.
+                        fetched_file = True
+                        try:
+                            if self._wants_fetched_download(result):
+                                self.download_file(url, fetched=result)
+                        finally:
+                            result.close()
 
                 # Phase 2: Process static results or decide to use dynamic
+                page = None
                 if html_content:
                     if self.verbose: print(f"    -> Static fetch OK")
-                    soup = self.parse_html(html_content)
-                    static_links = self.extract_links(soup, url)
+                    # One document per page: parse, links and classifications are shared
+                    page = PageDocument(self, url, html_content)
+                    static_links = page.links
                     links.update(static_links)
 
                     # If static scrape found files, we might not need dynamic
-                    target_files_found = self.filter_target_files(static_links)
+                    target_files_found = page.target_files
                     if target_files_found and self.dynamic_mode == 'auto':
                         if self.verbose: print(f"    -> Static found target files, skipping dynamic mode")
                         # We have what we need, can skip dynamic.
@@ -3461,6 +5737,9 @@ class Siphon:
                         if dynamic_links:
                             links.update(dynamic_links)
 
+                elif fetched_file:
+                    if self.verbose: print(f"    -> Not a page ({result.content_type}), no links to follow")
+
                 # Phase 3: Use dynamic if static failed (in auto) or forced (in always)
                 elif self.dynamic_mode in ['auto', 'always']:
                     if self.verbose:
@@ -3478,35 +5757,52 @@ class Siphon:
 
                 # Process the links
                 links = list(links)
+                self.prefetch_mime_types(links)
                 files_downloaded = 0
+                files_queued = 0
                 potential_files = []
                 new_crawl_urls = 0
+                to_warm = []
                 
                 for link in links:
                     if shutdown_flag.is_set():
                         break
                         
-                    if self.should_download_file(link):
+                    wants_download = page.should_download(link) if page is not None else self.should_download_file(link)
+                    if wants_download:
                         potential_files.append(link)
-                        self.download_file(link)
-                        files_downloaded += 1
-                    elif self.should_crawl_url(link) and depth < self.max_depth:
-                        # Add to queue for processing by worker threads
+                        if self.download_pool:
+                            # Hand off and keep crawling; blocks only while the download queue is full
+                            to_warm.append(link)
+                            if self.download_pool.submit(link):
+                                files_queued += 1
+                        else:
+                            self.download_file(link)
+                            files_downloaded += 1
+                    elif depth < self.max_depth and self._url_in_scope(link) and self.visited_urls.add(link):
+                        # Add to queue for processing by worker threads (first sighting only)
                         self.url_queue.put((link, depth + 1))
+                        if self.state_store:
+                            self.state_store.record_enqueued(link, depth + 1)
                         new_crawl_urls += 1
+                        to_warm.append(link)
+                self.warm_hosts(to_warm)
                 
                 # Show summary - only show meaningful progress
                 if files_downloaded > 0:
                     print(f"    -> Downloaded {files_downloaded} file(s) from page.")
+                elif files_queued > 0:
+                    print(f"    -> Queued {files_queued} file(s) for download.")
                 elif self.verbose:
                     if new_crawl_urls > 0:
                         print(f"    -> Added {new_crawl_urls} URLs to crawl queue")
                     if len(potential_files) > 0 and not self.crawl_only:
                         print(f"    -> Found {len(potential_files)} potential files but none were ultimately downloaded")
-                
-                if self.delay > 0:
-                    time.sleep(self.delay)
-                    
+
+                # Only a fully processed page is marked done, so an interrupted one is redone on
+                # resume; downloads it handed to the pool are persisted by DownloadPool.submit
+                if self.state_store and not shutdown_flag.is_set():
+                    self.state_store.record_visited(url, depth)
             except Exception as e:
                 if self.verbose:
                     print(f"    ERROR: {str(e)}")
@@ -3524,6 +5820,30 @@ class Siphon:
     def close(self):
         """Clean up resources"""
         self.close_dynamic_scraper()
+        if self.download_pool:
+            self.download_pool.close()
+        if self.mime_probe_pool:
+            self.mime_probe_pool.shutdown(wait=False, cancel_futures=True)
+        self.close_parse_pool()
+        if self.warm_pool:
+            self.warm_pool.shutdown(wait=False, cancel_futures=True)
+        if self.dns_cache:
+            stats = self.dns_cache.stats()
+            logging.info(f"DNS cache: {stats['entries']} hosts, {stats['hits']} hits, "
+                         f"{stats['misses']} lookups ({stats['prefetched']} prefetched)")
+            if self._owns_dns_cache:
+                uninstall_dns_cache()
+        if self.session:
+            self.session.log_stats()
+            if self.events:
+                self.events.emit(event='connection_pool', url=self.base_url, **self.session.stats()['total'])
+            self.session.close()
+        if self.http_cache:
+            self.http_cache.close()
+        if self.manifest:
+            self.manifest.close()
+        if self.state_store:
+            self.state_store.close()
         if self.events:
             try:
                 # Emit a summary close marker without counters
@@ -3544,27 +5864,59 @@ class Siphon:
             return num
 
     def _emit(self, **fields):
-        if not self.events:
+        if not self.events or not self.events.enabled(fields.get('event')):
             return
         try:
             fields.setdefault('thread', self._current_thread_num())
             fields.setdefault('ua_id', hash(self.user_agent) & 0xffff)
-            self.events.emit(**fields)
+            self.events._push(fields)
         except Exception:
             pass
 
     def _append_manifest(self, record: dict):
-        if not self.manifest_path:
+        if not self.manifest:
             return
         try:
-            line = json.dumps(record, ensure_ascii=False)
-            with self.manifest_lock:
-                os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
-                with open(self.manifest_path, 'a', encoding='utf-8') as fh:
-                    fh.write(line + "\n")
+            self.manifest.write(json.dumps(record, ensure_ascii=False))
         except Exception as e:
             logging.debug(f"Failed to write manifest: {e}")
 
+    def _mark_downloaded(self, url):
+        """Record a finished download in memory and, if enabled, in the state store."""
+        self._add_to_bounded_dict(self.downloaded_files, url, True, self.max_downloaded_files)
+        self._add_to_bounded_dict(self.discovered_files, url, True, self.max_discovered_files)
+        if self.state_store:
+            self.state_store.record_download(url)
+
+    def _is_downloaded(self, url):
+        if url in self.downloaded_files:
+            return True
+        return bool(self.state_store and self.state_store.is_downloaded(url))
+
+    def _initial_frontier(self, url):
+        """
+        Seed the seen-set and return the ``(url, depth)`` items to start from.
+        With --resume, the queue, seen-set and download set come from the state store.
+        """
+        if self.state_store and self.resume:
+            queued, seen, visited_count, downloaded = self.state_store.load()
+            if seen:
+                for seen_url in seen:
+                    self.visited_urls.add(seen_url)
+                for done_url in downloaded:
+                    self._add_to_bounded_dict(self.downloaded_files, done_url, True, self.max_downloaded_files)
+                self.pages_crawled = visited_count
+                self.resumed_downloads = self.state_store.pending_downloads()
+                print(f"Resuming crawl from {self.state_store.path}: {len(queued)} queued, "
+                      f"{visited_count} visited, {len(downloaded)} downloaded, "
+                      f"{len(self.resumed_downloads)} downloads pending")
+                return queued
+        self.visited_urls.add(url)
+        if self.state_store:
+            self.state_store.set_meta('base_url', url)
+            self.state_store.record_enqueued(url, 0)
+        return [(url, 0)]
+
     def _add_to_bounded_dict(self, dict_obj, key, value, max_size):
         """Add to OrderedDict with size limit"""
         dict_obj[key] = value
@@ -3579,6 +5931,12 @@ class Siphon:
             return False
         if url in self.visited_urls:
             return False
+        return self._url_in_scope(url)
+
+    def _url_in_scope(self, url):
+        """Domain and include/exclude pattern checks, without the seen-set lookup."""
+        if not url:
+            return False
         try:
             parsed_url = urllib.parse.urlparse(url)
             if parsed_url.netloc and parsed_url.netloc != self.domain:
@@ -3746,7 +6104,12 @@ class Siphon:
         """
         Detect MIME type of a URL via HEAD request.
         Returns the content-type header value or None if detection fails.
+        Results (including failures) are cached in self.mime_probes.
         """
+        cached = self.mime_probes.get(url)
+        if cached is not MimeProbeCache._MISS:
+            return cached
+        content_type, headers, final_url = None, None, url
         try:
             # Use a quick HEAD request to check content type
             response = self.session.head(
@@ -3757,25 +6120,114 @@ class Siphon:
             )
 
             if response.status_code == 200:
-                content_type = response.headers.get('content-type', '').split(';')[0].strip()
+                headers = dict(response.headers)
+                final_url = response.url or url
+                content_type = response.headers.get('content-type', '').split(';')[0].strip() or None
                 if content_type:
                     logging.debug(f"Detected MIME type for {url}: {content_type}")
-                    return content_type
 
         except Exception as e:
             logging.debug(f"Failed to detect MIME type for {url}: {e}")
 
-        return None
+        self.mime_probes.put(url, content_type, headers, final_url)
+        return content_type
+
+    def _needs_mime_probe(self, url):
+        """True if should_download_file would have to HEAD this URL."""
+        if self.crawl_only or not self.download_extensions or not url.startswith(('http://', 'https://')):
+            return False
+        if 'playbooks.com/rules/' in url:
+            return False
+        path = urllib.parse.urlparse(url).path
+        return not os.path.splitext(path)[1]
+
+    def prefetch_mime_types(self, urls):
+        """
+        Probe every extensionless candidate in `urls` concurrently (bounded by
+        mime_probe_concurrency) so the sequential should_download_file calls
+        that follow are answered from the cache.
+        """
+        pending = [u for u in dict.fromkeys(urls) if self._needs_mime_probe(u)
+                   and self.mime_probes.get(u) is MimeProbeCache._MISS]
+        if not pending:
+            return
+        if len(pending) == 1 or self.mime_probe_concurrency <= 1:
+            for u in pending:
+                self._detect_mime_type(u)
+            return
+        with self.mime_probe_pool_lock:
+            if self.mime_probe_pool is None:
+                self.mime_probe_pool = ThreadPoolExecutor(max_workers=self.mime_probe_concurrency,
+                                                          thread_name_prefix='mime-probe')
+            pool = self.mime_probe_pool
+        for future in [pool.submit(self._detect_mime_type, u) for u in pending]:
+            try:
+                future.result()
+            except Exception as e:
+                logging.debug(f"MIME probe failed: {e}")
+
+    def warm_hosts(self, urls, connect=True):
+        """
+        Speculatively prepare hosts seen for the first time among urls:
+        resolve them into the DNS cache and, with preconnect (and no proxies,
+        whose pools a direct connection would not help), open a keep-alive
+        connection in the background so the first request skips DNS, TCP and
+        TLS setup.
+        """
+        if not self.dns_cache and not self.preconnect:
+            return
+        fresh = {}
+        with self.warm_lock:
+            for url in urls:
+                if not url.startswith(('http://', 'https://')):
+                    continue
+                host = _url_host(url)
+                if host and host not in self.warmed_hosts:
+                    self.warmed_hosts.add(host)
+                    parts = urllib.parse.urlsplit(url)
+                    fresh[host] = f"{parts.scheme}://{parts.netloc}/"
+            if not fresh:
+                return
+            if connect and self.preconnect and not self.proxy_manager.proxies and self.warm_pool is None:
+                self.warm_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='preconnect')
+        if self.dns_cache:
+            self.dns_cache.prefetch(fresh)
+        if connect and self.preconnect and not self.proxy_manager.proxies:
+            for origin in fresh.values():
+                self.warm_pool.submit(self.session.preconnect, origin, verify=self.verify_ssl,
+                                      timeout=self.timeout)
+
+    def _wants_fetched_download(self, result):
+        """
+        Download decision for a crawled URL that turned out not to be a page.
+        The GET's headers stand in for a MIME probe, so should_download_file
+        classifies extensionless URLs without another request.
+        """
+        if self.mime_probes.get(result.url) is MimeProbeCache._MISS:
+            self.mime_probes.put(result.url, result.content_type or None, dict(result.headers), result.final_url)
+        return self.should_download_file(result.url)
 
     def fetch_url(self, url, max_retries=3):
         """
-        Fetch content from a URL with retries and error handling.
+        Fetch a URL with retries and error handling; returns a FetchResult or None.
+        The body is streamed and only read for page content types.
         """
         last_exception = None
         max_retries = self.retries if hasattr(self, 'retries') and self.retries is not None else max_retries
+
+        # --http-cache: serve fresh entries directly, revalidate stale ones
+        cached = self.http_cache.lookup(url) if self.http_cache else None
+        if cached is not None and cached.fresh:
+            self._emit(event='fetch_ok', url=url, status='ok', cache='hit', retries=0, elapsed_ms=0)
+            with self.last_url_lock:
+                self.last_url = url
+            return FetchResult(url, cached.status_code, cached.headers, cached.content)
         
         for attempt in range(max_retries):
             try:
+                # The frontier already booked the first slot for this host
+                if attempt > 0:
+                    self.scheduler.wait(url)
                 proxy_to_use = None
                 if self.proxy_manager and hasattr(self.proxy_manager, 'get_proxy'):
                     try:
@@ -3795,6 +6247,8 @@ class Siphon:
                 # Override with any custom headers provided by user
                 if self.headers:
                     headers.update(self.headers)
+                if cached is not None:
+                    headers.update(cached.validators())
                 # Event: fetch_start
                 self._emit(event='fetch_start', url=url, status='start')
 
@@ -3804,12 +6258,30 @@ class Siphon:
                     timeout=(self.timeout, self.timeout),  # (connect_timeout, read_timeout)
                     verify=self.verify_ssl,
                     proxies=proxy_to_use,
-                    headers=headers
+                    headers=headers,
+                    stream=True
                 )
-                response.raise_for_status()
+                try:
+                    if response.status_code == 304 and cached is not None:
+                        # Cached copy is still valid
+                        response.close()
+                        self.http_cache.revalidated(url, response.headers)
+                        result = FetchResult(url, cached.status_code, cached.headers, cached.content)
+                    else:
+                        response.raise_for_status()
+                        result = FetchResult(url, response.status_code, response.headers,
+                                             final_url=response.url, response=response)
+                        if result.is_html:
+                            result.content = response.content
+                            result.close()
+                            if self.http_cache:
+                                self.http_cache.store(url, response.status_code, response.headers, result.content)
+                except BaseException:
+                    # A streamed response holds its pooled connection until closed
+                    response.close()
+                    raise
                 elapsed_ms = int((time.time() - t0) * 1000)
-                # Use RobustResponse for better encoding detection
-                text = RobustResponse(response.content, response, url).text
+                self.scheduler.adjust(url, elapsed_ms / 1000.0, response.status_code)
                 # Record proxy success if used
                 if proxy_to_use and hasattr(self.proxy_manager, 'record_proxy_success'):
                     try:
@@ -3817,13 +6289,14 @@ class Siphon:
                         self._emit(event='proxy_ok', url=url, proxy_id=str(self.proxy_manager._get_proxy_key(proxy_to_use)), elapsed_ms=elapsed_ms)
                     except Exception:
                         pass
-                self._emit(event='fetch_ok', url=url, status='ok', retries=attempt, proxy_id=str(proxy_to_use) if proxy_to_use else None, elapsed_ms=elapsed_ms)
+                self._emit(event='fetch_ok', url=url, status='ok', retries=attempt, proxy_id=str(proxy_to_use) if proxy_to_use else None,
+                           elapsed_ms=elapsed_ms, content_type=result.content_type)
 
                 # Track last URL for Referer header
                 with self.last_url_lock:
                     self.last_url = url
 
-                return text
+                return result
                 
             except requests.exceptions.HTTPError as e_http:
                 last_exception = e_http
@@ -3835,6 +6308,7 @@ class Siphon:
                         retry_after = e_http.response.headers.get('Retry-After')
                 except Exception:
                     pass
+                self.scheduler.adjust(url, time.time() - t0, status, retry_after=retry_after)
                 # Determine retryability
                 if status and _retryable_http(status) and attempt < max_retries - 1:
                     # Proxy failure accounting
@@ -3911,12 +6385,12 @@ class Siphon:
 
     def parse_html(self, html_content):
         """
-        Parse HTML content using BeautifulSoup.
+        Parse HTML content using BeautifulSoup with the configured parser backend.
         """
         if not html_content:
             return None
         try:
-            return BeautifulSoup(html_content, 'html.parser')
+            return BeautifulSoup(html_content, self.html_parser)
         except Exception as e:
             logging.error(f"Error parsing HTML: {str(e)}")
             return None
@@ -3925,12 +6399,16 @@ class Siphon:
         """
         Detect if a page requires dynamic (JavaScript) rendering.
         Returns True if the page likely needs Playwright/dynamic scraping.
+        html_content may be raw HTML or a PageDocument whose tree is reused.
         """
         if not html_content:
             return False
 
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            page = html_content if isinstance(html_content, PageDocument) else PageDocument(self, url, html_content)
+            soup = page.soup
+            if soup is None:
+                return False
 
             # Indicator 1: Check for SPA frameworks
             scripts = soup.find_all('script', src=True)
@@ -3955,17 +6433,19 @@ class Siphon:
             # Indicator 3: Check if body is mostly empty (content loaded via JS)
             body = soup.find('body')
             if body:
-                # Get text content without scripts/styles
-                for tag in body.find_all(['script', 'style', 'noscript']):
-                    tag.decompose()
-                text_content = body.get_text(strip=True)
+                # Text length without scripts/styles/noscript, computed without
+                # mutating the shared tree (get_text already skips script/style)
+                text_length = len(body.get_text(strip=True))
+                text_length -= sum(len(ns.get_text(strip=True)) for ns in body.find_all('noscript'))
+                # Scripts outside <body>
+                script_count = len(soup.find_all('script')) - len(body.find_all('script'))
                 # If body has very little text but lots of scripts, it's likely dynamic
-                if len(text_content) < 200 and len(soup.find_all('script')) > 3:
+                if text_length < 200 and script_count > 3:
                     logging.debug(f"Detected minimal content with heavy JS in {url}")
                     return True
 
             # Indicator 4: Check for hydration/dehydration comments (SSR frameworks)
-            html_str = str(html_content)
+            html_str = page.html
             hydration_patterns = [
                 'data-reactid', 'data-react-checksum', 'data-server-rendered',
                 '__NEXT_DATA__', '__NUXT__', 'ng-version', 'v-cloak'
@@ -3976,7 +6456,7 @@ class Siphon:
                     return True
 
             # Indicator 5: Check for common anti-bot/challenge pages
-            page_text_lower = html_content.lower()
+            page_text_lower = page.html_lower
             challenge_indicators = [
                 'cloudflare', 'please wait', 'checking your browser',
                 'ddos protection', 'enable javascript', 'verify you are human',
@@ -4002,98 +6482,62 @@ class Siphon:
     def extract_links(self, soup, base_url):
         """
         Extract and resolve links from multiple sources in HTML.
-        Now extracts from: <a>, onclick handlers, data-* attributes, <link>, <iframe>,
-        <img> srcset, meta refresh, and more.
+        Covers <a>, onclick handlers, data-* attributes, <link>, <iframe>,
+        <img> src/srcset, <script>, <video>/<audio>, meta refresh, <base> and
+        URLs in inline scripts, visiting every element once.
         """
-        links = set()
         if not soup or not base_url:
-            return links
-
-        def add_link(url_str):
-            """Helper to validate and add a link"""
-            if not url_str or not isinstance(url_str, str):
-                return
-            url_str = url_str.strip()
-            if not url_str or url_str.startswith(('#', 'javascript:', 'mailto:', 'tel:', 'data:')):
-                return
-            try:
-                absolute_url = urllib.parse.urljoin(base_url, url_str)
-                absolute_url = urllib.parse.urldefrag(absolute_url)[0]
-                if absolute_url.startswith(('http://', 'https://')):
-                    links.add(absolute_url)
-            except Exception as e:
-                logging.debug(f"Could not process link '{url_str}': {e}")
+            return set()
+        return _extract_links_from_soup(soup, base_url)
 
-        # 1. Standard <a href> tags
-        for a_tag in soup.find_all('a', href=True):
-            add_link(a_tag['href'])
-
-        # 2. onclick handlers with location changes
-        onclick_pattern = re.compile(r"(?:location\.href|window\.location|document\.location)\s*=\s*['\"]([^'\"]+)['\"]")
-        for tag in soup.find_all(onclick=True):
-            matches = onclick_pattern.findall(tag['onclick'])
-            for match in matches:
-                add_link(match)
-
-        # 3. data-href, data-url, data-link attributes (common in SPAs)
-        for attr in ['data-href', 'data-url', 'data-link', 'data-target', 'data-src']:
-            for tag in soup.find_all(attrs={attr: True}):
-                add_link(tag[attr])
-
-        # 4. <link> tags (rel=canonical, alternate, etc.)
-        for link_tag in soup.find_all('link', href=True):
-            add_link(link_tag['href'])
-
-        # 5. <iframe> src
-        for iframe in soup.find_all('iframe', src=True):
-            add_link(iframe['src'])
-
-        # 6. <img> srcset (responsive images)
-        for img in soup.find_all('img', srcset=True):
-            # srcset format: "url1 1x, url2 2x" or "url1 100w, url2 200w"
-            srcset_items = img['srcset'].split(',')
-            for item in srcset_items:
-                url_part = item.strip().split()[0]
-                add_link(url_part)
-
-        # 7. <img> src
-        for img in soup.find_all('img', src=True):
-            add_link(img['src'])
-
-        # 8. <script> src
-        for script in soup.find_all('script', src=True):
-            add_link(script['src'])
-
-        # 9. <video>/<audio> sources
-        for media in soup.find_all(['video', 'audio']):
-            if media.get('src'):
-                add_link(media['src'])
-            for source in media.find_all('source', src=True):
-                add_link(source['src'])
-
-        # 10. Meta refresh redirects
-        for meta in soup.find_all('meta', attrs={'http-equiv': re.compile(r'refresh', re.I)}):
-            content = meta.get('content', '')
-            # Format: "5; url=http://example.com"
-            url_match = re.search(r'url\s*=\s*[\'"]?([^\'" >]+)', content, re.I)
-            if url_match:
-                add_link(url_match.group(1))
-
-        # 11. <base> tag (changes base URL for relative links)
-        base_tag = soup.find('base', href=True)
-        if base_tag:
-            add_link(base_tag['href'])
-
-        # 12. Extract URLs from inline JavaScript (careful - can be noisy)
-        js_url_pattern = re.compile(r'["\']https?://[^"\']+["\']')
-        for script in soup.find_all('script', string=True):
-            script_content = script.string
-            if script_content:
-                for match in js_url_pattern.finditer(script_content):
-                    url_str = match.group(0).strip('"\'')
-                    add_link(url_str)
+    def extract_links_from_html(self, html_content, base_url):
+        """
+        Extract links straight from HTML text. With --link-extractor stream
+        (and lxml installed) no tree is built at all.
+        """
+        if not html_content or not base_url:
+            return set()
+        if self.parse_workers:
+            links = self._extract_links_in_pool(html_content, base_url)
+            if links is not None:
+                return links
+        if self.link_extractor == 'stream' and LXML_AVAILABLE:
+            return _extract_links_streaming(html_content, base_url)
+        return self.extract_links(self.parse_html(html_content), base_url)
+
+    def _get_parse_pool(self):
+        with self.parse_pool_lock:
+            if self.parse_pool is None and self.parse_workers:
+                self.parse_pool = _make_parse_pool(self.parse_workers)
+            return self.parse_pool
+
+    def _extract_links_in_pool(self, html_content, base_url):
+        """
+        Run parsing and link extraction in the parse worker pool. The calling
+        thread blocks without holding the GIL, so fetch threads keep going
+        while the pool uses the other cores. Returns None if the pool is
+        unavailable, and the caller then parses in-thread.
+        """
+        pool = self._get_parse_pool()
+        if pool is None:
+            return None
+        try:
+            future = pool.submit(_parse_links_in_process, html_content, base_url,
+                                 self.html_parser, self.link_extractor)
+            return set(future.result())
+        except (BrokenProcessPool, RuntimeError) as e:
+            # RuntimeError: pool already shut down (Ctrl+C / close)
+            if not shutdown_flag.is_set():
+                logging.warning(f"Parse worker pool unavailable, parsing in-thread: {e}")
+                with self.parse_pool_lock:
+                    self.parse_workers = 0
+            return None
 
-        return links
+    def close_parse_pool(self):
+        with self.parse_pool_lock:
+            pool, self.parse_pool = self.parse_pool, None
+        if pool is not None:
+            pool.shutdown(wait=not shutdown_flag.is_set(), cancel_futures=True)
 
     def extract_main_content(self, soup, url):
         """
@@ -4162,11 +6606,13 @@ class Siphon:
         
         return None
 
-    def download_file(self, url):
+    def download_file(self, url, fetched=None):
         """
         Download a file from a URL, with robust filename handling.
+        fetched is an optional FetchResult for url from fetch_url; its body
+        is used instead of issuing another GET. The caller still closes it.
         """
-        if url in self.downloaded_files:
+        if self._is_downloaded(url):
             logging.debug(f"File already downloaded: {url}")
             self._emit(event='download_start', url=url, status='duplicate')
             self._emit(event='download_complete', url=url, status='duplicate_skipped')
@@ -4175,8 +6621,9 @@ class Siphon:
         # Handle playbooks.com rule pages by extracting content as markdown
         if 'playbooks.com/rules/' in url and not url.endswith('/'):
             try:
-                # Get the HTML content
-                html_content = self.fetch_url(url)
+                # Get the HTML content (reusing the crawler's fetch when given)
+                result = fetched if fetched is not None and fetched.content is not None else self.fetch_url(url)
+                html_content = result.text if result is not None and result.is_html else None
                 if html_content:
                     soup = self.parse_html(html_content)
                     markdown_content = self.extract_main_content(soup, url)
@@ -4196,8 +6643,9 @@ class Siphon:
                         os.makedirs(self.downloads_subdir, exist_ok=True)
                         
                         file_path = os.path.join(self.downloads_subdir, safe_filename)
+                        write_path = self._artifact_write_path(file_path)
                         
-                        with open(file_path, 'w', encoding='utf-8') as f:
+                        with open(write_path, 'w', encoding='utf-8') as f:
                             f.write(markdown_content)
 
                         print(f"    + {safe_filename}")
@@ -4205,17 +6653,17 @@ class Siphon:
                         # Manifest + events
                         data_bytes = markdown_content.encode('utf-8')
                         sha = hashlib.sha256(data_bytes).hexdigest()
-                        self._append_manifest({
+                        stored = self._store_download(write_path, file_path, sha)
+                        self._append_manifest(dict({
                             'url': url,
                             'path': file_path,
                             'sha256': sha,
                             'bytes': len(data_bytes),
                             'content_type': 'text/markdown'
-                        })
+                        }, **stored))
                         self._emit(event='download_start', url=url, status='start')
                         self._emit(event='download_complete', url=url, status='ok', bytes=len(data_bytes), sha256=sha)
-                        self._add_to_bounded_dict(self.downloaded_files, url, True, self.max_downloaded_files)
-                        self._add_to_bounded_dict(self.discovered_files, url, True, self.max_discovered_files)
+                        self._mark_downloaded(url)
                         return
                     else:
                         logging.warning(f"Could not extract content from {url}")
@@ -4239,24 +6687,25 @@ class Siphon:
                     safe_filename = "downloaded_file.md"
 
                 file_path = os.path.join(self.downloads_subdir, safe_filename)
+                write_path = self._artifact_write_path(file_path)
                 
-                with open(file_path, 'wb') as f:
+                with open(write_path, 'wb') as f:
                     f.write(content)
 
                 print(f"    + {safe_filename}")
                 logging.info(f"SUCCESS: Saved blob content to {file_path}")
                 sha = hashlib.sha256(content).hexdigest()
-                self._append_manifest({
+                stored = self._store_download(write_path, file_path, sha)
+                self._append_manifest(dict({
                     'url': url,
                     'path': file_path,
                     'sha256': sha,
                     'bytes': len(content),
                     'content_type': 'application/octet-stream'
-                })
+                }, **stored))
                 self._emit(event='download_start', url=url, status='start')
                 self._emit(event='download_complete', url=url, status='ok', bytes=len(content), sha256=sha)
-                self._add_to_bounded_dict(self.downloaded_files, url, True, self.max_downloaded_files) # Use blob URI as the unique identifier
-                self._add_to_bounded_dict(self.discovered_files, url, True, self.max_discovered_files)
+                self._mark_downloaded(url)
                 return
             except Exception as e:
                 logging.error(f"Failed to download from blob URI {url}: {e}")
@@ -4286,9 +6735,10 @@ class Siphon:
 
                 # Copy the file to our downloads directory
                 file_path = os.path.join(self.downloads_subdir, safe_filename)
+                write_path = self._artifact_write_path(file_path)
                 
                 if os.path.exists(local_path):
-                    with open(local_path, 'rb') as src, open(file_path, 'wb') as dst:
+                    with open(local_path, 'rb') as src, open(write_path, 'wb') as dst:
                         dst.write(src.read())
                     print(f"    + {safe_filename}")
                     logging.info(f"SUCCESS: Copied file from {local_path} to {file_path}")
@@ -4296,20 +6746,21 @@ class Siphon:
                     try:
                         h = hashlib.sha256()
                         size = 0
-                        with open(file_path, 'rb') as fh:
+                        with open(write_path, 'rb') as fh:
                             while True:
                                 chunk = fh.read(8192)
                                 if not chunk:
                                     break
                                 h.update(chunk)
                                 size += len(chunk)
-                        self._append_manifest({
+                        stored = self._store_download(write_path, file_path, h.hexdigest())
+                        self._append_manifest(dict({
                             'url': url,
                             'path': file_path,
                             'sha256': h.hexdigest(),
                             'bytes': size,
                             'content_type': 'application/octet-stream'
-                        })
+                        }, **stored))
                         self._emit(event='download_start', url=url, status='start')
                         self._emit(event='download_complete', url=url, status='ok', bytes=size, sha256=h.hexdigest())
                     except Exception as _e:
@@ -4318,15 +6769,23 @@ class Siphon:
                     logging.warning(f"Local file not found: {local_path}")
                     return
 
-                self._add_to_bounded_dict(self.downloaded_files, url, True, self.max_downloaded_files)
-                self._add_to_bounded_dict(self.discovered_files, url, True, self.max_discovered_files)
+                self._mark_downloaded(url)
                 return
             except Exception as e:
                 logging.error(f"Failed to download from file URI {url}: {e}")
                 return
 
-        # Handle regular HTTP/HTTPS URLs (with retries + backoff)
+        # Handle regular HTTP/HTTPS URLs (with retries + backoff).
+        # Bytes land in a .part file so retries and later runs resume with Range.
+        with self.downloads_in_progress_lock:
+            if url in self.downloads_in_progress:
+                self._emit(event='download_start', url=url, status='duplicate')
+                return
+            self.downloads_in_progress.add(url)
+        partial = None
         try:
+            partial = PartialDownload(self.downloads_subdir, url)
+            assembled = None
             last_exc = None
             max_retries = self.retries if hasattr(self, 'retries') and self.retries is not None else 3
             for attempt in range(max_retries):
@@ -4342,15 +6801,30 @@ class Siphon:
 
                 t0 = time.time()
                 try:
-                    response = self.session.get(
-                        url,
-                        timeout=(self.timeout, self.timeout),
-                        verify=self.verify_ssl,
-                        proxies=proxy_to_use,
-                        stream=True
-                    )
+                    if fetched is not None and attempt == 0 and not partial.offset:
+                        # Body of the crawler's GET, not yet consumed
+                        response, proxy_to_use = fetched, None
+                    else:
+                        self.scheduler.wait(url)
+                        response = self.session.get(
+                            url,
+                            headers=partial.request_headers()
+                            or dict(PartialDownload.IDENTITY_HEADERS, **self._conditional_headers(url)),
+                            timeout=(self.timeout, self.timeout),
+                            verify=self.verify_ssl,
+                            proxies=proxy_to_use,
+                            stream=True
+                        )
+                    if response.status_code == 416 and partial.offset:
+                        # Stored range no longer valid for this resource: start over
+                        response.close()
+                        partial.reset()
+                        self._emit(event='retry', url=url, status='http_error', retries=attempt+1, reason='416 range not satisfiable')
+                        continue
                     response.raise_for_status()
                     elapsed_ms = int((time.time() - t0) * 1000)
+                    if response is not fetched:
+                        self.scheduler.adjust(url, elapsed_ms / 1000.0, response.status_code)
                     # Record proxy success if used
                     if proxy_to_use and hasattr(self.proxy_manager, 'record_proxy_success'):
                         try:
@@ -4358,6 +6832,27 @@ class Siphon:
                             self._emit(event='proxy_ok', url=url, proxy_id=str(self.proxy_manager._get_proxy_key(proxy_to_use)), elapsed_ms=elapsed_ms)
                         except Exception:
                             pass
+
+                    if response.status_code == 304:
+                        response.close()
+                        break
+                    headers = self._with_probe_headers(url, response.headers)
+                    filename = self._download_filename(url, headers)
+                    filepath = os.path.join(self.downloads_subdir, filename)
+                    # Ensure downloads_subdir exists
+                    os.makedirs(self.downloads_subdir, exist_ok=True)
+                    total = self._segmented_size(response, partial)
+                    if total:
+                        self._emit(event='download_start', url=url, status='segmented', bytes=total,
+                                   segments=self.download_segments)
+                        assembled = self._download_segmented(url, response, partial, total, filepath)
+                        break
+                    resumed = partial.begin(response.status_code, response.headers)
+                    self._emit(event='download_start', url=url, status='resume' if resumed else 'start',
+                               offset=partial.offset)
+                    for chunk in response.iter_content(chunk_size=65536):
+                        if chunk:
+                            partial.write(chunk)
                     break
                 except requests.exceptions.HTTPError as e_http:
                     last_exc = e_http
@@ -4368,6 +6863,7 @@ class Siphon:
                             retry_after = e_http.response.headers.get('Retry-After')
                     except Exception:
                         pass
+                    self.scheduler.adjust(url, time.time() - t0, status, retry_after=retry_after)
                     if status and _retryable_http(status) and attempt < max_retries - 1:
                         if self.proxy_manager and proxy_to_use:
                             try:
@@ -4398,8 +6894,11 @@ class Siphon:
                             except Exception:
                                 pass
                         raise
-                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e_conn:
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError) as e_conn:
                     last_exc = e_conn
+                    # Keep what arrived; the next attempt asks for the rest
+                    partial.close()
                     if self.proxy_manager and proxy_to_use:
                         try:
                             if hasattr(self.proxy_manager, 'record_proxy_failure'):
@@ -4416,64 +6915,29 @@ class Siphon:
                     raise
             else:
                 # exhausted
-                if last_exc:
-                    raise last_exc
+                raise last_exc or RuntimeError(f"Download of {url} failed after {max_retries} attempts")
 
-            # Get filename from URL or headers
-            filename = None
-            content_disposition = response.headers.get('content-disposition', '')
-            if 'filename=' in content_disposition:
-                filename = content_disposition.split('filename=')[1].strip('"\'')
-            
-            if not filename:
-                parsed_url = urllib.parse.urlparse(url)
-                filename = os.path.basename(parsed_url.path) or "downloaded_file"
-                if not os.path.splitext(filename)[1]:
-                    # Try to guess extension from content-type
-                    content_type = response.headers.get('content-type', '').lower()
-                    if 'markdown' in content_type or 'text/plain' in content_type:
-                        filename += '.md'
-                    else:
-                        filename += '.bin'
+            if response.status_code == 304:
+                self._record_unchanged(url)
+                return
 
-            # Convert .mdc extension to .md
-            if filename.endswith('.mdc'):
-                filename = filename[:-4] + '.md'
-            
-            # Sanitize filename
-            filename = "".join(c for c in filename if c.isalnum() or c in ['.', '_', '-']).strip()
-            if len(filename) > 200:
-                filename = filename[:200] # Limit length
-            if not filename: # If sanitization results in empty filename
-                 filename = f"siphon_dl_{len(self.downloaded_files)}_sanitized.md"
-
-            filepath = os.path.join(self.downloads_subdir, filename)
-            
-            # Ensure downloads_subdir exists
-            os.makedirs(self.downloads_subdir, exist_ok=True)
+            sha, size = assembled or partial.finish()
+            stored = self._store_download(partial.part_path, filepath, sha)
+            filepath = stored['path']
 
-            self._emit(event='download_start', url=url, status='start')
-            h = hashlib.sha256()
-            size = 0
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        h.update(chunk)
-                        size += len(chunk)
-            
-            print(f"    + {filename}")
-            self._add_to_bounded_dict(self.downloaded_files, url, True, self.max_downloaded_files)
-            self._add_to_bounded_dict(self.discovered_files, url, True, self.max_discovered_files) 
+            print(f"    + {os.path.basename(filepath)}")
+            self._mark_downloaded(url)
             logging.info(f"Successfully downloaded: {filepath} (from {url})")
-            self._append_manifest({
+            self._append_manifest(dict({
                 'url': url,
                 'path': filepath,
-                'sha256': h.hexdigest(),
+                'sha256': sha,
                 'bytes': size,
-                'content_type': response.headers.get('content-type', '')
-            })
-            self._emit(event='download_complete', url=url, status='ok', bytes=size, sha256=h.hexdigest())
+                'content_type': headers.get('content-type', ''),
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified')
+            }, **stored))
+            self._emit(event='download_complete', url=url, status='ok', bytes=size, sha256=sha)
 
         except requests.exceptions.HTTPError as e_http:
             logging.error(f"HTTP error {e_http.response.status_code} downloading {url}: {e_http.response.reason}")
@@ -4489,17 +6953,628 @@ class Siphon:
             logging.error(f"General error downloading {url}: {e_gen}")
             # import traceback; logging.debug(traceback.format_exc()) # For detailed debug
             self._emit(event='download_complete', url=url, status='fail', reason=str(e_gen))
+        finally:
+            if partial is not None:
+                partial.close()
+            with self.downloads_in_progress_lock:
+                self.downloads_in_progress.discard(url)
+
+    def _segmented_size(self, response, partial):
+        """
+        Body size if this response should be fetched as parallel ranges, else 0:
+        segmenting enabled, a fresh 200, Accept-Ranges: bytes, a strong
+        validator for If-Range, and a Content-Length of at least segment_min_size.
+        """
+        if self.download_segments < 2 or partial.offset or response.status_code != 200:
+            return 0
+        headers = response.headers
+        if 'bytes' not in headers.get('Accept-Ranges', '').lower():
+            return 0
+        etag = headers.get('ETag') or ''
+        if not ((etag and not etag.startswith('W/')) or headers.get('Last-Modified')):
+            return 0
+        if headers.get('Content-Encoding', 'identity').lower() not in ('', 'identity'):
+            return 0
+        try:
+            total = int(headers.get('Content-Length', 0))
+        except ValueError:
+            return 0
+        return total if total >= self.segment_min_size else 0
+
+    def _download_segmented(self, url, response, partial, total, filepath):
+        """
+        Fetch [0, total) as download_segments concurrent ranges written with
+        pwrite into a preallocated .part file. The open response supplies the
+        first range; every other range is a separate GET (through its own
+        proxy when a ProxyManager is configured) guarded by If-Range, so a
+        resource that changes mid-download fails instead of mixing versions.
+        Ranges skip the per-host politeness gate. Returns (sha256, bytes)
+        of the assembled file, hashed once after all ranges land.
+        """
+        etag = response.headers.get('ETag') or ''
+        validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+        count = max(2, min(self.download_segments, total // (256 * 1024) or 1))
+        bounds = [(total * k // count, total * (k + 1) // count) for k in range(count)]
+        fd = partial.preallocate(total)
+
+        # Set by the first range that fails for good; the others stop at their next chunk
+        cancel = threading.Event()
+        failures = []
+
+        def write_body(resp, pos, end):
+            # pos[0] advances as bytes land, so a retry resumes mid-range
+            for chunk in resp.iter_content(chunk_size=65536):
+                if not chunk:
+                    continue
+                chunk = chunk[:end - pos[0]]
+                os.pwrite(fd, chunk, pos[0])
+                pos[0] += len(chunk)
+                if pos[0] >= end or shutdown_flag.is_set() or cancel.is_set():
+                    break
+
+        def fail(error):
+            failures.append(error)
+            cancel.set()
+            raise error
+
+        def fetch_range(index, start, end):
+            pos = [start]
+            attempts = max(1, self.retries)
+            for attempt in range(attempts):
+                if shutdown_flag.is_set():
+                    raise RuntimeError("shutdown requested")
+                if cancel.is_set():
+                    raise RuntimeError(f"segment {index} of {url} cancelled")
+                proxy = None
+                if self.proxy_manager:
+                    try:
+                        proxy = self.proxy_manager.get_proxy(f"{threading.get_ident()}-seg{index}", url,
+                                                             on_event=lambda **ev: self._emit(**ev))
+                    except Exception as e_proxy:
+                        logging.warning(f"Failed to get proxy for {url}: {e_proxy}")
+                t0 = time.time()
+                try:
+                    offset = pos[0]
+                    with self.session.get(url, headers=dict(PartialDownload.IDENTITY_HEADERS, **{
+                                              'Range': f'bytes={offset}-{end - 1}', 'If-Range': validator}),
+                                          timeout=(self.timeout, self.timeout), verify=self.verify_ssl,
+                                          proxies=proxy, stream=True) as resp:
+                        resp.raise_for_status()
+                        match = re.match(r'\s*bytes\s+(\d+)-', resp.headers.get('Content-Range', '') or '')
+                        if resp.status_code != 206 or not match or int(match.group(1)) != offset:
+                            raise RuntimeError(f"range {offset}-{end - 1} not honoured (HTTP {resp.status_code}); resource changed?")
+                        write_body(resp, pos, end)
+                    if proxy:
+                        self.proxy_manager.record_proxy_success(proxy, response_time=time.time() - t0)
+                    if pos[0] >= end:
+                        return
+                    continue
+                except requests.exceptions.HTTPError as e_http:
+                    status = e_http.response.status_code if e_http.response is not None else None
+                    if proxy:
+                        self.proxy_manager.record_proxy_failure(proxy)
+                    if not (status and _retryable_http(status)) or attempt == attempts - 1:
+                        fail(e_http)
+                    self._emit(event='retry', url=url, status='http_error', retries=attempt+1,
+                               reason=f"segment {index}: HTTP {status}")
+                except RuntimeError as e_range:
+                    # Often a proxy or cache that drops Range; another attempt may go elsewhere
+                    if proxy:
+                        self.proxy_manager.record_proxy_failure(proxy)
+                    if attempt == attempts - 1:
+                        fail(e_range)
+                    self._emit(event='retry', url=url, status='range_error', retries=attempt+1,
+                               reason=f"segment {index}: {e_range}")
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError) as e_conn:
+                    if proxy:
+                        self.proxy_manager.record_proxy_failure(proxy)
+                    self._emit(event='retry', url=url, status='conn_error', retries=attempt+1,
+                               reason=f"segment {index}: {e_conn}")
+                cancel.wait(_backoff_with_jitter(attempt, self.backoff_base_ms))
+            if cancel.is_set():
+                raise RuntimeError(f"segment {index} of {url} cancelled")
+            fail(RuntimeError(f"segment {index} of {url} incomplete at byte {pos[0]} of {end}"))
+
+        try:
+            with ThreadPoolExecutor(max_workers=count - 1) as pool:
+                futures = [pool.submit(fetch_range, k, start, end) for k, (start, end) in enumerate(bounds) if k]
+                try:
+                    # First range comes from the response that is already open
+                    first = [0]
+                    first_end = bounds[0][1]
+                    try:
+                        write_body(response, first, first_end)
+                    except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError):
+                        pass
+                    finally:
+                        response.close()
+                    if first[0] < first_end:
+                        fetch_range(0, first[0], first_end)
+                    for future in futures:
+                        future.result()
+                except BaseException as e:
+                    # Stop the other ranges: queued ones never start, running ones
+                    # stop at their next chunk or backoff
+                    cancel.set()
+                    for future in futures:
+                        future.cancel()
+                    # Report the range that failed, not one it cancelled
+                    if failures and e is not failures[0]:
+                        raise failures[0]
+                    raise
+            os.fsync(fd)
+        except BaseException:
+            os.close(fd)
+            partial.reset()
+            raise
+        os.close(fd)
+        return partial.finish_assembled()
+
+    @staticmethod
+    def _load_manifest_index(path):
+        """Map url -> last manifest record for that URL in a previous run's manifest."""
+        index = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    url = record.get('url') if isinstance(record, dict) else None
+                    if url:
+                        index[url] = record
+        except OSError as e:
+            logging.warning(f"Could not read incremental manifest {path}: {e}")
+        return index
+
+    def _previous_artifact(self, url):
+        """The previous run's record for url if its file is still on disk."""
+        if not self.previous_artifacts:
+            return None
+        record = self.previous_artifacts.get(url)
+        if not record or not (record.get('etag') or record.get('last_modified')):
+            return None
+        if not any(p and os.path.exists(p) for p in (record.get('path'), record.get('object'))):
+            return None
+        return record
+
+    def _conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since from the --incremental manifest ({} if none)."""
+        record = self._previous_artifact(url)
+        if not record:
+            return {}
+        headers = {}
+        if record.get('etag'):
+            headers['If-None-Match'] = record['etag']
+        if record.get('last_modified'):
+            headers['If-Modified-Since'] = record['last_modified']
+        return headers
+
+    def _record_unchanged(self, url):
+        """A 304 for an incremental artifact: keep the old file and carry its record forward."""
+        record = dict(self.previous_artifacts[url], unchanged=True)
+        self._mark_downloaded(url)
+        logging.info(f"Unchanged since last run: {url}")
+        self._append_manifest(record)
+        self._emit(event='download_complete', url=url, status='not_modified',
+                   bytes=record.get('bytes'), sha256=record.get('sha256'))
+
+    def _artifact_write_path(self, filepath):
+        """
+        Where to write an artifact before _store_download places it. With --cas
+        this is a scratch file, since filepath may be a hardlink to an object.
+        """
+        if not self.cas_dir:
+            return filepath
+        scratch = os.path.join(self.cas_dir, 'tmp')
+        os.makedirs(scratch, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=scratch, suffix=os.path.splitext(filepath)[1])
+        os.close(fd)
+        return path
+
+    def _store_download(self, src_path, filepath, sha):
+        """
+        Put a finished download in place; returns the manifest fields for it.
+
+        Without --cas, src_path is renamed to filepath. With --cas the bytes
+        live once in objects/ab/cd/<sha256> (an existing object means the new
+        copy is simply dropped) and filepath becomes a hardlink to the object,
+        suffixed with ~<sha prefix> if the name already holds other content.
+        If hardlinks are unsupported the object path alone is recorded.
+        """
+        if not self.cas_dir:
+            if src_path != filepath:
+                os.replace(src_path, filepath)
+            return {'path': filepath}
+        object_path = os.path.join(self.cas_dir, sha[:2], sha[2:4], sha)
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        with self.cas_lock:
+            deduplicated = os.path.exists(object_path)
+            if deduplicated:
+                if not (os.path.exists(src_path) and os.path.samefile(src_path, object_path)):
+                    os.remove(src_path)
+            else:
+                os.replace(src_path, object_path)
+            path = filepath
+            if os.path.exists(path) and not os.path.samefile(path, object_path):
+                stem, ext = os.path.splitext(filepath)
+                path = f"{stem}~{sha[:12]}{ext}"
+            if not os.path.exists(path):
+                try:
+                    os.link(object_path, path)
+                except OSError as e:
+                    logging.debug(f"Hardlink {path} -> {object_path} failed: {e}")
+                    path = object_path
+        if deduplicated:
+            logging.info(f"Deduplicated {filepath}: content already stored as {object_path}")
+        return {'path': path, 'object': object_path, 'deduplicated': deduplicated}
+
+    def _with_probe_headers(self, url, headers):
+        """
+        Response headers completed with those from this URL's MIME probe:
+        the HEAD already returned Content-Type/Content-Disposition, so use them
+        when the GET (e.g. a 206 or a CDN redirect target) leaves them out.
+        """
+        probed = self.mime_probes.headers(url)
+        if not probed:
+            return headers
+        merged = requests.structures.CaseInsensitiveDict(probed)
+        merged.update(headers)
+        return merged
+
+    def _download_filename(self, url, headers):
+        """Pick a safe local filename from Content-Disposition or the URL path."""
+        # Get filename from URL or headers
+        filename = None
+        content_disposition = headers.get('content-disposition', '')
+        if 'filename=' in content_disposition:
+            filename = content_disposition.split('filename=')[1].strip('"\'')
+
+        if not filename:
+            parsed_url = urllib.parse.urlparse(url)
+            filename = os.path.basename(parsed_url.path) or "downloaded_file"
+            if not os.path.splitext(filename)[1]:
+                # Try to guess extension from content-type
+                content_type = headers.get('content-type', '').lower()
+                if 'markdown' in content_type or 'text/plain' in content_type:
+                    filename += '.md'
+                else:
+                    filename += '.bin'
+
+        # Convert .mdc extension to .md
+        if filename.endswith('.mdc'):
+            filename = filename[:-4] + '.md'
+
+        # Sanitize filename
+        filename = "".join(c for c in filename if c.isalnum() or c in ['.', '_', '-']).strip()
+        if len(filename) > 200:
+            filename = filename[:200] # Limit length
+        if not filename: # If sanitization results in empty filename
+            filename = f"siphon_dl_{len(self.downloaded_files)}_sanitized.md"
+        return filename
 
-    def filter_target_files(self, links):
-        """Filter a list of links to find ones that match download criteria."""
+    def filter_target_files(self, links, page=None):
+        """
+        Filter a list of links to find ones that match download criteria.
+        With a PageDocument (or when links is one) decisions are cached on it.
+        """
+        if isinstance(links, PageDocument):
+            return links.target_files
         if not links:
             return []
-        
-        target_files = []
-        for link in links:
-            if self.should_download_file(link):
-                target_files.append(link)
-        return target_files
+        check = page.should_download if page is not None else self.should_download_file
+        return [link for link in links if check(link)]
+
+class AsyncCrawlEngine:
+    """
+    Drive a Siphon crawl on a single asyncio event loop (``--engine async``).
+
+    Fetches and downloads go through one aiohttp session so thousands of
+    requests can be in flight at once. Filtering, link extraction, NDJSON
+    events and manifest records are delegated to the owning Siphon instance,
+    so the output is the same as the threaded engine. Dynamic (Playwright)
+    scraping is not available in this engine.
+    """
+
+    def __init__(self, siphon, concurrency=500):
+        self.siphon = siphon
+        self.concurrency = max(1, int(concurrency))
+        self.session = None
+        self.queue = None
+
+    def run(self, url=None):
+        """Run the crawl to completion, blocking the calling thread."""
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("The async engine requires aiohttp (pip install aiohttp)")
+        asyncio.run(self._run(url or self.siphon.base_url))
+
+    async def _run(self, start_url):
+        s = self.siphon
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=True if s.verify_ssl else False)
+        timeout = aiohttp.ClientTimeout(sock_connect=s.timeout, sock_read=s.timeout)
+        auth = aiohttp.BasicAuth(*s.auth) if isinstance(s.auth, tuple) else None
+        self.session = aiohttp.ClientSession(
+            connector=connector, timeout=timeout, cookies=s.request_cookies or None, auth=auth
+        )
+        self.queue = asyncio.Queue()
+        for item in self.siphon._initial_frontier(start_url):
+            self.queue.put_nowait(tuple(item))
+        if s.resumed_downloads:
+            await asyncio.gather(*(self.download_file(link) for link in s.resumed_downloads))
+            if s.state_store and not shutdown_flag.is_set():
+                for link in s.resumed_downloads:
+                    s.state_store.record_download_dequeued(link)
+            s.resumed_downloads = []
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await self.queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self.session.close()
+
+    async def _worker(self):
+        s = self.siphon
+        while True:
+            url, depth = await self.queue.get()
+            try:
+                if shutdown_flag.is_set():
+                    continue
+                if depth > s.max_depth:
+                    continue
+                if s.max_urls is not None and s.pages_crawled >= s.max_urls:
+                    continue
+                if not s._url_in_scope(url):
+                    continue
+                s.pages_crawled += 1
+                if s.verbose:
+                    print(f"[async] Crawling: {url}")
+
+                html_content = await self.fetch_url(url)
+                if not html_content:
+                    continue
+
+                # Parsing and link classification are CPU-bound (and may issue a
+                # blocking HEAD for extensionless links), so keep them off the loop.
+                to_download, to_crawl = await asyncio.to_thread(
+                    self._process_page, html_content, url, depth
+                )
+                # aiohttp keeps its own connections, so only DNS is warmed here
+                s.warm_hosts(to_crawl + to_download, connect=False)
+                for link in to_crawl:
+                    self.queue.put_nowait((link, depth + 1))
+                    if s.state_store:
+                        s.state_store.record_enqueued(link, depth + 1)
+                if to_download:
+                    results = await asyncio.gather(*(self.download_file(link) for link in to_download))
+                    files_downloaded = sum(1 for ok in results if ok)
+                    if files_downloaded:
+                        print(f"    -> Downloaded {files_downloaded} file(s) from page.")
+                if s.state_store and not shutdown_flag.is_set():
+                    s.state_store.record_visited(url, depth)
+            except Exception as e:
+                logging.error(f"Error processing {url}: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    def _process_page(self, html_content, url, depth):
+        s = self.siphon
+        page = PageDocument(s, url, html_content)
+        to_download, to_crawl = [], []
+        s.prefetch_mime_types(page.links)
+        for link in page.links:
+            if page.should_download(link):
+                to_download.append(link)
+            elif depth < s.max_depth and s._url_in_scope(link) and s.visited_urls.add(link):
+                to_crawl.append(link)
+        return to_download, to_crawl
+
+    def _proxy_url(self, proxy):
+        if not proxy:
+            return None
+        return proxy.get('http') or proxy.get('https')
+
+    async def _request(self, url, headers=None):
+        """
+        GET a URL with the same retry, backoff and proxy accounting as the
+        threaded engine. Returns ``(response, attempt, proxy, elapsed_ms)``
+        with the body unread; the caller must release the response.
+        """
+        s = self.siphon
+        max_retries = s.retries if s.retries else 3
+        last_exc = None
+        for attempt in range(max_retries):
+            proxy_to_use = None
+            if s.proxy_manager:
+                try:
+                    proxy_to_use = s.proxy_manager.get_proxy(
+                        'async', url, on_event=lambda **ev: s._emit(**ev)
+                    )
+                except Exception as e_proxy:
+                    logging.warning(f"Failed to get proxy for {url}: {e_proxy}")
+
+            delay = s.scheduler.reserve(url)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            t0 = time.time()
+            try:
+                response = await self.session.get(url, headers=headers, proxy=self._proxy_url(proxy_to_use))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e_conn:
+                last_exc = e_conn
+                self._record_proxy_failure(url, proxy_to_use, 'conn_error')
+                if attempt < max_retries - 1:
+                    logging.warning(f"Connection error fetching {url} (attempt {attempt + 1}/{max_retries}): {e_conn}")
+                    s._emit(event='retry', url=url, status='conn_error', retries=attempt+1, reason=str(e_conn))
+                    await asyncio.sleep(_backoff_with_jitter(attempt, s.backoff_base_ms))
+                    continue
+                raise
+
+            s.scheduler.adjust(url, time.time() - t0, response.status,
+                               retry_after=response.headers.get('Retry-After'))
+            if response.status < 400:
+                elapsed_ms = int((time.time() - t0) * 1000)
+                if proxy_to_use:
+                    try:
+                        s.proxy_manager.record_proxy_success(proxy_to_use, response_time=elapsed_ms/1000.0)
+                        s._emit(event='proxy_ok', url=url, proxy_id=str(s.proxy_manager._get_proxy_key(proxy_to_use)), elapsed_ms=elapsed_ms)
+                    except Exception:
+                        pass
+                return response, attempt, proxy_to_use, elapsed_ms
+
+            status, reason = response.status, response.reason
+            retry_after = response.headers.get('Retry-After')
+            response.release()
+            last_exc = RuntimeError(f"HTTP {status}: {reason}")
+            if _retryable_http(status) and attempt < max_retries - 1:
+                self._record_proxy_failure(url, proxy_to_use, f"HTTP {status}")
+                sleep_s = _backoff_with_jitter(attempt, s.backoff_base_ms)
+                if retry_after and retry_after.isdigit():
+                    sleep_s = max(sleep_s, min(60, int(retry_after)))
+                s._emit(event='retry', url=url, status='http_error', retries=attempt+1, reason=f"{status}:{reason}")
+                await asyncio.sleep(sleep_s)
+                continue
+            if 400 <= status < 500:
+                logging.warning(f"Client error {status} fetching {url}: {reason}")
+            else:
+                logging.error(f"HTTP server error {status} fetching {url}: {reason}")
+            self._record_proxy_failure(url, proxy_to_use, 'http_final')
+            raise last_exc
+        raise last_exc
+
+    def _record_proxy_failure(self, url, proxy, reason):
+        s = self.siphon
+        if not (s.proxy_manager and proxy):
+            return
+        try:
+            s.proxy_manager.record_proxy_failure(proxy)
+            s._emit(event='proxy_fail', url=url, proxy_id=str(s.proxy_manager._get_proxy_key(proxy)), reason=reason)
+        except Exception:
+            pass
+
+    async def fetch_url(self, url):
+        """Async counterpart of Siphon.fetch_url; returns decoded text or None."""
+        s = self.siphon
+        cached = s.http_cache.lookup(url) if s.http_cache else None
+        if cached is not None and cached.fresh:
+            s._emit(event='fetch_ok', url=url, status='ok', cache='hit', retries=0, elapsed_ms=0)
+            s.last_url = url
+            return RobustResponse(cached.content, cached, url).text
+        headers = generate_realistic_headers(s.user_agent, referer=s.last_url, url=url)
+        if s.headers:
+            headers.update(s.headers)
+        if cached is not None:
+            headers.update(cached.validators())
+        s._emit(event='fetch_start', url=url, status='start')
+        try:
+            response, attempt, proxy_to_use, elapsed_ms = await self._request(url, headers=headers)
+            try:
+                if response.status == 304 and cached is not None:
+                    s.http_cache.revalidated(url, response.headers)
+                    raw, shim = cached.content, cached
+                else:
+                    raw = await response.read()
+                    shim = types.SimpleNamespace(status_code=response.status, headers=response.headers)
+                    if s.http_cache:
+                        s.http_cache.store(url, response.status, response.headers, raw)
+            finally:
+                response.release()
+        except Exception as e:
+            s._emit(event='fetch_fail', url=url, status='fail', reason=str(e)[:500])
+            return None
+        text = RobustResponse(raw, shim, url).text
+        s._emit(event='fetch_ok', url=url, status='ok', retries=attempt, proxy_id=str(proxy_to_use) if proxy_to_use else None, elapsed_ms=elapsed_ms)
+        s.last_url = url
+        return text
+
+    async def download_file(self, url):
+        """
+        Async counterpart of Siphon.download_file for http(s) URLs. Returns
+        True only when this call saved the file.
+        """
+        s = self.siphon
+        # blob:, file:/// and rule-page downloads never touch the network
+        # through this path; reuse the threaded implementation for them.
+        if not url.startswith(('http://', 'https://')) or 'playbooks.com/rules/' in url:
+            already = s._is_downloaded(url)
+            await asyncio.to_thread(s.download_file, url)
+            return not already and s._is_downloaded(url)
+        if s._is_downloaded(url):
+            s._emit(event='download_start', url=url, status='duplicate')
+            s._emit(event='download_complete', url=url, status='duplicate_skipped')
+            return
+        # Claim the URL up front so concurrent pages don't fetch it twice
+        s._add_to_bounded_dict(s.downloaded_files, url, True, s.max_downloaded_files)
+        partial = None
+        try:
+            # Same .part/sidecar layout as the threaded engine, so either can resume
+            partial = PartialDownload(s.downloads_subdir, url)
+            max_attempts = s.retries if s.retries else 3
+            for attempt in range(max_attempts):
+                try:
+                    response, _, _, _ = await self._request(
+                        url, headers=partial.request_headers()
+                        or dict(PartialDownload.IDENTITY_HEADERS, **s._conditional_headers(url)))
+                except RuntimeError as e:
+                    if partial.offset and str(e).startswith('HTTP 416') and attempt < max_attempts - 1:
+                        partial.reset()
+                        continue
+                    raise
+                if response.status == 304:
+                    response.release()
+                    break
+                try:
+                    filename = s._download_filename(url, s._with_probe_headers(url, response.headers))
+                    filepath = os.path.join(s.downloads_subdir, filename)
+                    os.makedirs(s.downloads_subdir, exist_ok=True)
+                    resumed = partial.begin(response.status, response.headers)
+                    s._emit(event='download_start', url=url, status='resume' if resumed else 'start',
+                            offset=partial.offset)
+                    async for chunk in response.content.iter_chunked(65536):
+                        partial.write(chunk)
+                    content_type = response.headers.get('content-type', '')
+                    validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                    break
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e_body:
+                    # Body cut off: keep the bytes and ask for the rest
+                    partial.close()
+                    if attempt >= max_attempts - 1:
+                        raise
+                    s._emit(event='retry', url=url, status='conn_error', retries=attempt+1, reason=str(e_body))
+                    await asyncio.sleep(_backoff_with_jitter(attempt, s.backoff_base_ms))
+                finally:
+                    response.release()
+            if response.status == 304:
+                s._record_unchanged(url)
+                return
+            sha, size = partial.finish()
+            stored = s._store_download(partial.part_path, filepath, sha)
+            filepath = stored['path']
+        except Exception as e:
+            s.downloaded_files.pop(url, None)
+            logging.error(f"Error downloading {url}: {e}")
+            s._emit(event='download_complete', url=url, status='fail', reason=str(e))
+            return
+        finally:
+            if partial is not None:
+                partial.close()
+
+        print(f"    + {os.path.basename(filepath)}")
+        s._mark_downloaded(url)
+        logging.info(f"Successfully downloaded: {filepath} (from {url})")
+        s._append_manifest(dict({
+            'url': url,
+            'path': filepath,
+            'sha256': sha,
+            'bytes': size,
+            'content_type': content_type,
+            'etag': validators[0],
+            'last_modified': validators[1]
+        }, **stored))
+        s._emit(event='download_complete', url=url, status='ok', bytes=size, sha256=sha)
+        return True
 
 def main():
     global siphon_instance
@@ -4538,10 +7613,48 @@ def main():
     parser.add_argument("--threads", help="Number of worker threads", type=int, default=5)
     # Phase 0 flags
     parser.add_argument("--events-ndjson", help="Path to write NDJSON events or '-' for stdout", default=None)
+    parser.add_argument("--events-level", help="Minimum verbosity of emitted events (per-request events are 'debug')", choices=list(NDJSONEmitter.LEVELS), default="debug")
+    parser.add_argument("--events-sample", type=NDJSONEmitter.parse_sample, help="Keep only a fraction of some event types, e.g. 'proxy_select=0.01,fetch_start=0.1'", default=None)
+    parser.add_argument("--events-queue", help="Max events buffered for the writer thread before new ones are dropped and counted", type=int, default=100000)
     parser.add_argument("--manifest", help="Path to write artifact manifest (NDJSON)", default=None)
+    parser.add_argument("--manifest-flush-interval", help="Seconds between background manifest flushes", type=float, default=1.0)
+    parser.add_argument("--manifest-batch", help="Flush the manifest early once this many records are buffered", type=int, default=1000)
+    parser.add_argument("--manifest-fsync", help="fsync the manifest after every batch, only on close, or never", choices=BatchedLineWriter.FSYNC_POLICIES, default="close")
     parser.add_argument("--retries", help="Max retries for fetch operations", type=int, default=3)
     parser.add_argument("--backoff-base-ms", help="Base backoff in milliseconds", type=int, default=250)
     parser.add_argument("--respect-robots", help="Respect robots.txt (placeholder)", action="store_true")
+    # Engine selection
+    parser.add_argument("--engine", help="Crawl engine: thread pool workers or a single asyncio event loop", choices=["threads", "async"], default="threads")
+    parser.add_argument("--async-concurrency", help="Max in-flight requests for --engine async", type=int, default=500)
+    # URL de-duplication
+    parser.add_argument("--seen-capacity", help="Expected number of unique URLs; the seen-set grows beyond this if needed", type=int, default=1000000)
+    parser.add_argument("--seen-fp-rate", help="Target false-positive rate of the URL seen-set", type=float, default=0.001)
+    # Parsing
+    parser.add_argument("--parser", help="HTML parser backend for BeautifulSoup; 'auto' uses lxml when installed (default: html.parser)", choices=HTML_PARSERS, default="html.parser")
+    parser.add_argument("--link-extractor", help="'tree' walks the parsed page once; 'stream' uses lxml events without building a tree", choices=["tree", "stream"], default="tree")
+    parser.add_argument("--parse-workers", help="Parse and extract links in this many worker processes (0 = on the fetch threads). Pair with a higher --threads", type=int, default=0)
+    # Downloads
+    parser.add_argument("--mime-probe-ttl", help="Seconds to cache HEAD probe results for extensionless links", type=float, default=3600)
+    parser.add_argument("--mime-probe-concurrency", help="Concurrent HEAD probes per page", type=int, default=16)
+    parser.add_argument("--mime-probe-patterns", help="Reuse a probe result for other URLs of the same host and path shape once 3 probes agree", action="store_true")
+    parser.add_argument("--cas", help="Store downloads once by sha256 under <output>/objects/ and hardlink them into downloads/", action="store_true")
+    parser.add_argument("--http-cache", help="Directory for a persistent HTTP cache of fetched pages (honours Cache-Control, revalidates stale entries)", metavar="DIR", default=None)
+    parser.add_argument("--http-cache-max-mb", help="Evict least recently used cache entries beyond this many MB (compressed)", type=float, default=1024)
+    parser.add_argument("--http-cache-min-ttl", help="Treat cacheable pages as fresh for at least this many seconds (handy for development re-runs)", type=float, default=0)
+    parser.add_argument("--incremental", help="Previous run's --manifest; unchanged files are revalidated with conditional GETs and not rewritten", metavar="MANIFEST", default=None)
+    parser.add_argument("--download-threads", help="Download files on a separate pool of this many threads (0 = crawl workers download inline)", type=int, default=0)
+    parser.add_argument("--download-queue", help="Max downloads waiting for --download-threads before crawl workers block", type=int, default=1000)
+    parser.add_argument("--segments", help="Fetch large files that support byte ranges as this many parallel ranges (1 = off)", type=int, default=1)
+    parser.add_argument("--segment-min-size", help="Only segment files of at least this many MB", type=float, default=16)
+    # Connections
+    parser.add_argument("--pool-per-host", help="Cap on keep-alive connections per host (default: sized from --threads, --download-threads and --segments)", type=int, default=0)
+    parser.add_argument("--proxy-sessions", help="Keep connection pools for at most this many proxies at once", type=int, default=64)
+    parser.add_argument("--dns-cache", help="Cache DNS lookups in-process and resolve newly discovered hosts (and proxy hosts) ahead of use", action="store_true")
+    parser.add_argument("--dns-ttl", help="Seconds to keep DNS answers when the record TTL is unknown (install dnspython to use record TTLs)", type=float, default=300)
+    parser.add_argument("--preconnect", help="Open a keep-alive connection to each newly discovered host before its first request (direct connections only)", action="store_true")
+    # Persistent state
+    parser.add_argument("--state-db", help="Persist frontier, visited and downloaded URLs to this SQLite file", default=None)
+    parser.add_argument("--resume", help="Resume a crawl from a state database written by --state-db", metavar="STATE_DB", default=None)
     
     args = parser.parse_args()
     
@@ -4612,6 +7725,16 @@ def main():
         logging.warning("Playwright not available. Dynamic scraping will be disabled.")
         logging.warning("Install with: pip install playwright && playwright install")
         args.dynamic = "never"
+
+    # The async engine needs aiohttp and cannot drive Playwright
+    if args.engine == "async":
+        if not AIOHTTP_AVAILABLE:
+            logging.warning("aiohttp not available. Falling back to the threaded engine.")
+            logging.warning("Install with: pip install aiohttp")
+            args.engine = "threads"
+        elif args.dynamic != "never":
+            logging.warning("Dynamic scraping is not supported by the async engine and will be disabled.")
+            args.dynamic = "never"
         
     # Create output directory if it doesn't exist
     os.makedirs(args.output, exist_ok=True)
@@ -4641,10 +7764,42 @@ def main():
         verbose=args.verbose,
         # Phase 0 wiring
         events_ndjson=args.events_ndjson,
+        events_level=args.events_level,
+        events_sample=args.events_sample,
+        events_queue=args.events_queue,
         manifest_path=args.manifest,
+        manifest_flush_interval=args.manifest_flush_interval,
+        manifest_batch_size=args.manifest_batch,
+        manifest_fsync=args.manifest_fsync,
         retries=args.retries,
         backoff_base_ms=args.backoff_base_ms,
-        respect_robots=args.respect_robots
+        respect_robots=args.respect_robots,
+        engine=args.engine,
+        async_concurrency=args.async_concurrency,
+        seen_capacity=args.seen_capacity,
+        seen_error_rate=args.seen_fp_rate,
+        state_db=args.resume or args.state_db,
+        resume=bool(args.resume),
+        parser=args.parser,
+        link_extractor=args.link_extractor,
+        parse_workers=args.parse_workers,
+        download_segments=args.segments,
+        download_threads=args.download_threads,
+        mime_probe_ttl=args.mime_probe_ttl,
+        mime_probe_concurrency=args.mime_probe_concurrency,
+        mime_probe_patterns=args.mime_probe_patterns,
+        cas=args.cas,
+        incremental_manifest=args.incremental,
+        http_cache=args.http_cache,
+        http_cache_max_mb=args.http_cache_max_mb,
+        http_cache_min_ttl=args.http_cache_min_ttl,
+        download_queue_size=args.download_queue,
+        segment_min_size=int(args.segment_min_size * 1024 * 1024),
+        pool_per_host=args.pool_per_host,
+        proxy_sessions=args.proxy_sessions,
+        dns_cache=args.dns_cache,
+        dns_ttl=args.dns_ttl,
+        preconnect=args.preconnect
     )
     
     try:
@@ -4656,7 +7811,7 @@ def main():
             print("\n" + "="*60)
             print("CRAWL SUMMARY")
             print("="*60)
-            print(f"URLs visited: {len(siphon_instance.visited_urls)}")
+            print(f"URLs visited: {siphon_instance.pages_crawled}")
             print(f"Files discovered: {len(siphon_instance.discovered_files)}")
             print(f"Files downloaded: {len(siphon_instance.downloaded_files)}")
             if siphon_instance.downloaded_files:
@@ -0,0 +1,108 @@
+# Part of the Siphon - Web Data Extraction Tool
+"""Shared fixtures: a local http.server with the behaviours the tests need."""
+import hashlib
+import http.server
+import os
+import re
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAGE = (b"<html><head><title>Home</title></head><body>"
+        b"<a href='/about.html'>About</a> <a href='/blob.bin'>Data</a></body></html>")
+ABOUT = b"<html><head><title>About</title></head><body><p>About us</p></body></html>"
+BLOB = hashlib.sha256(b'siphon').digest() * 8192   # 256 KiB of deterministic bytes
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        log = self.server.requests
+        log.append((self.path, dict(self.headers)))
+        if self.path in ('/', '/index.html', '/about.html'):
+            body = ABOUT if self.path == '/about.html' else PAGE
+            etag = '"p-%s"' % hashlib.md5(body).hexdigest()[:8]
+            # Always stale, so every cached fetch is a revalidation
+            headers = {'Content-Type': 'text/html; charset=utf-8', 'ETag': etag, 'Cache-Control': 'max-age=0'}
+            if self.headers.get('If-None-Match') == etag:
+                self._send(304, headers=headers)
+            else:
+                self._send(200, body, headers)
+        elif self.path in ('/blob.bin', '/norange.bin'):
+            headers = {'Content-Type': 'application/octet-stream', 'ETag': '"b1"', 'Accept-Ranges': 'bytes'}
+            match = re.match(r'bytes=(\d+)-', self.headers.get('Range', ''))
+            if match and self.path == '/blob.bin' and self.headers.get('If-Range') == '"b1"':
+                start = int(match.group(1))
+                headers['Content-Range'] = f'bytes {start}-{len(BLOB) - 1}/{len(BLOB)}'
+                self._send(206, BLOB[start:], headers)
+            else:
+                self._send(200, BLOB, headers)
+        else:
+            self._send(404, b'not found', {'Content-Type': 'text/plain'})
+
+
+@pytest.fixture
+def server():
+    """Base URL of a local server; `server.requests` lists (path, headers) as received."""
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    class Server(str):
+        requests = httpd.requests
+
+    yield Server(f"http://127.0.0.1:{httpd.server_address[1]}")
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def make_siphon(tmp_path):
+    """Build Siphon instances writing under tmp_path; all are closed afterwards."""
+    import siphon
+    made = []
+
+    def make(base_url, **kwargs):
+        kwargs.setdefault('output_dir', str(tmp_path / 'out'))
+        kwargs.setdefault('dynamic_mode', 'never')
+        kwargs.setdefault('retries', 1)
+        kwargs.setdefault('backoff_base_ms', 1)
+        instance = siphon.Siphon(base_url, **kwargs)
+        made.append(instance)
+        return instance
+
+    yield make
+    for instance in made:
+        instance.close()
+    siphon.shutdown_flag.clear()
+
+
+def spy_responses(session):
+    """Record every response session.get returns (for checking they get closed)."""
+    responses = []
+    original = session.get
+
+    def get(*args, **kwargs):
+        response = original(*args, **kwargs)
+        responses.append(response)
+        return response
+
+    session.get = get
+    return responses
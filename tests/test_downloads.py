@@ -0,0 +1,56 @@
+# Part of the Siphon - Web Data Extraction Tool
+"""Resumable downloads: Range + If-Range continues a partial, a 200 restarts it from zero."""
+import hashlib
+import json
+import os
+
+import siphon
+
+from conftest import BLOB
+
+
+def _leave_partial(s, url, size):
+    """What an interrupted download leaves behind: the first `size` bytes and a sidecar."""
+    partial = siphon.PartialDownload(s.downloads_subdir, url)
+    os.makedirs(partial.dir, exist_ok=True)
+    with open(partial.part_path, 'wb') as fh:
+        fh.write(BLOB[:size])
+    with open(partial.meta_path, 'w', encoding='utf-8') as fh:
+        json.dump({'url': url, 'etag': '"b1"', 'last_modified': None, 'bytes': size}, fh)
+    return partial
+
+
+def _saved(s, name):
+    with open(os.path.join(s.downloads_subdir, name), 'rb') as fh:
+        return fh.read()
+
+
+def test_download_resumes_with_range(server, make_siphon):
+    s = make_siphon(server + '/')
+    url = server + '/blob.bin'
+    partial = _leave_partial(s, url, 100000)
+    s.download_file(url)
+    assert hashlib.sha256(_saved(s, 'blob.bin')).digest() == hashlib.sha256(BLOB).digest()
+    headers = server.requests[-1][1]
+    assert headers.get('Range') == 'bytes=100000-' and headers.get('If-Range') == '"b1"'
+    assert headers.get('Accept-Encoding') == 'identity'
+    assert not os.path.exists(partial.part_path) and not os.path.exists(partial.meta_path)
+
+
+def test_download_restarts_when_range_is_ignored(server, make_siphon):
+    s = make_siphon(server + '/')
+    url = server + '/norange.bin'
+    _leave_partial(s, url, 100000)
+    s.download_file(url)
+    # The server answered 200 with the whole body, which must replace the partial, not extend it
+    assert server.requests[-1][1].get('Range') == 'bytes=100000-'
+    assert _saved(s, 'norange.bin') == BLOB
+
+
+def test_partial_sidecar_not_written_for_encoded_response(tmp_path):
+    partial = siphon.PartialDownload(str(tmp_path), 'http://a/file.bin')
+    partial.begin(200, {'Content-Encoding': 'gzip', 'ETag': '"x"'})
+    partial.write(b'data')
+    partial.close()
+    assert not os.path.exists(partial.meta_path)
+    assert partial.request_headers() == {}
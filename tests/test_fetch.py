@@ -0,0 +1,50 @@
+# Part of the Siphon - Web Data Extraction Tool
+"""Page fetching: streamed responses are closed, and stale cache entries revalidate with 304."""
+import siphon
+
+from conftest import PAGE, spy_responses
+
+
+def test_fetch_url_closes_response_on_http_error(server, make_siphon):
+    s = make_siphon(server + '/')
+    responses = spy_responses(s.session)
+    assert s.fetch_url(server + '/missing') is None
+    assert responses and all(r.raw.closed for r in responses)
+
+
+def test_fetch_url_streams_non_html_until_closed(server, make_siphon):
+    s = make_siphon(server + '/')
+    result = s.fetch_url(server + '/blob.bin')
+    assert result is not None and not result.is_html and result.content is None
+    result.close()
+    assert result.response is None or result.response.raw.closed
+
+
+def test_webscraper_make_request_closes_responses_on_error(server, tmp_path):
+    scraper = siphon.WebScraper(server + '/', output_dir=str(tmp_path / 'ws'))
+    responses = spy_responses(scraper.session)
+    assert scraper.make_request(server + '/missing', retries=1) is None
+    # Proxy attempt plus the direct-connection fallback
+    assert len(responses) == 2 and all(r.raw.closed for r in responses)
+
+
+def test_fetch_url_revalidates_stale_cache_entry(server, make_siphon, tmp_path):
+    s = make_siphon(server + '/', http_cache=str(tmp_path / 'cache'))
+    assert s.fetch_url(server + '/index.html').content == PAGE
+    again = s.fetch_url(server + '/index.html')
+    assert again.content == PAGE
+    path, headers = server.requests[-1]
+    assert path == '/index.html' and headers.get('If-None-Match')
+
+
+def test_webscraper_fallback_path_revalidates(server, tmp_path):
+    cache = siphon.HTTPCache(str(tmp_path / 'cache'))
+    first = siphon.WebScraper(server + '/', output_dir=str(tmp_path / 'ws'), http_cache=cache)
+    assert first.make_request(server + '/index.html', retries=1).content == PAGE
+    # A new scraper has an empty in-memory cache; retries=0 goes straight to the direct fallback
+    second = siphon.WebScraper(server + '/', output_dir=str(tmp_path / 'ws'), http_cache=cache)
+    responses = spy_responses(second.session)
+    response = second.make_request(server + '/index.html', retries=0)
+    assert response is not None and response.content == PAGE
+    assert [r.status_code for r in responses] == [304]
+    assert server.requests[-1][1].get('If-None-Match')
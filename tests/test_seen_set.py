@@ -0,0 +1,15 @@
+# Part of the Siphon - Web Data Extraction Tool
+"""URLSeenSet: no false negatives, and the error rate holds as layers are added."""
+import siphon
+
+
+def test_seen_set_grows_without_forgetting_and_stays_under_error_rate():
+    seen = siphon.URLSeenSet(capacity=1000, error_rate=0.01)
+    urls = [f"http://example.com/page/{i}" for i in range(20000)]
+    # A false positive makes add() report a new URL as seen, so a few may be lost
+    added = sum(seen.add(url) for url in urls)
+    assert added > len(urls) * 0.99
+    assert len(seen._layers) > 1 and len(seen) == added
+    assert not any(seen.add(url) for url in urls)
+    false_positives = sum(f"http://other.example/{i}" in seen for i in range(50000))
+    assert false_positives / 50000 < 0.01
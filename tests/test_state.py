@@ -0,0 +1,59 @@
+# Part of the Siphon - Web Data Extraction Tool
+"""CrawlStateStore: fresh runs reset it, --resume restores the frontier and queued downloads."""
+import os
+
+import siphon
+
+
+def test_state_store_round_trip(tmp_path):
+    store = siphon.CrawlStateStore(str(tmp_path / 'state.db'))
+    store.record_enqueued('http://a/', 0)
+    store.record_enqueued('http://a/next', 1)
+    store.record_visited('http://a/', 0)
+    store.record_download('http://a/file.pdf')
+    store.record_download_queued('http://a/pending.zip')
+    assert store.is_downloaded('http://a/file.pdf')
+    store.close()
+
+    store = siphon.CrawlStateStore(str(tmp_path / 'state.db'))
+    queued, seen, visited_count, downloaded = store.load()
+    assert queued == [('http://a/next', 1)]
+    assert set(seen) == {'http://a/', 'http://a/next'}
+    assert visited_count == 1 and downloaded == ['http://a/file.pdf']
+    assert store.pending_downloads() == ['http://a/pending.zip']
+    store.close()
+
+
+def test_siphon_resumes_only_when_asked(server, make_siphon, tmp_path):
+    db = str(tmp_path / 'state.db')
+    store = siphon.CrawlStateStore(db)
+    store.record_visited(server + '/', 0)
+    store.record_enqueued(server + '/about.html', 1)
+    store.record_download_queued(server + '/blob.bin')
+    store.close()
+
+    resumed = make_siphon(server + '/', state_db=db, resume=True)
+    assert [tuple(item) for item in resumed._initial_frontier(server + '/')] == [(server + '/about.html', 1)]
+    assert resumed.resumed_downloads == [server + '/blob.bin']
+    resumed.close()
+
+    fresh = make_siphon(server + '/', state_db=db)
+    assert [tuple(item) for item in fresh._initial_frontier(server + '/')] == [(server + '/', 0)]
+    assert fresh.resumed_downloads == []
+
+
+def test_resumed_crawl_finishes_queued_downloads(server, make_siphon, tmp_path):
+    db = str(tmp_path / 'state.db')
+    store = siphon.CrawlStateStore(db)
+    for url in (server + '/', server + '/about.html'):
+        store.record_visited(url, 0)
+    store.record_download_queued(server + '/blob.bin')
+    store.close()
+
+    s = make_siphon(server + '/', state_db=db, resume=True, download_threads=2)
+    s.crawl()
+    assert os.path.exists(os.path.join(s.downloads_subdir, 'blob.bin'))
+    assert s.state_store.pending_downloads() == []
+    assert s.state_store.is_downloaded(server + '/blob.bin')
+    # Nothing was left in the frontier, so no page was fetched again
+    assert all(path == '/blob.bin' for path, _ in server.requests)